@@ -0,0 +1,78 @@
+"""Make the weather modules in the repository root importable from the tests"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_bench import stub_client  # noqa: E402
+from weather_core import UpdateQueue, WorkerPool  # noqa: E402
+from weather_stub import StubServer  # noqa: E402
+
+
+class FakeRoot:
+    """Records after() timers, layout passes and callback errors instead of running a Tk event loop"""
+    
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+        self.layouts = 0
+        self.errors = []
+    
+    def after(self, ms, function, *args):
+        self.next_id += 1
+        self.jobs[self.next_id] = (ms, function, args)
+        return self.next_id
+    
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+    
+    def update_idletasks(self):
+        self.layouts += 1
+    
+    def report_callback_exception(self, kind, value, traceback):
+        self.errors.append(value)
+
+
+@pytest.fixture
+def stub():
+    """A local stub API server without latency or random errors"""
+    server = StubServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(stub, tmp_path):
+    """A WeatherClient talking to the stub, with its stores in a temporary directory"""
+    client = stub_client(stub.url, str(tmp_path))
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def make_app(stub, tmp_path):
+    """Build WeatherApps on a FakeRoot without a display, with a stub client,
+    a worker pool and an update queue; tests add the state they need"""
+    pytest.importorskip('tkinter')
+    from weather_gui import WeatherApp
+    
+    apps = []
+    
+    def make_app(backend='forecast', workers=1):
+        app = WeatherApp.__new__(WeatherApp)
+        app.root = FakeRoot()
+        directory = tmp_path / backend
+        directory.mkdir(exist_ok=True)
+        app.client = stub_client(stub.url, str(directory), backend)
+        app.workers = WorkerPool(workers, 1, name='test-search')
+        app.updates = UpdateQueue()
+        app.closed = False
+        apps.append(app)
+        return app
+    
+    yield make_app
+    for app in apps:
+        app.workers.shutdown()
+        app.client.close()
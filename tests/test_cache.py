@@ -0,0 +1,69 @@
+"""Tests for ResponseCache: time to live per endpoint, LRU order and eviction at capacity"""
+import pytest
+
+import weather_core
+from weather_core import ResponseCache
+
+TTLS = {'weather': 600, 'forecast': 1800}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock that only moves when the test advances it"""
+    class Clock:
+        now = 1000.0
+        
+        def advance(self, seconds):
+            self.now += seconds
+    
+    clock = Clock()
+    monkeypatch.setattr(weather_core.time, 'monotonic', lambda: clock.now)
+    return clock
+
+
+def test_entries_expire_after_their_endpoint_ttl(clock):
+    cache = ResponseCache(TTLS, 10)
+    cache.put('weather', 'London', 'metric', 'current')
+    cache.put('forecast', 'London', 'metric', 'forecast')
+    
+    clock.advance(600)
+    assert cache.get('weather', 'London', 'metric') == 'current'
+    
+    clock.advance(1)
+    assert cache.get('weather', 'London', 'metric') is None
+    assert cache.get('forecast', 'London', 'metric') == 'forecast'
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 0, 'size': 1}
+
+
+def test_keys_ignore_case_and_spaces_but_not_units(clock):
+    cache = ResponseCache(TTLS, 10)
+    cache.put('weather', '  New   York ', 'metric', 'current')
+    
+    assert cache.get('weather', 'new york', 'metric') == 'current'
+    assert cache.get('weather', 'new york', 'imperial') is None
+
+
+def test_least_recently_used_entry_is_evicted_at_capacity(clock):
+    cache = ResponseCache(TTLS, 2)
+    cache.put('weather', 'London', 'metric', 'london')
+    cache.put('weather', 'Paris', 'metric', 'paris')
+    cache.get('weather', 'London', 'metric')
+    
+    cache.put('weather', 'Oslo', 'metric', 'oslo')
+    
+    assert cache.get('weather', 'Paris', 'metric') is None
+    assert cache.get('weather', 'London', 'metric') == 'london'
+    assert cache.get('weather', 'Oslo', 'metric') == 'oslo'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_storing_again_refreshes_the_entry(clock):
+    cache = ResponseCache(TTLS, 2)
+    cache.put('weather', 'London', 'metric', 'old')
+    clock.advance(500)
+    cache.put('weather', 'London', 'metric', 'new')
+    
+    clock.advance(500)
+    
+    assert cache.get('weather', 'London', 'metric') == 'new'
+    assert cache.stats()['size'] == 1
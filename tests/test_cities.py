@@ -0,0 +1,92 @@
+"""Tests for the offline CityIndex on a small city list"""
+import gzip
+import json
+import os
+
+import pytest
+
+from weather_cities import CityIndex
+
+CITIES = [
+    {'id': 2643743, 'name': 'London', 'country': 'GB', 'coord': {'lat': 51.5085, 'lon': -0.1257}},
+    {'id': 6058560, 'name': 'London', 'state': '', 'country': 'CA', 'coord': {'lat': 42.9834, 'lon': -81.233}},
+    {'id': 2643741, 'name': 'City of London', 'country': 'GB', 'coord': {'lat': 51.5128, 'lon': -0.0918}},
+    {'id': 5746545, 'name': 'Portland', 'state': 'OR', 'country': 'US', 'coord': {'lat': 45.5234, 'lon': -122.6762}},
+    {'id': 4975802, 'name': 'Portland', 'state': 'ME', 'country': 'US', 'coord': {'lat': 43.6615, 'lon': -70.2553}},
+    {'id': 3143244, 'name': 'Oslo', 'country': 'NO', 'coord': {'lat': 59.9127, 'lon': 10.7461}},
+    # The real list repeats some cities under the same ID
+    {'id': 3143244, 'name': 'Oslo', 'country': 'NO', 'coord': {'lat': 59.9127, 'lon': 10.7461}},
+    {'id': 2988507, 'name': 'Paris', 'country': 'FR', 'coord': {'lat': 48.8534, 'lon': 2.3488}},
+    {'id': 4717560, 'name': 'Paris', 'state': 'TX', 'country': 'US', 'coord': {'lat': 33.6609, 'lon': -95.5555}},
+    {'id': 1, 'name': '', 'country': 'XX', 'coord': {'lat': 0, 'lon': 0}}
+]
+
+
+@pytest.fixture
+def city_list(tmp_path):
+    path = str(tmp_path / 'city.list.json.gz')
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(CITIES, f)
+    return path
+
+
+@pytest.fixture
+def index(city_list):
+    index = CityIndex(city_list)
+    assert index.load()
+    return index
+
+
+def test_index_is_unavailable_until_loaded(city_list, tmp_path):
+    index = CityIndex(city_list)
+    assert index.resolve('London') == ('unavailable',)
+    assert index.complete('Lon') == []
+    
+    assert not CityIndex(str(tmp_path / 'missing.json')).load()
+
+
+def test_complete_lists_distinct_labels_by_prefix(index):
+    assert index.complete('lon') == ['London, CA', 'London, GB']
+    assert index.complete('  PORT') == ['Portland, ME, US', 'Portland, OR, US']
+    assert index.complete('o', limit=1) == ['Oslo, NO']
+    assert index.complete('Oslo') == ['Oslo, NO']
+    assert index.complete('xyz') == []
+    assert index.complete(' ') == []
+
+
+def test_resolve_unique_ambiguous_and_unknown_names(index):
+    assert index.resolve('oslo') == ('found', 3143244, 59.9127, 10.7461)
+    assert index.resolve('London') == ('ambiguous',)
+    assert index.resolve('Londres') == ('unknown',)
+    
+    # Prefixes complete but do not resolve
+    assert index.resolve('Lond') == ('unknown',)
+
+
+def test_country_and_state_qualifiers_pick_one_city(index):
+    assert index.resolve('London, GB')[:2] == ('found', 2643743)
+    assert index.resolve('london , ca')[:2] == ('found', 6058560)
+    assert index.resolve('Portland, US') == ('ambiguous',)
+    assert index.resolve('Portland, OR, US')[:2] == ('found', 5746545)
+    assert index.resolve('Paris, TX')[:2] == ('found', 4717560)
+    assert index.resolve('London, FR') == ('unknown',)
+    
+    assert index.place('Paris, FR') == {'id': 2988507, 'name': 'Paris', 'country': 'FR', 'lat': 48.8534,
+                                        'lon': 2.3488}
+    assert index.place('Paris') is None
+
+
+def test_sorted_cache_is_written_and_reused(index, city_list):
+    assert os.path.exists(city_list + '.index')
+    
+    # A city list older than the cache is not parsed again
+    with open(city_list, 'wb') as f:
+        f.write(b'not gzip')
+    modified = os.path.getmtime(city_list + '.index') - 10
+    os.utime(city_list, (modified, modified))
+    
+    cached = CityIndex(city_list)
+    assert cached.load()
+    assert cached.keys == index.keys
+    assert list(cached.ids) == list(index.ids)
+    assert cached.resolve('Oslo') == index.resolve('Oslo')
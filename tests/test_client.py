@@ -0,0 +1,116 @@
+"""Tests for retries, Retry-After and the shared rate limiter against scripted stub responses"""
+import threading
+import time
+
+import pytest
+
+from weather_core import MAX_RETRIES, ApiError, RateLimited, TokenBucket
+
+PARAMS = {'q': 'London', 'appid': 'test', 'units': 'metric'}
+
+
+def get(client, endpoint='weather'):
+    return client.api_get(client.provider.url(endpoint), PARAMS)
+
+
+def test_retry_after_is_honoured_for_server_errors(stub, client):
+    stub.script('/data/2.5/weather', [(503, 1)])
+    
+    started = time.monotonic()
+    response = get(client)
+    
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.9
+    assert stub.counts == {'errors': 1, 'weather': 1}
+
+
+def test_retry_after_on_429_is_reported_as_queue_wait(stub, client):
+    stub.script('/data/2.5/weather', [(429, 1), (200, None)])
+    
+    response = get(client)
+    
+    assert response.status_code == 200
+    assert response.queue_wait >= 0.9
+    assert client.rate_limiter.stats()['calls'] == 2
+
+
+def test_gives_up_after_max_retries(stub, client):
+    stub.script('/data/2.5/weather', [(503, 0)] * (MAX_RETRIES + 1))
+    
+    response = get(client)
+    
+    assert response.status_code == 503
+    assert stub.counts == {'errors': MAX_RETRIES + 1}
+    with pytest.raises(ApiError) as error:
+        client.provider.check_response(response, 'weather data', 'London')
+    assert error.value.retryable
+
+
+def test_exhausted_rate_limit_is_a_typed_error(stub, client):
+    stub.script('/data/2.5/weather', [(429, 0)] * (MAX_RETRIES + 1))
+    
+    current_data, forecast_data, error = client.fetch_weather('London', 'test')
+    
+    assert current_data is None
+    assert forecast_data is not None
+    assert isinstance(error, RateLimited)
+    assert stub.counts['errors'] == MAX_RETRIES + 1
+
+
+def test_non_retryable_status_is_not_retried(stub, client):
+    stub.script('/data/2.5/weather', [(400, None)])
+    
+    assert get(client).status_code == 400
+    assert stub.counts == {'errors': 1}
+
+
+def test_scripts_run_out_to_normal_responses(stub, client):
+    stub.script('/data/2.5/forecast', [(200, None), (502, 0)])
+    
+    assert get(client, 'forecast').status_code == 200
+    assert get(client, 'forecast').status_code == 200
+    assert stub.counts == {'forecast': 2, 'errors': 1}
+
+
+def test_hold_pauses_other_callers():
+    bucket = TokenBucket(calls_per_minute=60000, burst=100)
+    bucket.hold(0.3)
+    
+    waits = []
+    thread = threading.Thread(target=lambda: waits.append(bucket.acquire()))
+    thread.start()
+    thread.join()
+    
+    assert waits[0] >= 0.25
+    assert bucket.stats()['max_wait'] >= 0.25
+
+
+def test_429_pauses_calls_from_other_threads(stub, client):
+    stub.script('/data/2.5/weather', [(429, 1)])
+    
+    thread = threading.Thread(target=get, args=(client,))
+    thread.start()
+    deadline = time.monotonic() + 5
+    while client.rate_limiter.held_until <= time.monotonic() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    
+    response = get(client, 'forecast')
+    thread.join()
+    
+    assert response.status_code == 200
+    assert response.queue_wait >= 0.5
+    assert stub.counts == {'errors': 1, 'weather': 1, 'forecast': 1}
+
+
+def test_queue_wait_reports_time_waiting_for_tokens(stub, client):
+    # One call at once, refilling every 0.1 s
+    client.rate_limiter = TokenBucket(calls_per_minute=600, burst=1)
+    
+    waits = [get(client).queue_wait for _ in range(3)]
+    
+    assert waits[0] < 0.05
+    assert all(0.05 <= wait < 0.5 for wait in waits[1:])
+    stats = client.rate_limiter.stats()
+    assert stats['calls'] == 3
+    assert stats['waiting'] == 0
+    assert stats['max_wait'] >= 0.05
@@ -0,0 +1,35 @@
+"""Tests that a search sends its current weather and forecast requests at once"""
+import pytest
+
+from weather_bench import bench_rtt, stub_client
+from weather_stub import StubServer
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def slow_client(tmp_path):
+    """A WeatherClient for a stub that answers every request after LATENCY seconds"""
+    server = StubServer(latency=LATENCY).start()
+    client = stub_client(server.url, str(tmp_path))
+    yield client
+    client.close()
+    server.stop()
+
+
+def test_search_costs_one_round_trip(slow_client):
+    sequential, concurrent = bench_rtt(slow_client, 3, 'test')
+    
+    # About 2 x latency one after the other, about 1 x latency at once
+    assert min(sequential) >= 2 * LATENCY
+    assert LATENCY <= min(concurrent) < 1.5 * LATENCY
+
+
+def test_partial_result_when_one_request_fails(stub, client):
+    stub.script('/data/2.5/forecast', [(400, None)])
+    
+    current_data, forecast_data, error = client.fetch_weather('London', 'test')
+    
+    assert current_data['name'] == 'London'
+    assert forecast_data is None
+    assert error.kind == 'api'
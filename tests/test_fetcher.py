@@ -0,0 +1,85 @@
+"""Tests for FetchCoordinator: joining identical queries and dropping superseded ones"""
+import threading
+import time
+
+import pytest
+
+from weather_core import FetchCoordinator, WorkerPool
+
+
+@pytest.fixture
+def fetcher():
+    """A coordinator on one worker with room for one queued query, held busy until `release` is set"""
+    pool = WorkerPool(1, 1, name='test-fetch')
+    release = threading.Event()
+    pool.submit(release.wait)
+    deadline = time.monotonic() + 5
+    while not pool.stats()['busy'] and time.monotonic() < deadline:
+        time.sleep(0.005)
+    
+    fetcher = FetchCoordinator(pool)
+    fetcher.release = release
+    fetcher.calls = []
+    yield fetcher
+    release.set()
+    pool.shutdown()
+
+
+def lookup(fetcher, city):
+    fetcher.calls.append(city)
+    return city.upper()
+
+
+def test_identical_query_in_flight_is_joined(fetcher):
+    first_ticket, first = fetcher.submit('london', lookup, fetcher, 'london')
+    second_ticket, second = fetcher.submit('london', lookup, fetcher, 'london')
+    
+    assert second is first
+    assert second_ticket > first_ticket
+    assert fetcher.pool.stats()['queue_depth'] == 1
+    
+    fetcher.release.set()
+    assert second.result(timeout=5) == 'LONDON'
+    assert fetcher.calls == ['london']
+
+
+def test_only_the_newest_ticket_is_current(fetcher):
+    london_ticket, _ = fetcher.submit('london', lookup, fetcher, 'london')
+    assert fetcher.is_current(london_ticket)
+    
+    paris_ticket, _ = fetcher.submit('paris', lookup, fetcher, 'paris')
+    assert not fetcher.is_current(london_ticket)
+    assert fetcher.is_current(paris_ticket)
+    
+    # A query answered from the cache makes every outstanding ticket stale
+    fetcher.supersede()
+    assert not fetcher.is_current(paris_ticket)
+
+
+def test_superseded_query_is_dropped_from_a_full_queue(fetcher):
+    _, london = fetcher.submit('london', lookup, fetcher, 'london')
+    _, paris = fetcher.submit('paris', lookup, fetcher, 'paris')
+    
+    assert london.cancelled()
+    assert 'london' not in fetcher.in_flight
+    
+    fetcher.release.set()
+    assert paris.result(timeout=5) == 'PARIS'
+    assert fetcher.calls == ['paris']
+
+
+def test_finished_query_is_fetched_again(fetcher):
+    fetcher.release.set()
+    _, first = fetcher.submit('london', lookup, fetcher, 'london')
+    first.result(timeout=5)
+    
+    # The done callback that forgets the query may run just after result() returns
+    deadline = time.monotonic() + 5
+    while 'london' in fetcher.in_flight and time.monotonic() < deadline:
+        time.sleep(0.005)
+    
+    _, second = fetcher.submit('london', lookup, fetcher, 'london')
+    
+    assert second is not first
+    assert second.result(timeout=5) == 'LONDON'
+    assert fetcher.calls == ['london', 'london']
@@ -0,0 +1,131 @@
+"""Tests for day bucketing by the forecast location's UTC offset"""
+from datetime import date
+import time
+
+import pytest
+
+from weather_core import (
+    aggregate_daily, daily_forecast, forecast_columns, forecast_model, forecast_utc_offset, local_date,
+    location_today
+)
+
+# 2024-01-15 00:00 UTC
+START = 1705276800
+SYDNEY = 11 * 3600
+LOS_ANGELES = -8 * 3600
+
+
+@pytest.fixture
+def host_timezone(monkeypatch):
+    """Set this process's timezone, restoring it afterwards"""
+    def set_timezone(name):
+        monkeypatch.setenv('TZ', name)
+        time.tzset()
+    
+    yield set_timezone
+    monkeypatch.undo()
+    time.tzset()
+
+
+def make_forecast(utc_offset, slots=16, start=START):
+    """Return a forecast payload with 3-hourly slots whose temperature is the slot index"""
+    items = []
+    for i in range(slots):
+        item = {
+            'dt': start + i * 10800,
+            'main': {'temp': float(i), 'humidity': 50 + i},
+            'wind': {'speed': 2.0},
+            'weather': [{'icon': '01d' if i % 3 else '10d', 'description': 'clear sky' if i % 3 else 'rain'}],
+            'pop': 0.1
+        }
+        if i == 4:
+            item['rain'] = {'3h': 1.5}
+        items.append(item)
+    return {'list': items, 'city': {'name': 'Test', 'timezone': utc_offset}}
+
+
+def test_forecast_utc_offset_uses_city_timezone(host_timezone):
+    host_timezone('UTC')
+    assert forecast_utc_offset(make_forecast(SYDNEY)) == SYDNEY
+    assert forecast_utc_offset(make_forecast(LOS_ANGELES)) == LOS_ANGELES
+
+
+def test_forecast_utc_offset_falls_back_to_host(host_timezone):
+    host_timezone('EST+5')
+    data = make_forecast(SYDNEY)
+    del data['city']['timezone']
+    assert forecast_utc_offset(data) == -5 * 3600
+
+
+def test_days_east_of_utc(host_timezone):
+    # Slots start at 11:00 local time, so the first day holds 5 slots (11:00 to 23:00)
+    host_timezone('America/Los_Angeles')
+    days = daily_forecast(make_forecast(SYDNEY))
+    
+    assert [day['date'] for day in days] == [date(2024, 1, 15), date(2024, 1, 16), date(2024, 1, 17)]
+    assert [(day['min_temp'], day['max_temp']) for day in days] == [(0, 4), (5, 12), (13, 15)]
+    assert days[0]['mean_temp'] == 2
+    assert days[0]['precipitation'] == 1.5
+    assert days[0]['weather']['icon'] == '01d'
+
+
+def test_days_west_of_utc(host_timezone):
+    # Slots start at 16:00 local time the day before, so the first day holds 3 slots
+    host_timezone('Australia/Sydney')
+    days = daily_forecast(make_forecast(LOS_ANGELES))
+    
+    assert [day['date'] for day in days] == [date(2024, 1, 14), date(2024, 1, 15), date(2024, 1, 16)]
+    assert [(day['min_temp'], day['max_temp']) for day in days] == [(0, 2), (3, 10), (11, 15)]
+    assert days[1]['precipitation'] == 1.5
+
+
+def test_days_do_not_depend_on_host_timezone(host_timezone):
+    results = []
+    for name in ('UTC', 'Australia/Sydney', 'America/Los_Angeles'):
+        host_timezone(name)
+        results.append([daily_forecast(make_forecast(offset)) for offset in (SYDNEY, LOS_ANGELES)])
+    assert results[0] == results[1] == results[2]
+
+
+def test_aggregate_daily_splits_at_the_given_offset():
+    columns = forecast_columns(make_forecast(0))
+    
+    assert [day['date'] for day in aggregate_daily(columns, SYDNEY, days=2)] == [date(2024, 1, 15), date(2024, 1, 16)]
+    assert [day['date'] for day in aggregate_daily(columns, LOS_ANGELES, days=2)] == [
+        date(2024, 1, 14), date(2024, 1, 15)
+    ]
+    assert aggregate_daily(forecast_columns(make_forecast(0, slots=0)), 0) == []
+
+
+def test_forecast_model_days_start_at_local_midnight():
+    model = forecast_model(make_forecast(SYDNEY))
+    assert model['utc_offset'] == SYDNEY
+    assert [local_date(day['dt'], SYDNEY) for day in model['daily']] == [
+        date(2024, 1, 15), date(2024, 1, 16), date(2024, 1, 17)
+    ]
+
+
+def test_location_today(host_timezone):
+    host_timezone('Europe/Berlin')
+    # 2024-01-15 10:00 UTC is 21:00 in Sydney and 02:00 in Los Angeles
+    now = START + 10 * 3600
+    assert location_today(SYDNEY, now=now) == date(2024, 1, 15)
+    assert location_today(LOS_ANGELES, now=now) == date(2024, 1, 15)
+    
+    # 2024-01-15 14:00 UTC is already the 16th in Sydney
+    now = START + 14 * 3600
+    assert location_today(SYDNEY, now=now) == date(2024, 1, 16)
+    assert location_today(LOS_ANGELES, now=now) == date(2024, 1, 15)
+    
+    # 2024-01-15 06:00 UTC is still the 14th in Los Angeles
+    now = START + 6 * 3600
+    assert location_today(LOS_ANGELES, now=now) == date(2024, 1, 14)
+    assert location_today(0, now=now) == date(2024, 1, 15)
+
+
+def test_local_date():
+    assert local_date(START - 1, 0) == date(2024, 1, 14)
+    assert local_date(START, 0) == date(2024, 1, 15)
+    assert local_date(START + 13 * 3600, SYDNEY) == date(2024, 1, 16)
+    assert local_date(START + 7 * 3600, LOS_ANGELES) == date(2024, 1, 14)
+    assert local_date(START + 8 * 3600, LOS_ANGELES) == date(2024, 1, 15)
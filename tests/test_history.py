@@ -0,0 +1,83 @@
+"""Tests for history keys and local-day rollups in HistoryStore"""
+import time
+
+from weather_history import HistoryStore
+
+# A UTC midnight well inside the retention window would be pruned; this one never is
+DAY = 86400
+MIDNIGHT = 20000 * DAY
+
+
+def model(city_id, name, country, utc_offset, dt, temp=10.0):
+    return {'id': city_id, 'name': name, 'country': country, 'utc_offset': utc_offset, 'dt': dt,
+            'temp': temp, 'humidity': 50, 'pressure': 1000, 'wind_speed': 1.0}
+
+
+def test_searches_and_groups_share_a_key(client):
+    current_data, _, error = client.fetch_weather('London', 'test')
+    assert error is None
+    client.fetch_group([current_data['id']], 'test')
+    client.fetch_weather('london ', 'test')
+    
+    assert [place['city'] for place in client.history.cities()] == [str(current_data['id'])]
+    assert client.history.place(str(current_data['id']))['utc_offset'] == current_data['utc_offset']
+
+
+def test_name_and_country_pick_one_place(tmp_path):
+    history = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    history.add_current(model(1, 'Paris', 'FR', 3600, MIDNIGHT))
+    history.add_current(model(2, 'Paris', 'US', -21600, MIDNIGHT))
+    
+    assert history.place('paris, us')['city'] == '2'
+    assert history.place(' Paris , fr ')['city'] == '1'
+    assert history.place('Lyon') is None
+    assert history.series('Lyon', 0, MIDNIGHT) == history.series('3', 0, MIDNIGHT)
+
+
+def test_daily_buckets_start_at_local_midnight(tmp_path):
+    history = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    for city_id, utc_offset in ((1, 11 * 3600), (2, -8 * 3600)):
+        local_midnight = MIDNIGHT - utc_offset
+        for hour in range(-2, 26):
+            history.add_current(model(city_id, f"City {city_id}", 'XX', utc_offset, local_midnight + hour * 3600))
+        
+        series = history.series(str(city_id), local_midnight - DAY, local_midnight + DAY, 'day')
+        assert series['dt'] == [local_midnight - DAY, local_midnight, local_midnight + DAY]
+        assert series['samples'] == [2, 24, 2]
+        
+        # A start inside a local day still includes that day's bucket
+        assert history.series(str(city_id), local_midnight + 3600, local_midnight + DAY, 'day')['dt'][0] \
+            == local_midnight
+
+
+def test_payloads_without_a_timezone_keep_the_known_offset(tmp_path):
+    history = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    history.add_current(model(1, 'Sydney', 'AU', 11 * 3600, MIDNIGHT))
+    history.add_current(model(1, 'Sydney', 'AU', None, MIDNIGHT + 3600))
+    
+    assert history.place('Sydney')['utc_offset'] == 11 * 3600
+    assert history.series('Sydney', 0, MIDNIGHT + DAY, 'day')['dt'] == [MIDNIGHT - 11 * 3600]
+
+
+def test_places_with_and_without_an_id_are_merged(tmp_path):
+    # Recent samples, so the raw rows are still there to be moved
+    today = int(time.time()) // DAY * DAY
+    for first, second in ((None, 2643743), (2643743, None)):
+        history = HistoryStore(str(tmp_path / f"{first}.sqlite3"))
+        history.add_current(model(first, 'London', 'GB', 3600, today))
+        history.flush()
+        history.add_current(model(second, 'London', 'GB', None, today + 60))
+        
+        assert [place['city'] for place in history.cities()] == ['2643743']
+        assert history.place('London, GB')['utc_offset'] == 3600
+        assert history.series('London, GB', 0, today + DAY, 'raw')['dt'] == [today, today + 60]
+        assert history.series('London, GB', 0, today + DAY, 'day')['samples'] == [2]
+
+
+def test_ambiguous_names_are_not_merged(tmp_path):
+    history = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    history.add_current(model(1, 'Portland', 'US', -28800, MIDNIGHT))
+    history.add_current(model(2, 'Portland', 'US', -18000, MIDNIGHT))
+    history.add_current(model(None, 'Portland', 'US', -28800, MIDNIGHT))
+    
+    assert sorted(place['city'] for place in history.cities()) == ['1', '2', 'portland, us']
@@ -0,0 +1,91 @@
+"""Tests for IconCache's size accounting and eviction, with PhotoImages that only read PNG headers"""
+import struct
+
+import pytest
+
+tk = pytest.importorskip('tkinter')
+import weather_icons  # noqa: E402
+from weather_icons import IconCache  # noqa: E402
+from weather_stub import icon_png  # noqa: E402
+
+ICON_BYTES = 100 * 100 * 4
+
+
+class FakePhotoImage:
+    """A PhotoImage of a PNG file's size, without Tk"""
+    
+    def __init__(self, master=None, file=None, size=None):
+        if size is None:
+            with open(file, 'rb') as f:
+                size, _ = struct.unpack('>II', f.read(24)[16:24])
+        self.size = size
+    
+    def width(self):
+        return self.size
+    
+    def height(self):
+        return self.size
+    
+    def subsample(self, factor):
+        return FakePhotoImage(size=self.size // factor)
+
+
+@pytest.fixture
+def make_cache(monkeypatch, tmp_path):
+    """Build IconCaches over a directory of 100 x 100 icons"""
+    monkeypatch.setattr(weather_icons.tk, 'PhotoImage', FakePhotoImage)
+    for code in ('01d', '02d', '03d'):
+        (tmp_path / f"{code}.png").write_bytes(icon_png(code))
+    
+    def make_cache(max_bytes=weather_icons.ICON_CACHE_BYTES):
+        return IconCache(None, str(tmp_path), max_bytes)
+    
+    return make_cache
+
+
+def counted_bytes(cache):
+    return sum(image.width() * image.height() * 4 for image in cache.images.values())
+
+
+def test_icon_at_file_size_is_counted_once(make_cache):
+    cache = make_cache()
+    
+    image = cache.get('01d', 100)
+    
+    assert cache.get('01d', 100) is image
+    assert cache.stats()['images'] == 1
+    assert cache.stats()['bytes'] == ICON_BYTES
+
+
+def test_scaled_sizes_share_the_decoded_source(make_cache):
+    cache = make_cache()
+    
+    assert cache.get('01d', 50).width() == 50
+    assert cache.get('01d', 25).width() == 25
+    assert cache.get('01d', 50) is cache.get('01d', 50)
+    
+    assert set(cache.images) == {('01d', 100), ('01d', 50), ('01d', 25)}
+    assert cache.stats()['bytes'] == counted_bytes(cache) == ICON_BYTES + 50 * 50 * 4 + 25 * 25 * 4
+
+
+def test_least_recently_used_icon_is_evicted(make_cache):
+    cache = make_cache(max_bytes=2 * ICON_BYTES)
+    cache.get('01d', 100)
+    cache.get('02d', 100)
+    cache.get('01d', 100)
+    
+    cache.get('03d', 100)
+    
+    assert list(cache.images) == [('01d', 100), ('03d', 100)]
+    assert cache.stats()['bytes'] == counted_bytes(cache) == 2 * ICON_BYTES
+
+
+def test_missing_icon_is_skipped_until_reload(make_cache, tmp_path):
+    cache = make_cache()
+    
+    assert cache.get('04d', 100) is None
+    (tmp_path / '04d.png').write_bytes(icon_png('04d'))
+    assert cache.get('04d', 100) is None
+    
+    cache.reload()
+    assert cache.get('04d', 100).width() == 100
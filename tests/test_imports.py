@@ -0,0 +1,34 @@
+"""Tests that the headless modules load without the GUI libraries"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from weather_bench import GUI_MODULES, import_times
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_packages(module):
+    """Import a module in a fresh interpreter and return the top-level packages it loaded"""
+    code = f"import sys, {module}; print(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return {name.split('.')[0] for name in result.stdout.split()}
+
+
+@pytest.mark.parametrize('module', ['weather_core', 'weather', 'weather_history', 'weather_metrics'])
+def test_headless_modules_skip_gui_libraries(module):
+    assert not loaded_packages(module) & set(GUI_MODULES)
+
+
+def test_gui_module_loads_tkinter():
+    # The check above would pass vacuously if tkinter were never seen
+    assert 'tkinter' in loaded_packages('weather_gui')
+
+
+def test_importtime_of_core_path():
+    times = import_times('weather_core')
+    
+    assert times['weather_core'] > 0
+    assert not {name.split('.')[0] for name in times} & set(GUI_MODULES)
@@ -0,0 +1,51 @@
+"""Tests for the span metrics and component counters"""
+from weather_metrics import Metrics, metrics, percentile
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([1, 2], 0.5) == 1
+    assert percentile([1, 2, 3, 4, 5, 6], 0.5) == 3
+    assert percentile([1, 2, 3, 4, 5, 6], 0.95) == 6
+    assert percentile([5, 1, 3], 0.0) == 1
+    assert percentile([5, 1, 3], 1.0) == 5
+
+
+def test_summary_keeps_recent_samples_and_full_counts():
+    metrics = Metrics(max_samples=100)
+    for value in range(1, 201):
+        metrics.record('fetch', value)
+    summary = metrics.summary()['fetch']
+    assert summary['count'] == 200
+    assert summary['sum'] == sum(range(1, 201))
+    assert summary['p50'] == 150
+    assert summary['p95'] == 195
+
+
+def test_components_are_read_when_shown():
+    metrics = Metrics()
+    queue = {'queue_depth': 0, 'rejected': 0}
+    metrics.register('search_pool', lambda: dict(queue))
+    metrics.register('response_cache', lambda: {'hits': 3, 'utilization': 0.25})
+    queue['rejected'] = 2
+    
+    assert metrics.component_stats() == {
+        'response_cache': {'hits': 3, 'utilization': 0.25},
+        'search_pool': {'queue_depth': 0, 'rejected': 2}
+    }
+    assert "search_pool: queue_depth 0, rejected 2" in metrics.table()
+    assert "response_cache: hits 3, utilization 0.25" in metrics.table()
+    assert "weather_search_pool_rejected 2\n" in metrics.prometheus()
+    
+    # Registering a name again replaces it; resetting the timings keeps it
+    metrics.register('search_pool', lambda: {'queue_depth': 5})
+    metrics.reset()
+    assert metrics.component_stats()['search_pool'] == {'queue_depth': 5}
+
+
+def test_client_reports_its_cache_and_rate_limiter(client):
+    client.fetch_weather('London', 'test')
+    client.fetch_weather('London', 'test')
+    
+    components = metrics.component_stats()
+    assert components['response_cache']['hits'] >= 1
+    assert components['rate_limiter']['calls'] == client.rate_limiter.stats()['calls'] > 0
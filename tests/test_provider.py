@@ -0,0 +1,100 @@
+"""Tests for plugging weather providers into WeatherClient"""
+import gzip
+import json
+
+import pytest
+
+from weather_cities import CityIndex
+from weather_core import OpenWeatherMapProvider, WeatherClient, WeatherProvider
+
+
+class CannedProvider(WeatherProvider):
+    """Answers every city from memory, counting the fetches"""
+    
+    def __init__(self, get, cities, host, backend):
+        super().__init__(get, cities, host, backend)
+        self.fetched = []
+    
+    def url(self, endpoint):
+        return f"{self.host}/{endpoint}"
+    
+    def icon_url(self, icon_code):
+        return f"{self.host}/icons/{icon_code}.png"
+    
+    def endpoints(self, parts):
+        return list(parts)
+    
+    def fetch_endpoint(self, endpoint, city, api_key):
+        return {}
+    
+    def fetch_models(self, endpoint, city, api_key):
+        self.fetched.append((endpoint, city))
+        if endpoint == 'weather':
+            return {'weather': {'id': None, 'name': city, 'country': 'US', 'utc_offset': 0, 'dt': 0, 'temp': 20.0,
+                                'humidity': 50, 'pressure': 1000, 'wind_speed': 1.0}}
+        return {'forecast': {'id': None, 'name': city, 'country': 'US', 'utc_offset': 0,
+                             'hourly': {'dt': [], 'temp': [], 'humidity': [], 'wind_speed': []}, 'daily': []}}
+    
+    def fetch_group(self, city_ids, api_key):
+        return {}
+    
+    def city_id(self, city):
+        return None
+
+
+def test_client_uses_the_given_provider(tmp_path):
+    client = WeatherClient(str(tmp_path / 'store.sqlite3'), host='http://127.0.0.1:9', provider=CannedProvider,
+                           history_path=str(tmp_path / 'history.sqlite3'))
+    try:
+        assert client.provider.host == 'http://127.0.0.1:9'
+        current_data, forecast_data, error = client.fetch_weather('Springfield', 'test')
+        assert error is None
+        assert current_data['name'] == 'Springfield'
+        assert forecast_data['daily'] == []
+        
+        # The second search is answered from the client's cache
+        client.fetch_weather('Springfield', 'test')
+        assert sorted(client.provider.fetched) == [('forecast', 'Springfield'), ('weather', 'Springfield')]
+    finally:
+        client.close()
+
+
+def test_incomplete_providers_cannot_be_created():
+    with pytest.raises(TypeError, match='abstract'):
+        WeatherProvider(None, None, 'http://127.0.0.1:9/', 'forecast')
+    
+    class NoGroups(CannedProvider):
+        fetch_group = WeatherProvider.fetch_group
+    
+    with pytest.raises(TypeError, match='fetch_group'):
+        NoGroups(None, None, 'http://127.0.0.1:9/', 'forecast')
+    
+    provider = CannedProvider(None, None, 'http://127.0.0.1:9/', 'forecast')
+    assert provider.host == 'http://127.0.0.1:9'
+    assert provider.recorder is None
+
+
+def test_openweathermap_provider_urls(client):
+    assert isinstance(client.provider, OpenWeatherMapProvider)
+    assert client.provider.url('onecall').endswith('/data/3.0/onecall')
+    assert client.provider.url('forecast').endswith('/data/2.5/forecast')
+    assert client.provider.icon_url('01d').endswith('/img/wn/01d@2x.png')
+
+
+def test_geocoded_places_take_their_id_from_the_index(tmp_path):
+    path = str(tmp_path / 'city.list.json.gz')
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump([{'id': 2643743, 'name': 'London', 'country': 'GB', 'coord': {'lat': 51.5, 'lon': -0.1}},
+                   {'id': 6058560, 'name': 'London', 'country': 'CA', 'coord': {'lat': 43.0, 'lon': -81.2}}], f)
+    cities = CityIndex(path)
+    assert cities.load()
+    
+    class Geocoded:
+        status_code = 200
+        
+        def json(self):
+            return [{'name': 'London', 'country': 'GB', 'lat': 51.5, 'lon': -0.1}]
+    
+    # "London" is ambiguous in the index, so the geocoder picks the city
+    provider = OpenWeatherMapProvider(lambda url, params: Geocoded(), cities, backend='onecall')
+    assert provider.locate('London', 'test')['id'] == 2643743
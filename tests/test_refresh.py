@@ -0,0 +1,104 @@
+"""Tests for the auto-refresh timers of the watched city, without a display"""
+import threading
+import time
+
+import pytest
+
+
+class FakeLabel:
+    def pack_forget(self):
+        pass
+
+
+@pytest.fixture
+def make_app(make_app):
+    """Build WeatherApps with the state the refresh code uses, recording what they show"""
+    
+    def make_refresh_app(backend='forecast', workers=1):
+        app = make_app(backend, workers)
+        app.watched = None
+        app.refresh_jobs = {}
+        app.display_digests = {}
+        app.city_errors = {}
+        app.status_label = FakeLabel()
+        
+        app.rendered = []
+        app.errors = []
+        app.show_current_weather = lambda data: app.rendered.append('weather')
+        app.show_forecast = lambda data: app.rendered.append('forecast')
+        app.report_city_error = lambda city, error, refresh=False: app.errors.append(error)
+        app.clear_city_error = lambda city: None
+        return app
+    
+    return make_refresh_app
+
+
+def finish_updates(app):
+    """Wait for a worker result to be posted, then apply it as the GUI tick would"""
+    deadline = time.monotonic() + 5
+    while not app.updates.stats()['pending'] and time.monotonic() < deadline:
+        time.sleep(0.005)
+    app.apply_updates()
+    assert app.root.errors == []
+
+
+def test_forecast_backend_has_a_timer_per_endpoint(make_app):
+    app = make_app()
+    current_data, forecast_data, _ = app.client.fetch_weather('London', 'test')
+    app.watch_city('London', 'test', current_data, forecast_data)
+    assert sorted(app.refresh_jobs) == ['forecast', 'weather']
+
+
+def test_onecall_backend_has_one_timer_refreshing_both_parts(stub, make_app):
+    app = make_app('onecall')
+    current_data, forecast_data, _ = app.client.fetch_weather('London', 'test')
+    app.watch_city('London', 'test', current_data, forecast_data)
+    assert list(app.refresh_jobs) == ['onecall']
+    
+    app.auto_refresh('onecall')
+    finish_updates(app)
+    
+    assert app.rendered == ['weather', 'forecast']
+    assert list(app.refresh_jobs) == ['onecall']
+    assert stub.counts['onecall'] == 2
+    
+    # The same data again is not rendered again
+    app.auto_refresh('onecall')
+    finish_updates(app)
+    assert app.rendered == ['weather', 'forecast']
+    assert app.errors == []
+
+
+def test_cancelled_refresh_is_rescheduled_silently(make_app):
+    app = make_app()
+    current_data, forecast_data, _ = app.client.fetch_weather('London', 'test')
+    app.watch_city('London', 'test', current_data, forecast_data)
+    
+    # Keep the only worker busy so the refresh waits in the queue, then let
+    # a search push it out as the GUI's searches do
+    release = threading.Event()
+    app.workers.submit(release.wait)
+    while not app.workers.stats()['busy']:
+        time.sleep(0.005)
+    app.auto_refresh('weather')
+    app.workers.submit(time.sleep, 0, drop_oldest=True)
+    finish_updates(app)
+    release.set()
+    
+    assert app.workers.stats()['dropped'] == 1
+    assert app.errors == []
+    assert app.rendered == []
+    assert sorted(app.refresh_jobs) == ['forecast', 'weather']
+
+
+def test_failed_refresh_is_reported_and_rescheduled(stub, make_app):
+    app = make_app()
+    current_data, forecast_data, _ = app.client.fetch_weather('London', 'test')
+    app.watch_city('London', 'test', current_data, forecast_data)
+    stub.script('/data/2.5/weather', [(400, None)])
+    
+    app.auto_refresh('weather')
+    finish_updates(app)
+    
+    assert [error.kind for error in app.errors] == ['api']
+    assert 'weather' in app.refresh_jobs
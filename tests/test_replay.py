@@ -0,0 +1,112 @@
+"""Replay recorded payloads and stub models through the display, as weather_bench.py
+--replay and --widget-refresh do
+
+The display tests need an X display, e.g. `xvfb-run python -m pytest`, and
+are skipped without one. With pytest-benchmark installed the render timing
+test reports through it.
+"""
+import pytest
+
+from weather_bench import count_widgets, load_fixtures, open_display, replay_display, synthetic_fixtures
+from weather_core import PayloadRecorder
+
+CITIES = ('London', 'Sydney', 'Los Angeles')
+REFRESHES = 1000
+
+
+@pytest.fixture
+def fixtures_dir(client, tmp_path):
+    """Record the stub's payloads for a few cities as fixtures"""
+    directory = str(tmp_path / 'fixtures')
+    client.provider.recorder = PayloadRecorder(directory)
+    for city in CITIES:
+        current_data, forecast_data, error = client.fetch_weather(city, 'test')
+        assert error is None
+    client.provider.recorder = None
+    return directory
+
+
+@pytest.fixture
+def app(client, tmp_path):
+    """A WeatherApp in a withdrawn window, built on the stub client and scratch stores"""
+    root = open_display()
+    if root is None:
+        pytest.skip("needs a display")
+    
+    from weather_gui import WeatherApp
+    app = WeatherApp(root, client, str(tmp_path / 'icons'))
+    yield app
+    app.close()
+
+
+@pytest.fixture
+def timed(request):
+    """pytest-benchmark's fixture when it is installed, otherwise one plain call"""
+    try:
+        return request.getfixturevalue('benchmark')
+    except pytest.FixtureLookupError:
+        return lambda function, *args: function(*args)
+
+
+def test_recorded_fixtures_pair_up(fixtures_dir):
+    fixtures = load_fixtures(fixtures_dir)
+    
+    assert sorted(current_data['name'] for _, current_data, _ in fixtures) == sorted(CITIES)
+    for city, current_data, forecast_data in fixtures:
+        assert set(forecast_data) == {'id', 'name', 'country', 'utc_offset', 'hourly', 'daily'}
+        assert len(forecast_data['daily']) >= 5
+
+
+def test_replay_keeps_widgets_and_memory_flat(app, fixtures_dir):
+    result = replay_display(app, app.root, load_fixtures(fixtures_dir), REFRESHES)
+    
+    assert len(result['timings']) == REFRESHES
+    assert result['widget_growth'] == 0
+    assert result['python_growth'] < 1024 * 1024
+
+
+def test_hourly_view_replay_keeps_widgets_flat(app, fixtures_dir):
+    fixtures = load_fixtures(fixtures_dir)
+    replay_display(app, app.root, fixtures, 1)
+    app.toggle_forecast_view()
+    
+    result = replay_display(app, app.root, fixtures, REFRESHES // 10)
+    assert result['widget_growth'] == 0
+    
+    app.toggle_forecast_view()
+    assert app.forecast_view == 'daily'
+
+
+def test_widget_refresh_builds_no_widgets(app):
+    result = replay_display(app, app.root, synthetic_fixtures(5), REFRESHES)
+    
+    assert result['widget_growth'] == 0
+
+
+def test_cards_change_only_with_the_day_count(app):
+    _, current_data, forecast_data = synthetic_fixtures(1)[0]
+    shorter = dict(forecast_data, daily=forecast_data['daily'][:4])
+    
+    app.update_weather_display(current_data, forecast_data)
+    widgets = count_widgets(app.root)
+    cards = [card['card'] for card in app.forecast_cards]
+    
+    app.update_weather_display(current_data, shorter)
+    assert len(app.forecast_cards) == 4
+    assert count_widgets(app.root) < widgets
+    
+    app.update_weather_display(current_data, forecast_data)
+    assert count_widgets(app.root) == widgets
+    assert [card['card'] for card in app.forecast_cards][:4] == cards[:4]
+
+
+def test_render_time(app, fixtures_dir, timed):
+    fixtures = load_fixtures(fixtures_dir)
+    replay_display(app, app.root, fixtures, 1)
+    _, current_data, forecast_data = fixtures[-1]
+    
+    def render():
+        app.update_weather_display(current_data, forecast_data)
+        app.root.update_idletasks()
+    
+    timed(render)
@@ -0,0 +1,42 @@
+"""Tests that API calls reuse the pooled keep-alive connections of the shared session"""
+import threading
+
+from weather_core import HTTP_POOL_SIZE
+
+PARAMS = {'q': 'London', 'appid': 'test', 'units': 'metric'}
+
+
+def test_sequential_calls_share_one_connection(stub, client):
+    for endpoint in ('weather', 'forecast') * 10:
+        assert client.api_get(client.provider.url(endpoint), PARAMS).status_code == 200
+    
+    assert stub.connections == 1
+
+
+def test_searches_reuse_connections(stub, client):
+    # Each search sends its two calls side by side, so at most two sockets are needed
+    for i in range(20):
+        current_data, forecast_data, error = client.fetch_weather(f"City {i}", 'test')
+        assert error is None
+    
+    assert stub.counts == {'weather': 20, 'forecast': 20}
+    assert stub.connections <= 2
+
+
+def test_pool_keeps_a_connection_per_concurrent_caller(stub, client):
+    barrier = threading.Barrier(HTTP_POOL_SIZE)
+    
+    def call():
+        for _ in range(2):
+            barrier.wait()
+            client.api_get(client.provider.url('weather'), PARAMS)
+    
+    threads = [threading.Thread(target=call) for _ in range(HTTP_POOL_SIZE)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # The second round finds every connection of the first one still pooled
+    assert stub.counts['weather'] == 2 * HTTP_POOL_SIZE
+    assert stub.connections <= HTTP_POOL_SIZE
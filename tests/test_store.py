@@ -0,0 +1,67 @@
+"""Tests for ForecastStore and WeatherClient.load_saved against a temporary SQLite file"""
+import sqlite3
+import time
+
+import pytest
+
+import weather_core
+from weather_core import ForecastStore
+from weather_stub import StubWeather
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """A store for two cities whose clock ticks one second per save"""
+    ticks = iter(range(1000, 2000))
+    monkeypatch.setattr(weather_core.time, 'time', lambda: next(ticks))
+    return ForecastStore(str(tmp_path / 'store.sqlite3'), max_cities=2)
+
+
+def test_saved_payloads_load_back(store):
+    store.save(' London ', {'temp': 12.5}, {'daily': [1, 2]})
+    
+    assert store.load('london') == ('london', 1000, {'temp': 12.5}, {'daily': [1, 2]})
+    assert store.load('Paris') is None
+
+
+def test_load_without_a_city_returns_the_newest(store):
+    store.save('London', {'temp': 1}, {})
+    store.save('Paris', {'temp': 2}, {})
+    
+    assert store.load()[0] == 'paris'
+
+
+def test_oldest_cities_past_the_limit_are_dropped(store):
+    store.save('London', {'temp': 1}, {})
+    store.save('Paris', {'temp': 2}, {})
+    store.save('London', {'temp': 3}, {})
+    
+    store.save('Oslo', {'temp': 4}, {})
+    
+    assert store.load('Paris') is None
+    assert store.load('London')[2] == {'temp': 3}
+    assert store.load('Oslo')[2] == {'temp': 4}
+
+
+def test_load_saved_normalizes_raw_payloads(client):
+    weather = StubWeather()
+    now = time.time()
+    client.store.save('London', weather.current('London', now), weather.forecast('London', now))
+    
+    city, saved_at, current_data, forecast_data = client.load_saved('London')
+    
+    assert city == 'london'
+    assert current_data['name'] == 'London'
+    assert set(forecast_data) == {'id', 'name', 'country', 'utc_offset', 'hourly', 'daily'}
+
+
+def test_load_saved_survives_missing_and_damaged_rows(client):
+    assert client.load_saved('London') is None
+    
+    client.store.save('London', {'temp': 1}, {})
+    conn = sqlite3.connect(client.store.path)
+    with conn:
+        conn.execute("UPDATE cities SET current = ?", (b'not zlib',))
+    conn.close()
+    
+    assert client.load_saved('London') is None
@@ -0,0 +1,111 @@
+"""Tests for the queue that carries worker results to the GUI thread and the tick that applies them"""
+import threading
+
+import pytest
+
+from weather_core import UI_TICK_MS, UpdateQueue
+
+
+@pytest.fixture
+def app(make_app):
+    """A WeatherApp with only the base state apply_updates uses"""
+    return make_app()
+
+
+def test_newest_update_per_key_wins():
+    updates = UpdateQueue()
+    for i in range(10):
+        updates.post(('display', 'london'), print, i)
+        updates.post(('display', 'paris'), print, -i)
+    
+    assert updates.drain() == [(print, (9,)), (print, (-9,))]
+    assert updates.drain() == []
+    assert updates.stats() == {'posted': 20, 'merged': 18, 'batches': 1, 'pending': 0}
+
+
+def test_concurrent_posts_are_applied_or_merged():
+    updates = UpdateQueue()
+    applied = []
+    
+    def post(worker):
+        for i in range(5000):
+            updates.post(('city', i % 50), applied.append, (worker, i))
+    
+    threads = [threading.Thread(target=post, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for function, args in updates.drain():
+            function(*args)
+    for thread in threads:
+        thread.join()
+    for function, args in updates.drain():
+        function(*args)
+    
+    stats = updates.stats()
+    assert stats['posted'] == 8 * 5000
+    assert len(applied) + stats['merged'] == stats['posted']
+    assert stats['pending'] == 0
+
+
+def test_tick_applies_a_batch_with_one_layout_pass(app):
+    shown = []
+    for i in range(5):
+        app.updates.post(('display', 'london'), shown.append, ('london', i))
+        app.updates.post(('display', 'paris'), shown.append, ('paris', i))
+    app.updates.post('status', shown.append, 'ready')
+    
+    app.apply_updates()
+    
+    assert shown == [('london', 4), ('paris', 4), 'ready']
+    assert app.root.layouts == 1
+    assert list(app.root.jobs.values()) == [(UI_TICK_MS, app.apply_updates, ())]
+
+
+def test_idle_tick_skips_layout(app):
+    app.apply_updates()
+    
+    assert app.root.layouts == 0
+    assert list(app.root.jobs.values()) == [(UI_TICK_MS, app.apply_updates, ())]
+
+
+def test_failing_update_does_not_stop_the_batch(app):
+    shown = []
+    app.updates.post('broken', lambda: 1 / 0)
+    app.updates.post('status', shown.append, 'ready')
+    
+    app.apply_updates()
+    
+    assert shown == ['ready']
+    assert [type(error) for error in app.root.errors] == [ZeroDivisionError]
+    assert app.root.layouts == 1
+
+
+def test_closing_during_a_batch_stops_the_tick(app):
+    shown = []
+    
+    def close():
+        app.closed = True
+    
+    app.updates.post('close', close)
+    app.updates.post('status', shown.append, 'ready')
+    
+    app.apply_updates()
+    
+    assert shown == []
+    assert app.root.jobs == {}
+
+
+def test_dashboard_generations_do_not_replace_each_other(app):
+    app.post_dashboard_rows(1, 2, [('London', None, None)])
+    app.post_dashboard_rows(2, 2, [('London', None, None)])
+    app.post_dashboard_rows(2, 2, [('London', None, None)])
+    
+    assert [args[0] for _, args in app.updates.drain()] == [1, 2]
+
+
+def test_search_results_are_kept_per_ticket(app):
+    app.on_fetch_done(1, 'London', 'key-a', None)
+    app.on_fetch_done(2, 'London', 'key-b', None)
+    
+    assert [args[:3] for _, args in app.updates.drain()] == [(1, 'London', 'key-a'), (2, 'London', 'key-b')]
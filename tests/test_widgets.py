@@ -0,0 +1,315 @@
+"""Tests for the canvas-drawn widgets and the notice area, on fakes that record what they show"""
+import pytest
+
+tk = pytest.importorskip('tkinter')
+import weather_widgets  # noqa: E402
+from weather_core import forecast_model  # noqa: E402
+from weather_stub import StubWeather  # noqa: E402
+from weather_widgets import NOTICE_LIMIT, NOTICE_TIMEOUTS, ForecastChart, NoticeArea, VirtualList  # noqa: E402
+
+ROWS_IN_VIEW = 380 // 34
+NOW = 1700000000
+
+
+class FakeCanvas:
+    """Keeps canvas items as dicts of their options instead of drawing them"""
+    
+    def __init__(self, master=None, width=600, height=380, **kwargs):
+        self.items = {}
+        self.created = 0
+        self.size = (width, height)
+    
+    def new_item(self, kind, coords, options):
+        self.created += 1
+        self.items[self.created] = dict(options, kind=kind, coords=list(coords))
+        return self.created
+    
+    def create_line(self, *coords, **options):
+        return self.new_item('line', coords, options)
+    
+    def create_rectangle(self, *coords, **options):
+        return self.new_item('rectangle', coords, options)
+    
+    def create_text(self, *coords, **options):
+        return self.new_item('text', coords, options)
+    
+    def create_image(self, *coords, **options):
+        return self.new_item('image', coords, options)
+    
+    def coords(self, item, *coords):
+        if len(coords) == 1:
+            coords = coords[0]
+        self.items[item]['coords'] = list(coords)
+    
+    def itemconfigure(self, item, **options):
+        self.items[item].update(options)
+    
+    def shown(self, kind):
+        return [item for item in self.items.values() if item['kind'] == kind and item.get('state') != 'hidden']
+    
+    def winfo_width(self):
+        return self.size[0]
+    
+    def winfo_height(self):
+        return self.size[1]
+    
+    def pack(self, **options):
+        pass
+    
+    def bind(self, *args):
+        pass
+
+
+class FakeScrollbar:
+    def __init__(self, master=None, **options):
+        self.position = None
+    
+    def pack(self, **options):
+        pass
+    
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+class FakeChart(FakeCanvas, ForecastChart):
+    """A ForecastChart drawing on FakeCanvas"""
+    
+    def __init__(self):
+        FakeCanvas.__init__(self, width=700, height=150)
+        ForecastChart.__init__(self, None)
+    
+    def tag_lower(self, item):
+        pass
+    
+    def tag_raise(self, item):
+        pass
+    
+    def bbox(self, item):
+        return (0, 0, 120, 30)
+
+
+class Pointer:
+    def __init__(self, x):
+        self.x = x
+
+
+@pytest.fixture
+def make_list(monkeypatch):
+    """Build VirtualLists of two text columns on a fake canvas, recording the rows rendered"""
+    monkeypatch.setattr(tk.Frame, '__init__', lambda self, *args, **kwargs: None)
+    monkeypatch.setattr(weather_widgets.tk, 'Canvas', FakeCanvas)
+    monkeypatch.setattr(weather_widgets.tk, 'Scrollbar', FakeScrollbar)
+    
+    def make_list(count):
+        rendered = []
+        columns = [(12, 'w', None, None), (-12, 'e', None, None)]
+        listing = VirtualList(None, columns, lambda i: rendered.append(i) or (f"row {i}", f"{i}°"), row_height=34)
+        listing.rendered = rendered
+        listing.set_count(count)
+        return listing
+    
+    return make_list
+
+
+def visible_rows(listing):
+    return sorted(slot['index'] for slot in listing.slots if slot['visible'])
+
+
+def test_list_keeps_items_for_the_rows_in_view_only(make_list):
+    listing = make_list(100000)
+    
+    # Rows in view plus one partly shown at each edge, five items per row
+    assert len(listing.canvas.items) == (ROWS_IN_VIEW + 2) * 5 == 65
+    assert visible_rows(listing) == list(range(ROWS_IN_VIEW + 2))
+    
+    for _ in range(2000):
+        listing.yview('scroll', 1, 'units')
+    assert len(listing.canvas.items) == 65
+    assert visible_rows(listing)[0] == 2000
+    
+    listing.yview('moveto', '1.0')
+    assert visible_rows(listing)[-1] == 99999
+    assert listing.scrollbar.position[1] == 1.0
+    assert len(listing.canvas.items) == 65
+
+
+def test_scrolling_by_a_row_renders_one_row(make_list):
+    listing = make_list(1000)
+    listing.rendered.clear()
+    
+    for _ in range(100):
+        listing.yview('scroll', 1, 'units')
+    
+    assert len(listing.rendered) == 100
+    texts = sorted(item['text'] for item in listing.canvas.shown('text') if item['text'].startswith('row'))
+    assert texts == sorted(f"row {i}" for i in visible_rows(listing))
+
+
+def test_refresh_rebinds_rows_without_new_items(make_list):
+    listing = make_list(40)
+    created = listing.canvas.created
+    listing.rendered.clear()
+    
+    listing.refresh()
+    listing.set_count(40)
+    
+    assert listing.canvas.created == created
+    assert sorted(listing.rendered) == sorted(visible_rows(listing) * 2)
+
+
+def test_short_list_hides_spare_rows(make_list):
+    listing = make_list(40)
+    created = listing.canvas.created
+    
+    listing.set_count(3)
+    
+    assert visible_rows(listing) == [0, 1, 2]
+    assert len(listing.canvas.shown('rectangle')) == 3
+    assert listing.scrollbar.position == (0, 1)
+    assert listing.canvas.created == created
+
+
+@pytest.fixture
+def chart(monkeypatch):
+    """A ForecastChart on a fake 700 x 150 canvas"""
+    monkeypatch.setattr(tk.Canvas, '__init__', lambda self, *args, **kwargs: None)
+    return FakeChart()
+
+
+def hourly(city, backend='forecast'):
+    """Return the 'hourly' columns and UTC offset of a stub forecast: 40 slots, or 48 from One Call"""
+    weather = StubWeather()
+    if backend == 'onecall':
+        model = forecast_model(weather.onecall(51.5, -0.1, NOW), {'id': 1, 'name': city, 'country': 'GB'})
+    else:
+        model = forecast_model(weather.forecast(city, NOW))
+    return model['hourly'], model['utc_offset']
+
+
+def test_chart_refresh_moves_existing_items(chart):
+    chart.set_data(*hourly('London'))
+    created = chart.created
+    line = chart.items[chart.temp_line]['coords']
+    
+    chart.set_data(*hourly('Paris'))
+    
+    assert chart.created == created
+    assert len(chart.items[chart.temp_line]['coords']) == 2 * 40
+    assert chart.items[chart.temp_line]['coords'] != line
+
+
+def test_chart_reuses_bars_when_the_slot_count_changes(chart):
+    chart.set_data(*hourly('London'))
+    assert len(chart.shown('rectangle')) == 40
+    
+    chart.set_data(*hourly('London', 'onecall'))
+    assert len(chart.shown('rectangle')) == 48
+    created = chart.created
+    
+    chart.set_data(*hourly('London'))
+    assert len(chart.shown('rectangle')) == 40
+    assert len(chart.bars) == 48
+    
+    chart.set_data(*hourly('London', 'onecall'))
+    assert chart.created == created
+
+
+def test_hover_picks_the_nearest_slot(chart):
+    chart.set_data(*hourly('London'))
+    
+    for x in range(0, 701, 7):
+        nearest = min(range(len(chart.xs)), key=lambda i: abs(chart.xs[i] - x))
+        assert abs(chart.xs[chart.nearest_slot(x)] - x) == pytest.approx(abs(chart.xs[nearest] - x))
+    
+    chart.on_motion(Pointer(300))
+    i = chart.nearest_slot(300)
+    assert f"{round(chart.hourly['temp'][i])}°" in chart.items[chart.tip_text]['text']
+    assert chart.items[chart.cursor]['coords'][0] == chart.xs[i]
+
+
+class FakeLabel:
+    def __init__(self, master=None, **options):
+        self.options = options
+        self.destroyed = False
+    
+    def pack(self, **options):
+        pass
+    
+    def bind(self, *args):
+        pass
+    
+    def config(self, **options):
+        self.options.update(options)
+    
+    def destroy(self):
+        self.destroyed = True
+
+
+class FakeNoticeArea(NoticeArea):
+    """A NoticeArea that records its timers and placement"""
+    
+    def __init__(self):
+        self.jobs = {}
+        self.next_job = 0
+        self.placed = False
+        NoticeArea.__init__(self, {'bg': 'white'})
+    
+    def after(self, ms, *args):
+        self.next_job += 1
+        self.jobs[self.next_job] = (ms, args)
+        return self.next_job
+    
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+    
+    def place(self, **options):
+        self.placed = True
+    
+    def place_forget(self):
+        self.placed = False
+    
+    def lift(self):
+        pass
+
+
+@pytest.fixture
+def notices(monkeypatch):
+    monkeypatch.setattr(tk.Frame, '__init__', lambda self, *args, **kwargs: None)
+    monkeypatch.setattr(weather_widgets.tk, 'Label', FakeLabel)
+    return FakeNoticeArea()
+
+
+def test_repeated_notice_updates_one_label(notices):
+    for _ in range(20):
+        notices.show(('network', None), "Connection error.")
+    
+    assert list(notices.notices) == [('network', None)]
+    assert notices.notices[('network', None)]['label'].options['text'] == "Connection error.  (×20)"
+    
+    # Each repeat restarts the one timeout instead of adding timers
+    assert list(notices.jobs.values()) == [(NOTICE_TIMEOUTS['error'] * 1000, (notices.dismiss, ('network', None)))]
+
+
+def test_notices_past_the_limit_drop_the_oldest(notices):
+    labels = []
+    for city in ('a', 'b', 'c', 'd', 'e'):
+        notices.show(('not_found', city), f"City '{city}' not found.", 'warning')
+        labels.append(notices.notices[('not_found', city)]['label'])
+    
+    assert list(notices.notices) == [('not_found', city) for city in 'cde']
+    assert [label.destroyed for label in labels] == [True, True, False, False, False]
+    assert len(notices.jobs) == NOTICE_LIMIT
+
+
+def test_last_dismissed_notice_hides_the_area(notices):
+    notices.show(('network', None), "Connection error.")
+    notices.show(('rate_limited', None), "Too many requests.", 'warning')
+    assert notices.placed
+    
+    notices.dismiss(('network', None))
+    assert notices.placed
+    notices.dismiss(('rate_limited', None))
+    notices.dismiss(('rate_limited', None))
+    
+    assert not notices.placed
+    assert notices.jobs == {}
@@ -0,0 +1,63 @@
+"""Tests for the bounded worker pool: rejecting or dropping work when full, and shutting down"""
+import threading
+import time
+
+import pytest
+
+from weather_core import WorkerPool, WorkerPoolFull
+
+
+@pytest.fixture
+def pool():
+    """One worker with room for one queued task, held busy until `release` is set"""
+    pool = WorkerPool(1, 1, name='test-worker')
+    pool.release = threading.Event()
+    pool.running = pool.submit(pool.release.wait)
+    deadline = time.monotonic() + 5
+    while not pool.stats()['busy'] and time.monotonic() < deadline:
+        time.sleep(0.005)
+    yield pool
+    pool.release.set()
+    pool.shutdown()
+
+
+def test_full_queue_rejects_new_work(pool):
+    queued = pool.submit(lambda: 'queued')
+    
+    with pytest.raises(WorkerPoolFull):
+        pool.submit(lambda: 'rejected')
+    
+    stats = pool.stats()
+    assert (stats['busy'], stats['queue_depth'], stats['rejected'], stats['dropped']) == (1, 1, 1, 0)
+    
+    pool.release.set()
+    assert queued.result(timeout=5) == 'queued'
+    assert pool.stats()['completed'] == 2
+
+
+def test_full_queue_can_drop_the_oldest_work(pool):
+    oldest = pool.submit(lambda: 'oldest')
+    
+    newest = pool.submit(lambda: 'newest', drop_oldest=True)
+    
+    assert oldest.cancelled()
+    assert pool.stats()['dropped'] == 1
+    pool.release.set()
+    assert newest.result(timeout=5) == 'newest'
+
+
+def test_shutdown_cancels_queued_work_and_refuses_more(pool):
+    queued = pool.submit(lambda: 'queued')
+    
+    pool.shutdown()
+    
+    assert queued.cancelled()
+    assert pool.stats()['queue_depth'] == 0
+    with pytest.raises(WorkerPoolFull):
+        pool.submit(lambda: 'late')
+    
+    # The running task still finishes, then its worker exits
+    pool.release.set()
+    assert pool.running.result(timeout=5) is True
+    pool.threads[0].join(timeout=5)
+    assert not pool.threads[0].is_alive()
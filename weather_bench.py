@@ -0,0 +1,521 @@
+"""End-to-end benchmark of the weather app against the local stub server
+
+Starts the stub from weather_stub.py in-process and times every search from
+the moment it starts until its cards are rendered, using the real WeatherApp
+in a withdrawn Tk window. Without a display only fetching and normalizing
+are timed, through WeatherClient.
+
+    python weather_bench.py --searches 50 --latency 0.1 --error-rate 0.05
+
+With --replay it instead feeds recorded payloads through the display over and
+over, and reports render time and how widget count and memory grow. Record
+fixtures by running the app with WEATHER_RECORD_DIR set:
+
+    WEATHER_RECORD_DIR=fixtures python weather.py --city London
+    python weather_bench.py --replay fixtures --refreshes 1000
+
+With --aggregate it times the daily rollup of synthetic forecasts against the
+per-slot loop show_forecast used before, without any network or display:
+
+    python weather_bench.py --aggregate 10000
+
+Three more modes check single changes in isolation. --rtt compares fetching
+current weather and forecast one after the other with WeatherClient's
+concurrent fetch, at the stub's --latency; --widget-refresh feeds stub models
+through the display --refreshes times and reports widgets and time per
+refresh; --importtime imports the core and GUI modules under -X importtime:
+
+    python weather_bench.py --rtt --searches 20 --latency 0.2 --jitter 0
+    python weather_bench.py --widget-refresh --refreshes 500
+    python weather_bench.py --importtime
+"""
+import argparse
+from collections import Counter
+from datetime import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from weather_core import (
+    TokenBucket, WeatherClient, current_model, daily_forecast, forecast_model, normalize_city
+)
+from weather_metrics import metrics, percentile
+from weather_stub import StubServer, StubWeather
+
+# Top-level packages the headless core must never import
+GUI_MODULES = ('tkinter', '_tkinter', 'PIL')
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark searches end to end against the local weather stub")
+    parser.add_argument('--searches', type=int, default=30, help="number of searches (default: 30)")
+    parser.add_argument('--cities', type=int, default=0,
+                        help="distinct cities to cycle through; fewer than --searches exercises the cache "
+                             "(default: one per search)")
+    parser.add_argument('--backend', choices=('forecast', 'onecall'), default='forecast',
+                        help="API backend to benchmark (default: forecast)")
+    parser.add_argument('--latency', type=float, default=0.1, help="stub latency per request in seconds (default: 0.1)")
+    parser.add_argument('--jitter', type=float, default=0.02, help="random extra stub latency (default: 0.02)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of stub requests failing with 503")
+    parser.add_argument('--slots', type=int, default=40, help="forecast slots per response (default: 40)")
+    parser.add_argument('--no-gui', action='store_true', help="time fetching only, without rendering")
+    parser.add_argument('--replay', metavar='DIR', help="replay recorded fixtures from DIR through the display")
+    parser.add_argument('--refreshes', type=int, default=1000, help="display updates to replay (default: 1000)")
+    parser.add_argument('--aggregate', type=int, metavar='PAYLOADS',
+                        help="time the daily rollup of this many synthetic forecasts instead")
+    parser.add_argument('--rtt', action='store_true',
+                        help="compare sequential and concurrent current weather + forecast fetches, --searches times")
+    parser.add_argument('--widget-refresh', action='store_true',
+                        help="feed stub models through the display --refreshes times and count widgets")
+    parser.add_argument('--importtime', action='store_true',
+                        help="import the core and GUI modules under -X importtime and report what they load")
+    return parser.parse_args(argv)
+
+
+def report(title, timings, errors):
+    """Print latency statistics in milliseconds"""
+    print(f"{title}: {len(timings)} runs, {errors} failed")
+    if timings:
+        ms = [t * 1000 for t in timings]
+        print(f"  mean {sum(ms) / len(ms):7.1f} ms   p50 {percentile(ms, 0.5):7.1f} ms   "
+              f"p95 {percentile(ms, 0.95):7.1f} ms   max {max(ms):7.1f} ms")
+
+
+def stub_client(host, directory, backend='forecast'):
+    """Return a WeatherClient for a stub server with its stores in a scratch directory
+    
+    The benchmarks and the tests' client fixture both build their clients here.
+    """
+    client = WeatherClient(os.path.join(directory, 'bench.sqlite3'), backend=backend, host=host,
+                           history_path=os.path.join(directory, 'history.sqlite3'))
+    # The call budget protects the real API; the stub needs none
+    client.rate_limiter = TokenBucket(calls_per_minute=10 ** 6, burst=10 ** 6)
+    return client
+
+
+def bench_client(client, cities, api_key):
+    """Time WeatherClient.fetch_weather for each city, returning (timings, errors)"""
+    timings = []
+    errors = 0
+    for city in cities:
+        started = time.perf_counter()
+        current_data, forecast_data, error = client.fetch_weather(city, api_key)
+        timings.append(time.perf_counter() - started)
+        if error:
+            errors += 1
+    return timings, errors
+
+
+def load_fixtures(directory):
+    """Load payloads saved by PayloadRecorder as (city, current_data, forecast_data) models
+    
+    Current weather and forecast payloads of a city are paired in the order
+    they were recorded; a One Call payload gives both.
+    """
+    currents = {}
+    forecasts = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name), encoding='utf-8') as f:
+            fixture = json.load(f)
+        
+        key = normalize_city(fixture['city'])
+        data = fixture['data']
+        if fixture['endpoint'] in ('weather', 'onecall'):
+            currents.setdefault(key, []).append(current_model(data, fixture.get('place')))
+        if fixture['endpoint'] in ('forecast', 'onecall'):
+            forecasts.setdefault(key, []).append(forecast_model(data, fixture.get('place')))
+    
+    return [
+        (city, current_data, forecast_data)
+        for city in currents
+        for current_data, forecast_data in zip(currents[city], forecasts.get(city, []))
+    ]
+
+
+def synthetic_fixtures(count, now=None):
+    """Return models of `count` stub cities as (city, current_data, forecast_data), like load_fixtures"""
+    weather = StubWeather()
+    now = time.time() if now is None else now
+    fixtures = []
+    for i in range(count):
+        city = f"Benchmark City {i}"
+        fixtures.append((normalize_city(city), current_model(weather.current(city, now)),
+                         forecast_model(weather.forecast(city, now))))
+    return fixtures
+
+
+def count_widgets(widget):
+    """Return the number of widgets under and including a widget"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def resident_memory():
+    """Return this process's resident memory in bytes, or 0 without /proc"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def open_display():
+    """Return a withdrawn Tk root window, or None without tkinter or a display"""
+    try:
+        import tkinter as tk
+    except ImportError:
+        return None
+    
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+
+def bench_app(root, client, cities, api_key, icon_dir):
+    """Time searches through WeatherApp until their cards are drawn, returning (timings, errors)"""
+    import tkinter as tk
+    from weather_gui import WeatherApp
+    
+    # The app's background threads start with it, so it gets the stub client from the start
+    app = WeatherApp(root, client, icon_dir)
+    app.api_entry.delete(0, tk.END)
+    app.api_entry.insert(0, api_key)
+    
+    # Count errors instead of opening message boxes
+    failures = []
+    app.show_error = failures.append
+    
+    # A search is done once its result is shown and laid out
+    finished = []
+    show_fetch_result = app.show_fetch_result
+    
+    def timed_show_fetch_result(*args):
+        show_fetch_result(*args)
+        root.update_idletasks()
+        finished.append(time.perf_counter())
+    
+    app.show_fetch_result = timed_show_fetch_result
+    
+    timings = []
+    try:
+        for city in cities:
+            app.city_entry.delete(0, tk.END)
+            app.city_entry.insert(0, city)
+            
+            started = time.perf_counter()
+            count = len(finished)
+            app.get_weather_threaded()
+            
+            # Cached cities render right away, the rest when their fetch completes
+            if str(app.search_btn['state']) == 'normal':
+                root.update_idletasks()
+                finished.append(time.perf_counter())
+            while len(finished) == count:
+                root.update()
+                time.sleep(0.0005)
+            timings.append(finished[-1] - started)
+    finally:
+        app.close()
+    
+    return timings, len(failures)
+
+
+def replay_display(app, root, fixtures, refreshes):
+    """Feed fixtures through WeatherApp.update_weather_display over and over
+    
+    Returns the time of every update including layout, the widget count after
+    the first update, which builds the widgets, and how widgets, the Python
+    heap and resident memory grew over the remaining updates.
+    """
+    timings = []
+    for i in range(refreshes):
+        city, current_data, forecast_data = fixtures[i % len(fixtures)]
+        started = time.perf_counter()
+        app.update_weather_display(current_data, forecast_data)
+        root.update_idletasks()
+        timings.append(time.perf_counter() - started)
+        
+        if i == 0:
+            widgets = count_widgets(root)
+            tracemalloc.start()
+            rss = resident_memory()
+    
+    result = {
+        'timings': timings,
+        'widgets': widgets,
+        'widget_growth': count_widgets(root) - widgets,
+        'python_growth': tracemalloc.get_traced_memory()[0],
+        'rss_growth': resident_memory() - rss
+    }
+    tracemalloc.stop()
+    return result
+
+
+def bench_replay(root, client, icon_dir, fixtures, refreshes):
+    """Replay fixtures through WeatherApp.update_weather_display and print the results"""
+    from weather_gui import WeatherApp
+    
+    app = WeatherApp(root, client, icon_dir)
+    try:
+        result = replay_display(app, root, fixtures, refreshes)
+    finally:
+        app.close()
+    
+    timings = result['timings']
+    report(f"replayed display updates ({len(fixtures)} fixtures)", timings, 0)
+    print(f"  first update {timings[0] * 1000:.1f} ms, {result['widgets']} widgets after it")
+    print(f"  growth over {refreshes - 1} more updates: {result['widget_growth']:+d} widgets, "
+          f"{result['python_growth'] / 1024:+.1f} KB Python heap, {result['rss_growth'] / 1024:+.0f} KB resident")
+
+
+def bench_rtt(client, rounds, api_key):
+    """Time fetching current weather and forecast for new cities one after the other
+    and through WeatherClient.fetch_weather, which sends both at once
+    
+    Returns the (sequential, concurrent) timings; every city is fetched once,
+    so neither side is answered from the cache.
+    """
+    # Open the pooled connections first, so neither side pays for the handshake
+    client.fetch_weather("Warm Up City", api_key)
+    
+    sequential = []
+    concurrent = []
+    for i in range(rounds):
+        started = time.perf_counter()
+        for endpoint in ('weather', 'forecast'):
+            client.provider.fetch_endpoint(endpoint, f"Sequential City {i}", api_key)
+        sequential.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        _, _, error = client.fetch_weather(f"Concurrent City {i}", api_key)
+        if error is not None:
+            raise error
+        concurrent.append(time.perf_counter() - started)
+    return sequential, concurrent
+
+
+def import_times(module):
+    """Import a module in a fresh interpreter under -X importtime
+    
+    Returns the cumulative import time in microseconds of every module it
+    loaded, keyed by dotted name.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def bench_importtime(modules=('weather_core', 'weather', 'weather_gui')):
+    """Print the import time of each module, its heaviest packages and any GUI libraries it loads"""
+    # Modules the interpreter loads at startup are not the module's cost
+    startup = set(import_times('sys'))
+    for module in modules:
+        times = import_times(module)
+        packages = {}
+        for name, cumulative in times.items():
+            if name in startup:
+                continue
+            package = name.split('.')[0]
+            packages[package] = max(packages.get(package, 0), cumulative)
+        packages.pop(module, None)
+        
+        gui = sorted(package for package in packages if package in GUI_MODULES)
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:5]
+        print(f"{module}: {times[module] / 1000:.1f} ms, GUI libraries: {', '.join(gui) or 'none'}")
+        print(f"  heaviest: {', '.join(f'{name} {cumulative / 1000:.1f} ms' for name, cumulative in heaviest)}")
+
+
+def legacy_daily_forecast(data):
+    """The per-slot grouping show_forecast did before the aggregation engine
+    
+    Buckets by this machine's date and keeps the min, max and mean temperature
+    and the first slot's condition, humidity and wind of each day.
+    """
+    daily_data = {}
+    for item in data['list']:
+        forecast_date = datetime.fromtimestamp(item['dt']).date()
+        if forecast_date not in daily_data:
+            daily_data[forecast_date] = {
+                'temps': [],
+                'weather': item['weather'][0],
+                'dt': item['dt'],
+                'humidity': item['main']['humidity'],
+                'wind_speed': item['wind']['speed']
+            }
+        daily_data[forecast_date]['temps'].append(item['main']['temp'])
+    
+    return [dict(day, date=forecast_date, min_temp=min(day['temps']), max_temp=max(day['temps']),
+                 mean_temp=sum(day['temps']) / len(day['temps']))
+            for forecast_date, day in sorted(daily_data.items())[:5]]
+
+
+def legacy_daily_summaries(data):
+    """The same per-slot loop extended to every statistic daily_forecast computes"""
+    daily_data = {}
+    for item in data['list']:
+        forecast_date = datetime.fromtimestamp(item['dt']).date()
+        day = daily_data.get(forecast_date)
+        if day is None:
+            day = daily_data[forecast_date] = {
+                'dt': item['dt'], 'temps': [], 'humidity': [], 'wind_speed': [], 'precipitation': 0,
+                'icons': Counter(), 'weather': {}
+            }
+        day['temps'].append(item['main']['temp'])
+        day['humidity'].append(item['main']['humidity'])
+        day['wind_speed'].append(item['wind']['speed'])
+        day['precipitation'] += item.get('rain', {}).get('3h', 0) + item.get('snow', {}).get('3h', 0)
+        condition = item['weather'][0]
+        day['icons'][condition['icon']] += 1
+        day['weather'].setdefault(condition['icon'], condition)
+    
+    summaries = []
+    for forecast_date, day in sorted(daily_data.items())[:5]:
+        temps = day['temps']
+        summaries.append({
+            'date': forecast_date,
+            'dt': day['dt'],
+            'min_temp': min(temps),
+            'max_temp': max(temps),
+            'mean_temp': sum(temps) / len(temps),
+            'precipitation': day['precipitation'],
+            'humidity': sum(day['humidity']) / len(temps),
+            'wind_speed': sum(day['wind_speed']) / len(temps),
+            'weather': day['weather'][day['icons'].most_common(1)[0][0]]
+        })
+    return summaries
+
+
+def bench_aggregate(count, slots):
+    """Time daily rollups of `count` synthetic forecasts, best of five runs each"""
+    weather = StubWeather(slots=slots)
+    rng = random.Random(0)
+    now = time.time()
+    payloads = [weather.forecast(f"Benchmark City {i}", now + rng.randrange(0, 86400)) for i in range(count)]
+    
+    runs = (
+        ("per-slot loop, min/max/mean only", lambda: [legacy_daily_forecast(data) for data in payloads]),
+        ("per-slot loop, same statistics", lambda: [legacy_daily_summaries(data) for data in payloads]),
+        ("daily_forecast per payload", lambda: [daily_forecast(data) for data in payloads]),
+        ("forecast_model per payload", lambda: [forecast_model(data) for data in payloads])
+    )
+    print(f"Daily rollup of {count} forecasts with {slots} slots each")
+    for title, run in runs:
+        seconds = min(timeit.repeat(run, number=1, repeat=5))
+        print(f"  {title:<36}{seconds * 1000:9.1f} ms")
+
+
+def replay_models(fixtures, refreshes, directory):
+    """Without a display, time reloading and normalizing the fixtures instead"""
+    timings = []
+    for _ in range(max(1, refreshes // max(1, len(fixtures)))):
+        started = time.perf_counter()
+        load_fixtures(directory)
+        timings.append((time.perf_counter() - started) / len(fixtures))
+    report(f"fixture load and normalize per pair ({len(fixtures)} fixtures)", timings, 0)
+
+
+def main(argv=None):
+    """Run the benchmark and print the results"""
+    args = parse_args(argv)
+    
+    if args.aggregate:
+        bench_aggregate(args.aggregate, args.slots)
+        return 0
+    
+    if args.importtime:
+        bench_importtime()
+        return 0
+    
+    if args.rtt:
+        stub = StubServer(latency=args.latency, jitter=args.jitter).start()
+        with tempfile.TemporaryDirectory() as directory:
+            client = stub_client(stub.url, directory)
+            try:
+                sequential, concurrent = bench_rtt(client, args.searches, 'benchmark')
+            finally:
+                client.close()
+        stub.stop()
+        
+        print(f"Stub latency {args.latency * 1000:.0f} ms (+{args.jitter * 1000:.0f} ms jitter) per request")
+        for title, timings in (("sequential weather + forecast", sequential),
+                               ("concurrent fetch_weather", concurrent)):
+            report(title, timings, 0)
+            if args.latency:
+                print(f"  {sum(timings) / len(timings) / args.latency:.2f} x latency on average")
+        return 0
+    
+    if args.replay or args.widget_refresh:
+        fixtures = synthetic_fixtures(5) if args.widget_refresh else load_fixtures(args.replay)
+        if not fixtures:
+            print(f"No complete fixtures in {args.replay}", file=sys.stderr)
+            return 1
+        
+        root = None if args.no_gui else open_display()
+        if root is None and args.widget_refresh:
+            print("--widget-refresh needs a display", file=sys.stderr)
+            return 1
+        if root is None:
+            if not args.no_gui:
+                print("No display available, timing fixture normalization only")
+            replay_models(fixtures, args.refreshes, args.replay)
+            return 0
+        
+        # The app's background threads only reach the stub, for icons, and scratch stores
+        stub = StubServer().start()
+        with tempfile.TemporaryDirectory() as directory:
+            client = stub_client(stub.url, directory)
+            bench_replay(root, client, os.path.join(directory, 'icons'), fixtures, args.refreshes)
+        stub.stop()
+        return 0
+    
+    stub = StubServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                      slots=args.slots).start()
+    
+    count = args.cities or args.searches
+    cities = [f"Benchmark City {i % count}" for i in range(args.searches)]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        client = stub_client(stub.url, directory, args.backend)
+        
+        print(f"Stub at {stub.url}: latency {args.latency * 1000:.0f} ms (+{args.jitter * 1000:.0f} ms jitter), "
+              f"error rate {args.error_rate:.0%}, {args.slots} slots, {args.backend} backend")
+        
+        root = None if args.no_gui else open_display()
+        if root is not None:
+            # Closing the app also closes the client
+            timings, errors = bench_app(root, client, cities, 'benchmark', os.path.join(directory, 'icons'))
+            report("search to rendered cards", timings, errors)
+        else:
+            if not args.no_gui:
+                print("No display available, timing fetches only")
+            timings, errors = bench_client(client, cities, 'benchmark')
+            client.close()
+            report("fetch only", timings, errors)
+        print(f"  stub requests: {dict(sorted(stub.counts.items()))}")
+        print()
+        print(metrics.table())
+    
+    stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
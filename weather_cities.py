@@ -0,0 +1,171 @@
+"""Offline index of OpenWeatherMap's city list for autocomplete and name resolution"""
+from array import array
+from bisect import bisect_left
+import gzip
+import json
+import os
+import threading
+
+
+def city_key(name):
+    """Normalize a city name for lookups in the index"""
+    return ' '.join(name.lower().split())
+
+
+class CityIndex:
+    """Sorted arrays of city names with their IDs and coordinates
+    
+    The source is OpenWeatherMap's city.list.json (or .json.gz) from
+    bulk.openweathermap.org/sample/. On first load it is converted into a
+    sorted tab-separated cache next to it, which loads much faster.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.cache_path = path + '.index'
+        self.lock = threading.Lock()
+        self.loaded = False
+        
+        # Parallel columns sorted by key
+        self.keys = []
+        self.names = []
+        self.states = []
+        self.countries = []
+        self.ids = array('l')
+        self.lats = array('d')
+        self.lons = array('d')
+    
+    def load(self):
+        """Load the index if the city list is available, returning True on success"""
+        with self.lock:
+            if self.loaded:
+                return True
+            if not os.path.exists(self.path):
+                return False
+            
+            try:
+                if (os.path.exists(self.cache_path)
+                        and os.path.getmtime(self.cache_path) >= os.path.getmtime(self.path)):
+                    rows = self.read_cache()
+                else:
+                    rows = self.read_city_list()
+                    self.write_cache(rows)
+            except (OSError, ValueError, KeyError):
+                return False
+            
+            for key, name, state, country, city_id, lat, lon in rows:
+                self.keys.append(key)
+                self.names.append(name)
+                self.states.append(state)
+                self.countries.append(country)
+                self.ids.append(city_id)
+                self.lats.append(lat)
+                self.lons.append(lon)
+            
+            self.loaded = True
+            return True
+    
+    def read_city_list(self):
+        """Parse the OpenWeatherMap city list into sorted rows"""
+        opener = gzip.open if self.path.endswith('.gz') else open
+        with opener(self.path, 'rt', encoding='utf-8') as f:
+            cities = json.load(f)
+        
+        rows = [
+            (city_key(city['name']), city['name'], city.get('state', ''), city.get('country', ''),
+             city['id'], city['coord']['lat'], city['coord']['lon'])
+            for city in cities if city.get('name')
+        ]
+        rows.sort()
+        return rows
+    
+    def read_cache(self):
+        """Read rows from the sorted cache file"""
+        rows = []
+        with open(self.cache_path, encoding='utf-8') as f:
+            for line in f:
+                key, name, state, country, city_id, lat, lon = line.rstrip('\n').split('\t')
+                rows.append((key, name, state, country, int(city_id), float(lat), float(lon)))
+        return rows
+    
+    def write_cache(self, rows):
+        """Write rows to the sorted cache file, ignoring errors"""
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                for row in rows:
+                    f.write('\t'.join(str(value) for value in row) + '\n')
+        except OSError:
+            pass
+    
+    def label(self, i):
+        """Return the display label of an entry, e.g. 'Portland, OR, US'"""
+        parts = [self.names[i], self.states[i], self.countries[i]]
+        return ', '.join(part for part in parts if part)
+    
+    def complete(self, prefix, limit=8):
+        """Return up to `limit` distinct labels of cities whose name starts with prefix"""
+        if not self.loaded:
+            return []
+        
+        key = city_key(prefix)
+        if not key:
+            return []
+        
+        labels = []
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i].startswith(key) and len(labels) < limit:
+            label = self.label(i)
+            if label not in labels:
+                labels.append(label)
+            i += 1
+        return labels
+    
+    def matches(self, query):
+        """Return the entry positions matching 'name', 'name, country' or 'name, state, country'"""
+        parts = [part.strip() for part in query.split(',')]
+        key = city_key(parts[0])
+        qualifiers = [part.upper() for part in parts[1:] if part]
+        
+        found = []
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            codes = {self.states[i].upper(), self.countries[i].upper()}
+            if all(qualifier in codes for qualifier in qualifiers):
+                found.append(i)
+            i += 1
+        return found
+    
+    def resolve(self, query):
+        """Look up a query in the index
+        
+        Returns ('found', city_id, lat, lon) for a unique match, ('ambiguous',)
+        when several cities match, ('unknown',) when none does, and
+        ('unavailable',) when the index is not loaded.
+        """
+        if not self.loaded:
+            return ('unavailable',)
+        
+        found = self.matches(query)
+        if not found:
+            return ('unknown',)
+        
+        # Duplicate entries in the city list share the same ID
+        if len({self.ids[i] for i in found}) > 1:
+            return ('ambiguous',)
+        
+        i = found[0]
+        return ('found', self.ids[i], self.lats[i], self.lons[i])
+    
+    def place(self, query):
+        """Return the name, country, ID and coordinates of a uniquely matching city, or None"""
+        if self.resolve(query)[0] != 'found':
+            return None
+        
+        i = self.matches(query)[0]
+        return {
+            'id': self.ids[i],
+            'name': self.names[i],
+            'country': self.countries[i],
+            'lat': self.lats[i],
+            'lon': self.lons[i]
+        }
@@ -0,0 +1,1359 @@
+"""Network, caching and forecast aggregation for the weather app, without any GUI imports"""
+import requests
+from requests.adapters import HTTPAdapter
+from abc import ABC, abstractmethod
+from datetime import date
+from bisect import bisect_left
+from collections import OrderedDict, deque
+import calendar
+from operator import itemgetter
+import threading
+import time
+import os
+import json
+import sqlite3
+import zlib
+import hashlib
+import random
+import sys
+from email.utils import parsedate_to_datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from weather_cities import CityIndex, city_key
+from weather_history import HistoryStore
+from weather_metrics import metrics
+
+# Server of the weather API, e.g. http://127.0.0.1:8089 for the local stub in weather_stub.py
+API_HOST = os.environ.get('OPENWEATHER_HOST', "https://api.openweathermap.org")
+
+# Where forecasts come from: 'forecast' uses the current weather and 5-day/3-hour
+# endpoints (two requests per city), 'onecall' the One Call API (one request,
+# needs a One Call subscription)
+API_BACKEND = os.environ.get('OPENWEATHER_BACKEND', 'forecast')
+
+# Separate connect and read timeouts (seconds) for every API call
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 15
+
+# Retries for rate limiting and transient server errors, with exponential backoff (seconds)
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 3
+BACKOFF_BASE = 1
+BACKOFF_MAX = 30
+RETRY_AFTER_MAX = 60
+
+UNITS = 'metric'
+
+# How long cached payloads stay fresh (seconds) and how many are kept
+CACHE_TTLS = {
+    'weather': 10 * 60,
+    'forecast': 60 * 60
+}
+CACHE_MAX_ENTRIES = 64
+
+# On-disk store of the last viewed cities, used for cold start and offline display
+STORE_PATH = os.path.join(os.path.expanduser('~'), '.weather_app_cache.sqlite3')
+STORE_MAX_CITIES = 10
+
+# Long-term history of every fetched observation and forecast, for trend views
+HISTORY_PATH = os.path.join(os.path.expanduser('~'), '.weather_app_history.sqlite3')
+
+# Condition icons (100x100 PNGs), downloaded once into a local directory
+ICON_DIR = os.path.join(os.path.expanduser('~'), '.weather_app_icons')
+ICON_CODES = tuple(f"{number}{time_of_day}" for number in ('01', '02', '03', '04', '09', '10', '11', '13', '50')
+                   for time_of_day in 'dn')
+
+# When set, every fetched payload is also saved there as a fixture for weather_bench.py --replay
+RECORD_DIR = os.environ.get('WEATHER_RECORD_DIR')
+
+# OpenWeatherMap city list (bulk.openweathermap.org/sample/city.list.json.gz) for offline lookups
+CITY_LIST_PATH = os.environ.get(
+    'OPENWEATHER_CITY_LIST',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'city.list.json.gz')
+)
+
+# Multi-city dashboard: parallel workers, API call budget and group endpoint batch size
+DASHBOARD_WORKERS = 8
+REQUESTS_PER_MINUTE = 60
+REQUEST_BURST = 10
+GROUP_BATCH_SIZE = 20
+
+# Background workers for searches and how many searches may wait for one
+SEARCH_WORKERS = 2
+SEARCH_QUEUE_SIZE = 4
+
+# Threads sending the API calls of one search side by side
+REQUEST_WORKERS = 4
+
+# Pooled connections kept per host: one for every thread that can be in a
+# request at once (request, dashboard and search workers and the icon download)
+HTTP_POOL_SIZE = REQUEST_WORKERS + DASHBOARD_WORKERS + SEARCH_WORKERS + 1
+
+# Milliseconds between the GUI's batched applications of worker results
+UI_TICK_MS = 16
+
+# Auto-refresh: current conditions every 10 minutes, the forecast when its next
+# 3-hour slot is due, each with random jitter so clients don't refresh in step
+CURRENT_REFRESH_INTERVAL = 10 * 60
+FORECAST_SLOT_SECONDS = 3 * 60 * 60
+MIN_REFRESH_DELAY = 60
+REFRESH_JITTER = 60
+
+# Columns extracted from forecast slots for daily aggregation
+FORECAST_COLUMNS = ('dt', 'temp', 'humidity', 'wind_speed', 'precipitation', 'weather', 'icon')
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Most days kept in a forecast model, as many as One Call returns
+MODEL_DAYS = 8
+
+# Columns of the hourly slots kept in a forecast model
+HOURLY_COLUMNS = ('dt', 'temp', 'humidity', 'wind_speed', 'precipitation', 'pop', 'icon', 'description')
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Field getters used to pull forecast columns out of the payload at C speed
+get_dt = itemgetter('dt')
+get_main = itemgetter('main')
+get_temp = itemgetter('temp')
+get_humidity = itemgetter('humidity')
+get_wind = itemgetter('wind')
+get_speed = itemgetter('speed')
+get_weather = itemgetter('weather')
+get_icon = itemgetter('icon')
+get_description = itemgetter('description')
+get_wind_speed = itemgetter('wind_speed')
+
+
+def normalize_city(city):
+    """Normalize a city name for use as a lookup key"""
+    return city_key(city)
+
+
+class TokenBucket:
+    """Token bucket rate limiter shared by every API call
+    
+    Allows bursts of up to `burst` calls and refills at `calls_per_minute`.
+    hold() pauses all callers, e.g. after the server answers 429.
+    """
+    
+    def __init__(self, calls_per_minute, burst):
+        self.rate = calls_per_minute / 60
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.held_until = 0
+        self.lock = threading.Lock()
+        
+        # Counters for stats()
+        self.waiting = 0
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+    
+    def acquire(self):
+        """Block until a token is available and return how long the call waited"""
+        started = time.monotonic()
+        with self.lock:
+            self.waiting += 1
+        
+        try:
+            while True:
+                with self.lock:
+                    now = time.monotonic()
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    
+                    if now >= self.held_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    
+                    wait = max(self.held_until - now, (1 - self.tokens) / self.rate)
+                time.sleep(wait)
+        finally:
+            with self.lock:
+                self.waiting -= 1
+        
+        waited = time.monotonic() - started
+        with self.lock:
+            self.calls += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            self.last_wait = waited
+        return waited
+    
+    def hold(self, seconds):
+        """Stop handing out tokens for the given number of seconds"""
+        with self.lock:
+            self.held_until = max(self.held_until, time.monotonic() + seconds)
+            self.tokens = 0
+    
+    def stats(self):
+        """Return the number of waiting calls and their queue wait times"""
+        with self.lock:
+            return {
+                'waiting': self.waiting,
+                'calls': self.calls,
+                'average_wait': self.total_wait / self.calls if self.calls else 0.0,
+                'max_wait': self.max_wait,
+                'last_wait': self.last_wait
+            }
+
+
+def retry_after_seconds(response):
+    """Return the server's Retry-After delay in seconds, or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    
+    return min(max(seconds, 0), RETRY_AFTER_MAX)
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry attempt"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class ResponseCache:
+    """LRU cache of API payloads with a time to live per endpoint"""
+    
+    def __init__(self, ttls, max_entries):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def make_key(self, endpoint, city, units):
+        """Build the cache key, ignoring case and extra spaces in the city name"""
+        return (endpoint, normalize_city(city), units)
+    
+    def get(self, endpoint, city, units):
+        """Return a fresh cached payload or None"""
+        key = self.make_key(endpoint, city, units)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            stored_at, data = entry
+            if time.monotonic() - stored_at > self.ttls[endpoint]:
+                del self.entries[key]
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return data
+    
+    def put(self, endpoint, city, units, data):
+        """Store a payload, evicting the least recently used entries if full"""
+        key = self.make_key(endpoint, city, units)
+        with self.lock:
+            self.entries[key] = (time.monotonic(), data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self):
+        """Return hit/miss/eviction counters and the current size"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self.entries)
+            }
+
+
+class ForecastStore:
+    """SQLite store holding the last fetched payloads for a few cities"""
+    
+    def __init__(self, path, max_cities):
+        self.path = path
+        self.max_cities = max_cities
+        self.lock = threading.Lock()
+        self.ready = False
+    
+    def connect(self):
+        """Open a connection, creating the table on first use"""
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self.ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cities ("
+                "city TEXT PRIMARY KEY, saved_at REAL NOT NULL, "
+                "current BLOB NOT NULL, forecast BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cities_saved_at ON cities (saved_at)")
+            self.ready = True
+        return conn
+    
+    def pack(self, data):
+        """Serialize a payload to compressed JSON"""
+        return zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+    
+    def unpack(self, blob):
+        """Deserialize a payload stored by pack"""
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+    
+    def save(self, city, current_data, forecast_data):
+        """Save both payloads for a city and drop the oldest cities over the limit"""
+        key = normalize_city(city)
+        with self.lock:
+            conn = self.connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cities VALUES (?, ?, ?, ?)",
+                        (key, time.time(), self.pack(current_data), self.pack(forecast_data))
+                    )
+                    conn.execute(
+                        "DELETE FROM cities WHERE city NOT IN "
+                        "(SELECT city FROM cities ORDER BY saved_at DESC LIMIT ?)",
+                        (self.max_cities,)
+                    )
+            finally:
+                conn.close()
+    
+    def load(self, city=None):
+        """Return (city, saved_at, current_data, forecast_data) or None
+        
+        Without a city the most recently saved one is returned.
+        """
+        with self.lock:
+            conn = self.connect()
+            try:
+                if city is None:
+                    row = conn.execute(
+                        "SELECT * FROM cities ORDER BY saved_at DESC LIMIT 1"
+                    ).fetchone()
+                else:
+                    row = conn.execute(
+                        "SELECT * FROM cities WHERE city = ?",
+                        (normalize_city(city),)
+                    ).fetchone()
+            finally:
+                conn.close()
+        
+        if row is None:
+            return None
+        return row[0], row[1], self.unpack(row[2]), self.unpack(row[3])
+
+
+class PayloadRecorder:
+    """Saves raw API payloads as JSON fixtures, one file per payload
+    
+    weather_bench.py --replay pairs them up again by city and replays them
+    through the display.
+    """
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.sequence = 0
+    
+    def record(self, endpoint, city, data, place=None):
+        """Write one payload, ignoring disk errors"""
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+        
+        slug = ''.join(c if c.isalnum() else '_' for c in normalize_city(city))
+        path = os.path.join(self.directory, f"{int(time.time() * 1000)}-{sequence:05d}-{slug}-{endpoint}.json")
+        fixture = {'city': city, 'endpoint': endpoint, 'recorded_at': time.time(), 'place': place, 'data': data}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(fixture, f, separators=(',', ':'))
+        except OSError:
+            pass
+
+
+class WeatherError(Exception):
+    """An error to report to the user, with what kind of failure it is
+    
+    `city` is the city it concerns, if any. `retryable` tells whether the same
+    request may succeed later without the user changing anything, and `shared`
+    whether the failure affects every city rather than only this one.
+    """
+    
+    kind = 'error'
+    retryable = False
+    shared = False
+    
+    def __init__(self, message, city=None):
+        super().__init__(message)
+        self.city = city
+
+
+class CityNotFound(WeatherError):
+    """The city name matches no known city"""
+    
+    kind = 'not_found'
+    
+    def __init__(self, city):
+        super().__init__(f"City '{city}' not found. Please check the spelling.", city)
+
+
+class InvalidApiKey(WeatherError):
+    """The API rejected the key"""
+    
+    kind = 'api_key'
+    shared = True
+    
+    def __init__(self, city=None):
+        super().__init__("Invalid API key. Please check your OpenWeatherMap API key.", city)
+
+
+class RateLimited(WeatherError):
+    """The API's call limit was reached"""
+    
+    kind = 'rate_limit'
+    retryable = True
+    shared = True
+    
+    def __init__(self, city=None):
+        super().__init__("API rate limit reached. Please wait a minute and try again.", city)
+
+
+class NetworkError(WeatherError):
+    """The request timed out or could not connect"""
+    
+    kind = 'network'
+    retryable = True
+    shared = True
+
+
+class ApiError(WeatherError):
+    """The API answered with an unexpected status or payload"""
+    
+    kind = 'api'
+    
+    def __init__(self, message, city=None, status=None):
+        super().__init__(message, city)
+        self.status = status
+        self.retryable = status in RETRYABLE_STATUS_CODES
+
+
+class WorkerPoolFull(WeatherError):
+    """Raised when a worker pool's queue has no room for more work"""
+    
+    kind = 'busy'
+    retryable = True
+    shared = True
+
+
+class WorkerPool:
+    """Long-lived worker threads fed from a bounded queue
+    
+    When the queue is full, submit either rejects the new work with
+    WorkerPoolFull or, with drop_oldest, cancels the oldest queued work.
+    """
+    
+    def __init__(self, workers, queue_size, name='weather-worker'):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.tasks = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        
+        # Counters for stats()
+        self.busy = 0
+        self.busy_time = 0.0
+        self.completed = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.started_at = time.monotonic()
+        
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self.work, name=f'{name}-{i}')
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+    
+    def submit(self, function, *args, drop_oldest=False):
+        """Queue function(*args) and return a Future for its result"""
+        future = Future()
+        oldest = None
+        with self.condition:
+            if self.closed:
+                raise WorkerPoolFull("The app is shutting down.")
+            
+            if len(self.tasks) >= self.queue_size:
+                if not drop_oldest:
+                    self.rejected += 1
+                    raise WorkerPoolFull("Too many requests are waiting. Please try again in a moment.")
+                oldest, _, _, _ = self.tasks.popleft()
+                self.dropped += 1
+            
+            self.tasks.append((future, function, args, time.perf_counter()))
+            self.condition.notify()
+        
+        # Cancel outside the lock, since cancelling runs the future's callbacks
+        if oldest is not None:
+            oldest.cancel()
+        return future
+    
+    def work(self):
+        """Worker thread body: run queued work until the pool is shut down"""
+        while True:
+            with self.condition:
+                while not self.tasks and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                future, function, args, queued_at = self.tasks.popleft()
+                self.busy += 1
+            
+            metrics.record('queue', time.perf_counter() - queued_at)
+            started = time.monotonic()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            
+            with self.condition:
+                self.busy -= 1
+                self.busy_time += time.monotonic() - started
+                self.completed += 1
+    
+    def shutdown(self):
+        """Cancel queued work and let the workers exit after their current task"""
+        with self.condition:
+            self.closed = True
+            pending = [future for future, _, _, _ in self.tasks]
+            self.tasks.clear()
+            self.condition.notify_all()
+        
+        for future in pending:
+            future.cancel()
+    
+    def stats(self):
+        """Return queue depth, busy workers and utilization since start"""
+        with self.condition:
+            uptime = max(time.monotonic() - self.started_at, 1e-9)
+            return {
+                'workers': self.workers,
+                'queue_depth': len(self.tasks),
+                'busy': self.busy,
+                'utilization': self.busy_time / (uptime * self.workers),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'dropped': self.dropped
+            }
+
+
+class FetchCoordinator:
+    """Runs lookups on a worker pool so that only the newest query's result is used
+    
+    A query that is already in flight under the same key is joined instead of
+    sent again. Every submit hands out a ticket, and only the ticket of the most
+    recent query is current; results for older tickets should be dropped.
+    """
+    
+    def __init__(self, pool):
+        self.pool = pool
+        # Reentrant because a query dropped during submit calls finished() right away
+        self.lock = threading.RLock()
+        self.latest_ticket = 0
+        self.in_flight = {}
+    
+    def submit(self, key, function, *args):
+        """Run function(*args) for a query, or join the identical one in flight
+        
+        Returns (ticket, future). When the pool queue is full the oldest queued
+        query is dropped, since a newer one has replaced it.
+        """
+        with self.lock:
+            self.latest_ticket += 1
+            ticket = self.latest_ticket
+            
+            future = self.in_flight.get(key)
+            joined = future is not None
+            if not joined:
+                future = self.pool.submit(function, *args, drop_oldest=True)
+                self.in_flight[key] = future
+        
+        if not joined:
+            future.add_done_callback(lambda f: self.finished(key, f))
+        return ticket, future
+    
+    def supersede(self):
+        """Make every outstanding ticket stale, for queries answered without a fetch"""
+        with self.lock:
+            self.latest_ticket += 1
+            return self.latest_ticket
+    
+    def is_current(self, ticket):
+        """Return True if no newer query has been submitted since this ticket"""
+        return ticket == self.latest_ticket
+    
+    def finished(self, key, future):
+        """Forget a finished query so the next identical one is fetched again"""
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+
+class UpdateQueue:
+    """Thread-safe mailbox for results that must be applied on the GUI thread
+    
+    Workers post updates under a key, such as one per city; an update still
+    waiting under the same key is replaced by the newer one. The GUI thread
+    drains everything that arrived since its last tick in one batch.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        
+        # Counters for stats()
+        self.posted = 0
+        self.merged = 0
+        self.batches = 0
+    
+    def post(self, key, function, *args):
+        """Queue function(*args), replacing a waiting update with the same key"""
+        with self.lock:
+            if self.pending.pop(key, None) is not None:
+                self.merged += 1
+            self.pending[key] = (function, args)
+            self.posted += 1
+    
+    def drain(self):
+        """Return the waiting (function, args) pairs in arrival order and clear them"""
+        with self.lock:
+            if not self.pending:
+                return []
+            batch, self.pending = self.pending, OrderedDict()
+            self.batches += 1
+        return list(batch.values())
+    
+    def stats(self):
+        """Return how many updates were posted, merged away and applied in how many batches"""
+        with self.lock:
+            return {
+                'posted': self.posted,
+                'merged': self.merged,
+                'batches': self.batches,
+                'pending': len(self.pending)
+            }
+
+
+class WeatherProvider(ABC):
+    """Base class of weather API backends
+    
+    A provider turns cities into API requests and responses into normalized
+    models. WeatherClient creates it with get(url, params), which sends a
+    request through the shared session, rate limiter and retries, with the
+    offline city index, the API host and the backend name. Subclasses must
+    implement every abstract method; failures are raised as WeatherError
+    subclasses.
+    """
+    
+    def __init__(self, get, cities, host=API_HOST, backend=API_BACKEND):
+        self.get = get
+        self.cities = cities
+        self.host = host.rstrip('/')
+        self.backend = backend
+        
+        # Optional PayloadRecorder for raw payloads, set by WeatherClient
+        self.recorder = None
+    
+    @abstractmethod
+    def url(self, endpoint):
+        """Return the URL of an API endpoint"""
+    
+    @abstractmethod
+    def icon_url(self, icon_code):
+        """Return the URL of the 100x100 PNG for a condition icon"""
+    
+    @abstractmethod
+    def endpoints(self, parts):
+        """Return the endpoints to call for the missing 'weather' and 'forecast' parts"""
+    
+    @abstractmethod
+    def fetch_endpoint(self, endpoint, city, api_key):
+        """Fetch one endpoint for a city and return its raw JSON payload"""
+    
+    @abstractmethod
+    def fetch_models(self, endpoint, city, api_key):
+        """Fetch an endpoint for a city and return its normalized models keyed by part
+        
+        Every model carries the city's 'id' (or None), 'name', 'country' and
+        'utc_offset', which key and date its history.
+        """
+    
+    @abstractmethod
+    def fetch_group(self, city_ids, api_key):
+        """Fetch current conditions for a batch of city IDs, as models keyed by ID"""
+    
+    @abstractmethod
+    def city_id(self, city):
+        """Return the provider's ID for a city name if it is known locally, else None"""
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """OpenWeatherMap endpoints and response shapes"""
+    
+    def __init__(self, get, cities, host=API_HOST, backend=API_BACKEND):
+        super().__init__(get, cities, host, backend)
+        
+        # City IDs learned from responses, and names and coordinates looked up for One Call
+        self.city_ids = {}
+        self.places = {}
+    
+    def url(self, endpoint):
+        """Return the URL of an API endpoint"""
+        if endpoint == 'onecall':
+            return f"{self.host}/data/3.0/onecall"
+        if endpoint == 'direct':
+            return f"{self.host}/geo/1.0/direct"
+        return f"{self.host}/data/2.5/{endpoint}"
+    
+    def icon_url(self, icon_code):
+        """Return the URL of the 100x100 PNG for a condition icon
+        
+        OpenWeatherMap serves icons from its main site; other hosts, like the
+        local stub, serve them themselves.
+        """
+        host = self.host.replace('://api.openweathermap.org', '://openweathermap.org')
+        return f"{host}/img/wn/{icon_code}@2x.png"
+    
+    def endpoints(self, parts):
+        """Return the endpoints to call for the missing 'weather' and 'forecast' parts
+        
+        One Call returns both parts at once, the other backend needs one call per part.
+        """
+        if self.backend == 'onecall':
+            return ['onecall'] if parts else []
+        return list(parts)
+    
+    def fetch_models(self, endpoint, city, api_key):
+        """Fetch an endpoint for a city and return its normalized models keyed by part
+        
+        'weather' and 'forecast' give one part each, 'onecall' gives both.
+        """
+        if endpoint == 'onecall':
+            place = self.locate(city, api_key)
+            data = self.fetch_onecall(place, api_key)
+            if self.recorder is not None:
+                self.recorder.record(endpoint, city, data, place)
+            with metrics.span('normalize'):
+                return {'weather': current_model(data, place), 'forecast': forecast_model(data, place)}
+        
+        data = self.fetch_endpoint(endpoint, city, api_key)
+        if self.recorder is not None:
+            self.recorder.record(endpoint, city, data)
+        with metrics.span('normalize'):
+            if endpoint == 'weather':
+                return {'weather': current_model(data)}
+            return {'forecast': forecast_model(data)}
+    
+    def city_id(self, city):
+        """Return the OpenWeatherMap ID for a city name if it is known locally"""
+        if city.isdigit():
+            return int(city)
+        
+        city_id = self.city_ids.get(normalize_city(city))
+        if city_id is None:
+            match = self.cities.resolve(city)
+            if match[0] == 'found':
+                city_id = match[1]
+        return city_id
+    
+    def query_params(self, city, api_key):
+        """Build the query for a city, by ID when the offline index knows it
+        
+        Names the index has never heard of fail here, before any network call.
+        Without the index, or for ambiguous names, the API resolves the name.
+        """
+        params = {'appid': api_key, 'units': UNITS}
+        
+        city_id = self.city_id(city)
+        if city_id is not None:
+            params['id'] = city_id
+        elif self.cities.resolve(city)[0] == 'unknown':
+            raise CityNotFound(city)
+        else:
+            params['q'] = city
+        return params
+    
+    def locate(self, city, api_key):
+        """Return the name, country, ID and coordinates of a city for One Call
+        
+        Uses the offline index when it knows the city and the geocoding API otherwise.
+        """
+        key = normalize_city(city)
+        place = self.places.get(key) or self.cities.place(city)
+        
+        if place is None:
+            if self.cities.resolve(city)[0] == 'unknown':
+                raise CityNotFound(city)
+            
+            response = self.get(self.url('direct'), {'q': city, 'limit': 1, 'appid': api_key})
+            self.check_response(response, 'city location', city)
+            
+            matches = response.json()
+            if not matches:
+                raise CityNotFound(city)
+            
+            # The geocoder gives no city ID; the index has one when it is loaded,
+            # so history is kept under the same key as the forecast backend's
+            match = matches[0]
+            found = self.cities.resolve(f"{match['name']}, {match.get('country', '')}")
+            place = {
+                'id': found[1] if found[0] == 'found' else None,
+                'name': match['name'],
+                'country': match.get('country', ''),
+                'lat': match['lat'],
+                'lon': match['lon']
+            }
+        
+        self.places[key] = place
+        return place
+    
+    def check_response(self, response, what, city=None):
+        """Raise a WeatherError for a failed API response"""
+        if response.status_code == 401:
+            raise InvalidApiKey(city)
+        elif response.status_code == 404 and city is not None:
+            raise CityNotFound(city)
+        elif response.status_code == 429:
+            raise RateLimited(city)
+        elif response.status_code != 200:
+            try:
+                message = response.json().get('message')
+            except ValueError:
+                message = None
+            raise ApiError(message or f'Failed to fetch {what}', city, response.status_code)
+    
+    def fetch_onecall(self, place, api_key):
+        """Fetch current, hourly and daily data for a location in one One Call request"""
+        params = {
+            'lat': place['lat'],
+            'lon': place['lon'],
+            'exclude': 'minutely,alerts',
+            'appid': api_key,
+            'units': UNITS
+        }
+        
+        response = self.get(self.url('onecall'), params)
+        self.check_response(response, 'forecast', place['name'])
+        
+        with metrics.span('decode'):
+            return response.json()
+    
+    def fetch_endpoint(self, endpoint, city, api_key):
+        """Fetch one OpenWeatherMap endpoint and return its JSON payload"""
+        params = self.query_params(city, api_key)
+        
+        response = self.get(self.url(endpoint), params)
+        self.check_response(response, 'current weather' if endpoint == 'weather' else endpoint, city)
+        
+        with metrics.span('decode'):
+            data = response.json()
+        
+        # Remember city IDs so the dashboard can batch them through the group endpoint
+        if endpoint == 'weather' and 'id' in data:
+            self.city_ids[normalize_city(city)] = data['id']
+        return data
+    
+    def fetch_group(self, city_ids, api_key):
+        """Fetch current conditions for up to 20 city IDs in one request
+        
+        Returns the current weather models keyed by city ID.
+        """
+        params = {'id': ','.join(str(city_id) for city_id in city_ids), 'appid': api_key, 'units': UNITS}
+        
+        response = self.get(self.url('group'), params)
+        self.check_response(response, 'city group')
+        
+        with metrics.span('decode'):
+            items = response.json()['list']
+        with metrics.span('normalize'):
+            return {item['id']: current_model(item) for item in items}
+
+
+class WeatherClient:
+    """Weather client with pooled connections, caching and a shared call budget
+    
+    The API itself is handled by `provider`, a WeatherProvider subclass that
+    is OpenWeatherMap by default. `host` points it at another server, such as
+    the local stub in weather_stub.py.
+    """
+    
+    def __init__(self, store_path=STORE_PATH, backend=API_BACKEND, host=API_HOST,
+                 provider=OpenWeatherMapProvider, history_path=HISTORY_PATH):
+        # Worker pool so the current weather and forecast requests run side by side
+        self.request_pool = ThreadPoolExecutor(max_workers=REQUEST_WORKERS, thread_name_prefix='weather-request')
+        
+        # Shared keep-alive HTTP session used for every API call
+        self.session = self.create_session()
+        
+        # Recently fetched weather models, so repeated searches skip the network
+        self.cache = ResponseCache(CACHE_TTLS, CACHE_MAX_ENTRIES)
+        
+        # Last viewed cities on disk, opened lazily on first use
+        self.store = ForecastStore(store_path, STORE_MAX_CITIES)
+        
+        # Time series of everything fetched, written in batches
+        self.history = HistoryStore(history_path)
+        
+        # Rate limiter shared by every API call
+        self.rate_limiter = TokenBucket(REQUESTS_PER_MINUTE, REQUEST_BURST)
+        
+        # Cache and rate limiter counters in the metrics; the limiter may be replaced later
+        metrics.register('response_cache', self.cache.stats)
+        metrics.register('rate_limiter', lambda: self.rate_limiter.stats())
+        
+        # Offline city index, loaded on demand with load_cities()
+        self.cities = CityIndex(CITY_LIST_PATH)
+        
+        # Requests and response shapes of the weather API
+        self.provider = provider(self.api_get, self.cities, host, backend)
+        if RECORD_DIR:
+            self.provider.recorder = PayloadRecorder(RECORD_DIR)
+    
+    def close(self):
+        """Stop the request workers, write pending history and close pooled connections"""
+        self.request_pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        try:
+            self.history.flush()
+        except (sqlite3.Error, OSError):
+            pass
+    
+    def fetch_weather(self, city, api_key, cached=None):
+        """Fetch current weather and forecast for a city
+        
+        Returns (current_data, forecast_data, error) as normalized models. Either
+        model is None if its request failed, and error holds the first failure
+        as a WeatherError.
+        """
+        if cached is None:
+            cached = self.lookup_cache(city)
+        
+        # Send the uncached API calls at once so the user waits one round trip, not two
+        missing = [part for part in ('weather', 'forecast') if part not in cached]
+        futures = [self.request_pool.submit(self.fetch_models, endpoint, city, api_key)
+                   for endpoint in self.provider.endpoints(missing)]
+        
+        models = dict(cached)
+        errors = []
+        for future in futures:
+            fetched, error = self.wait_for_result(future, city)
+            if error:
+                errors.append(error)
+            else:
+                models.update(fetched)
+        
+        current_data, forecast_data = models.get('weather'), models.get('forecast')
+        if current_data is not None and forecast_data is not None and futures:
+            self.save_to_store(city, current_data, forecast_data)
+        
+        return current_data, forecast_data, errors[0] if errors else None
+    
+    def create_session(self):
+        """Create the pooled HTTP session shared by all API calls"""
+        session = requests.Session()
+        
+        # Keep a connection open for every thread that may send a request at once,
+        # so none is opened and thrown away when the dashboard and a search overlap
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE, pool_block=False)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        
+        session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        return session
+    
+    def api_get(self, url, params):
+        """Send a GET request through the shared session
+        
+        Waits for the rate limiter before each attempt and retries rate limited
+        and transient server errors, honoring Retry-After. The response carries
+        the total time spent waiting for the limiter as `queue_wait`.
+        
+        Records the limiter wait, the time until the response headers arrived
+        (connection setup and server time) and the rest of the transfer.
+        """
+        queue_wait = 0.0
+        
+        for attempt in range(MAX_RETRIES + 1):
+            queue_wait += self.rate_limiter.acquire()
+            started = time.perf_counter()
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            
+            headers_time = response.elapsed.total_seconds()
+            metrics.record('http', headers_time)
+            metrics.record('download', max(time.perf_counter() - started - headers_time, 0.0))
+            
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == MAX_RETRIES:
+                break
+            
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            
+            # Being rate limited means every other call should back off too
+            if response.status_code == 429:
+                self.rate_limiter.hold(delay)
+            else:
+                time.sleep(delay)
+            response.close()
+        
+        metrics.record('rate_limit', queue_wait)
+        response.queue_wait = queue_wait
+        return response
+    
+    def load_cities(self):
+        """Load the offline city index if the city list is available"""
+        return self.cities.load()
+    
+    def city_id(self, city):
+        """Return the provider's ID for a city name if it is known locally"""
+        return self.provider.city_id(city)
+    
+    def download_icons(self, directory=ICON_DIR):
+        """Download the condition icons that are not on disk yet, returning how many arrived
+        
+        Stops at the first network error, so an offline start costs one timeout.
+        """
+        downloaded = 0
+        for icon_code in ICON_CODES:
+            path = os.path.join(directory, f"{icon_code}.png")
+            if os.path.exists(path):
+                continue
+            
+            try:
+                response = self.session.get(self.provider.icon_url(icon_code),
+                                            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+                if response.status_code != 200 or not response.content.startswith(b'\x89PNG'):
+                    continue
+                
+                os.makedirs(directory, exist_ok=True)
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(response.content)
+                os.replace(path + '.tmp', path)
+                downloaded += 1
+            except (requests.exceptions.RequestException, OSError):
+                break
+        return downloaded
+    
+    def lookup_cache(self, city):
+        """Return the fresh cached models for a city keyed by endpoint"""
+        cached = {}
+        for endpoint in ('weather', 'forecast'):
+            data = self.cache.get(endpoint, city, UNITS)
+            if data is not None:
+                cached[endpoint] = data
+        return cached
+    
+    def save_to_store(self, city, current_data, forecast_data):
+        """Persist the latest payloads, ignoring disk errors"""
+        try:
+            self.store.save(city, current_data, forecast_data)
+        except (sqlite3.Error, OSError):
+            pass
+    
+    def load_saved(self, city=None):
+        """Load saved models from the store, or None if unavailable"""
+        try:
+            saved = self.store.load(city)
+        except (sqlite3.Error, OSError, ValueError, zlib.error):
+            return None
+        if saved is None:
+            return None
+        
+        # Rows saved by older versions hold the raw API payloads
+        city, saved_at, current_data, forecast_data = saved
+        if 'main' in current_data:
+            current_data = current_model(current_data)
+        if 'list' in forecast_data:
+            forecast_data = forecast_model(forecast_data)
+        return city, saved_at, current_data, forecast_data
+    
+    def fetch_models(self, endpoint, city, api_key):
+        """Fetch an endpoint through the provider and cache the models it returns"""
+        models = self.provider.fetch_models(endpoint, city, api_key)
+        for part, model in models.items():
+            self.cache.put(part, city, UNITS, model)
+            self.add_to_history(part, model)
+        return models
+    
+    def add_to_history(self, part, model):
+        """Append a freshly fetched model to the history of its city, ignoring disk errors"""
+        try:
+            if part == 'weather':
+                self.history.add_current(model)
+            else:
+                self.history.add_forecast(model)
+        except (sqlite3.Error, OSError):
+            pass
+    
+    def wait_for_result(self, future, city=None):
+        """Wait for a request future and return (data, WeatherError or None)"""
+        try:
+            return future.result(), None
+        except requests.exceptions.Timeout:
+            return None, NetworkError("Request timed out. Please check your internet connection.", city)
+        except requests.exceptions.ConnectionError:
+            return None, NetworkError("Connection error. Please check your internet connection.", city)
+        except WeatherError as e:
+            return None, e
+        except Exception as e:
+            return None, WeatherError(str(e), city)
+    
+    def fetch_group(self, city_ids, api_key):
+        """Fetch current conditions for a batch of city IDs, keyed by ID"""
+        models = self.provider.fetch_group(city_ids, api_key)
+        for model in models.values():
+            self.add_to_history('weather', model)
+        return models
+
+
+def payload_digest(data):
+    """Return a stable hash of a payload, used to skip re-rendering unchanged data"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def refresh_delay(endpoint, data, now=None):
+    """Return how many seconds to wait before refreshing an endpoint's model"""
+    if now is None:
+        now = time.time()
+    
+    # Current conditions, and One Call which carries them, follow a fixed interval
+    delay = CURRENT_REFRESH_INTERVAL
+    if endpoint == 'forecast' and data and data['hourly']['dt']:
+        # The forecast moves on when its first slot has passed: every 3 hours,
+        # or every hour for One Call
+        times = data['hourly']['dt']
+        slot_seconds = times[1] - times[0] if len(times) > 1 else FORECAST_SLOT_SECONDS
+        delay = (times[0] - now) % slot_seconds
+    
+    return max(delay, MIN_REFRESH_DELAY) + random.uniform(0, REFRESH_JITTER)
+
+
+def forecast_columns(data):
+    """Flatten the slots of a forecast payload into parallel columns, one entry per 3-hour slot"""
+    slots = data['list']
+    mains = list(map(get_main, slots))
+    conditions = [weather[0] for weather in map(get_weather, slots)]
+    
+    return {
+        'dt': list(map(get_dt, slots)),
+        'temp': list(map(get_temp, mains)),
+        'humidity': list(map(get_humidity, mains)),
+        'wind_speed': list(map(get_speed, map(get_wind, slots))),
+        'precipitation': [
+            (item['rain'].get('3h', 0) if 'rain' in item else 0) +
+            (item['snow'].get('3h', 0) if 'snow' in item else 0)
+            for item in slots
+        ],
+        'weather': conditions,
+        'icon': list(map(get_icon, conditions))
+    }
+
+
+def local_utc_offset(timestamp):
+    """Return this machine's UTC offset in seconds at the given time"""
+    return calendar.timegm(time.localtime(timestamp)) - int(timestamp)
+
+
+def forecast_utc_offset(data):
+    """Return the UTC offset in seconds of the forecast location
+    
+    Uses the city.timezone field of the payload and falls back to this
+    machine's offset for payloads without one.
+    """
+    city = data.get('city') or {}
+    if city.get('timezone') is not None:
+        return city['timezone']
+    return local_utc_offset(data['list'][0]['dt']) if data['list'] else 0
+
+
+def local_date(dt, utc_offset):
+    """Return the date at a location with the given UTC offset at a Unix timestamp"""
+    return date.fromordinal(EPOCH_ORDINAL + (int(dt) + utc_offset) // SECONDS_PER_DAY)
+
+
+def location_today(utc_offset, now=None):
+    """Return the current date at a location with the given UTC offset"""
+    return local_date(time.time() if now is None else now, utc_offset)
+
+
+def aggregate_daily(columns, utc_offset, days=5):
+    """Roll forecast columns up into up to `days` per-day summaries
+    
+    utc_offset gives the offset in seconds used to split the slots into days.
+    Slots must be in time order, as the API returns them.
+    """
+    dts = columns['dt']
+    temp = columns['temp']
+    humidity = columns['humidity']
+    wind_speed = columns['wind_speed']
+    precipitation = columns['precipitation']
+    weather = columns['weather']
+    icon = columns['icon']
+    
+    summaries = []
+    start, end = 0, len(dts)
+    while start < end and len(summaries) < days:
+        # Slots of a day are contiguous and sorted, so its end is a binary search
+        day = (dts[start] + utc_offset) // SECONDS_PER_DAY
+        stop = bisect_left(dts, (day + 1) * SECONDS_PER_DAY - utc_offset, start, end)
+        temps = temp[start:stop]
+        count = stop - start
+        
+        # Dominant condition: the most common icon, earliest slot wins ties
+        icons = icon[start:stop]
+        dominant_icon = max(icons, key=icons.count)
+        
+        summaries.append({
+            'date': date.fromordinal(EPOCH_ORDINAL + day),
+            'dt': dts[start],
+            'min_temp': min(temps),
+            'max_temp': max(temps),
+            'mean_temp': sum(temps) / count,
+            'precipitation': sum(precipitation[start:stop]),
+            'humidity': sum(humidity[start:stop]) / count,
+            'wind_speed': sum(wind_speed[start:stop]) / count,
+            'weather': weather[start + icons.index(dominant_icon)]
+        })
+        start = stop
+    
+    return summaries
+
+
+def daily_forecast(data, days=5):
+    """Group 3-hourly forecast slots into per-day summaries
+    
+    Returns up to `days` dicts sorted by date with the min, max and mean
+    temperature, total precipitation, mean humidity and wind, and the
+    day's dominant weather condition. Days are split at local midnight of
+    the forecast location, not of this machine.
+    """
+    return aggregate_daily(forecast_columns(data), forecast_utc_offset(data), days)
+
+
+def current_model(data, place=None):
+    """Normalize current conditions from a current weather or One Call payload
+    
+    One Call payloads carry no city name, so `place` supplies the name, country
+    and ID for them. utc_offset is None for payloads without the location's
+    timezone, such as the group endpoint's.
+    """
+    if 'current' in data:
+        current = values = data['current']
+        name, country, city_id = place['name'], place['country'], place['id']
+        wind_speed = current['wind_speed']
+        utc_offset = data['timezone_offset']
+    else:
+        current, values = data, data['main']
+        name, country, city_id = data['name'], data['sys'].get('country', ''), data.get('id')
+        wind_speed = data['wind']['speed']
+        utc_offset = data.get('timezone')
+    
+    condition = current['weather'][0]
+    return {
+        'id': city_id,
+        'name': name,
+        'country': country,
+        'utc_offset': utc_offset,
+        'dt': current['dt'],
+        'temp': values['temp'],
+        'feels_like': values['feels_like'],
+        'humidity': values['humidity'],
+        'pressure': values['pressure'],
+        'wind_speed': wind_speed,
+        'icon': sys.intern(condition['icon']),
+        'description': sys.intern(condition['description'])
+    }
+
+
+def forecast_model(data, place=None):
+    """Normalize a 5-day/3-hour forecast or One Call payload
+    
+    Returns the location's ID, name, country and UTC offset, taken from `place`
+    for One Call payloads as in current_model, the 'hourly' slots (3-hourly or hourly)
+    as parallel columns and up to MODEL_DAYS 'daily' summaries. Only the fields
+    the app shows are kept, and repeated condition strings are shared, so the
+    raw payload can be dropped right after this. One Call's daily summaries are
+    used as they are; for the 3-hour forecast they are aggregated from the slots.
+    """
+    if 'hourly' in data:
+        place = place or {}
+        utc_offset = data['timezone_offset']
+        slots = data['hourly']
+        hourly = {
+            'dt': list(map(get_dt, slots)),
+            'temp': list(map(get_temp, slots)),
+            'humidity': list(map(get_humidity, slots)),
+            'wind_speed': list(map(get_wind_speed, slots)),
+            'precipitation': [
+                (item['rain'].get('1h', 0) if 'rain' in item else 0) +
+                (item['snow'].get('1h', 0) if 'snow' in item else 0)
+                for item in slots
+            ]
+        }
+        conditions = [weather[0] for weather in map(get_weather, slots)]
+        daily = [{
+            'dt': day['dt'],
+            'min_temp': day['temp']['min'],
+            'max_temp': day['temp']['max'],
+            'mean_temp': (day['temp']['morn'] + day['temp']['day'] + day['temp']['eve'] + day['temp']['night']) / 4,
+            'precipitation': day.get('rain', 0) + day.get('snow', 0),
+            'humidity': day['humidity'],
+            'wind_speed': day['wind_speed'],
+            'icon': sys.intern(day['weather'][0]['icon']),
+            'description': sys.intern(day['weather'][0]['description'])
+        } for day in data.get('daily', [])[:MODEL_DAYS]]
+    else:
+        place = data.get('city') or {}
+        utc_offset = forecast_utc_offset(data)
+        slots = data['list']
+        
+        # The columns extracted for aggregation double as the hourly columns
+        columns = forecast_columns(data)
+        hourly = {name: columns[name] for name in HOURLY_COLUMNS[:5]}
+        conditions = columns['weather']
+        daily = [{
+            'dt': day['dt'],
+            'min_temp': day['min_temp'],
+            'max_temp': day['max_temp'],
+            'mean_temp': day['mean_temp'],
+            'precipitation': day['precipitation'],
+            'humidity': day['humidity'],
+            'wind_speed': day['wind_speed'],
+            'icon': sys.intern(day['weather']['icon']),
+            'description': sys.intern(day['weather']['description'])
+        } for day in aggregate_daily(columns, utc_offset, MODEL_DAYS)]
+    
+    hourly['pop'] = [item.get('pop', 0) for item in slots]
+    hourly['icon'] = [sys.intern(icon) for icon in map(get_icon, conditions)]
+    hourly['description'] = [sys.intern(description) for description in map(get_description, conditions)]
+    
+    return {
+        'id': place.get('id'),
+        'name': place.get('name', ''),
+        'country': place.get('country', ''),
+        'utc_offset': utc_offset,
+        'hourly': hourly,
+        'daily': daily
+    }
@@ -0,0 +1,1411 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import requests
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from weather_core import (
+    DASHBOARD_WORKERS, GROUP_BATCH_SIZE, ICON_DIR, SEARCH_QUEUE_SIZE, SEARCH_WORKERS, UI_TICK_MS, UNITS,
+    FetchCoordinator, UpdateQueue, WeatherClient, WeatherError, WorkerPool, WorkerPoolFull, daily_forecast,
+    forecast_utc_offset, local_date, location_today, normalize_city, payload_digest, refresh_delay
+)
+from weather_icons import (
+    CURRENT_ICON_SIZE, DEFAULT_EMOJI, FORECAST_ICON_SIZE, HOURLY_ICON_SIZE, WEATHER_EMOJI, IconCache
+)
+from weather_metrics import metrics
+from weather_widgets import ForecastChart, NoticeArea, VirtualList
+
+class WeatherApp:
+    def __init__(self, root, client=None, icon_dir=ICON_DIR):
+        """Build the window around `client`, a default WeatherClient if None
+        
+        Background threads start here and use the client right away, so a
+        client for another host or with other stores must be passed in rather
+        than swapped in afterwards.
+        """
+        self.root = root
+        self.root.title("🌤️ Weather Forecast App")
+        self.root.geometry("800x700")
+        self.root.configure(bg='#74b9ff')
+        
+        # API client with pooled connections, response cache and on-disk store
+        self.client = client if client is not None else WeatherClient()
+        self.icon_dir = icon_dir
+        
+        # Bounded background workers for searches; repeated searches are merged
+        # and results of superseded ones dropped
+        self.workers = WorkerPool(SEARCH_WORKERS, SEARCH_QUEUE_SIZE, name='weather-search')
+        self.fetcher = FetchCoordinator(self.workers)
+        self.closed = False
+        
+        # Worker results wait here and are applied in batches on the Tk thread
+        self.updates = UpdateQueue()
+        self.update_job = None
+        
+        # Queue depth, rejections and coalescing in the metrics overlay and dump
+        metrics.register('search_pool', self.workers.stats)
+        metrics.register('ui_updates', self.updates.stats)
+        
+        # Auto-refresh of the displayed city: timer ids and digests of what is on screen
+        self.watched = None
+        self.refresh_jobs = {}
+        self.display_digests = {}
+        
+        # Last failure per city key, cleared when that city loads again
+        self.city_errors = {}
+        
+        # Display widgets are built on first use and then updated in place
+        self.current_widgets = None
+        self.forecast_container = None
+        self.forecast_chart = None
+        self.forecast_cards = []
+        
+        # Every forecast slot in a virtualized list, shown instead of the cards on demand
+        self.hourly_list = None
+        self.hourly_data = None
+        self.forecast_view = 'daily'
+        
+        # Multi-city dashboard state with its own worker pool
+        self.dashboard_pool = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix='weather-dashboard')
+        self.dashboard = None
+        self.dashboard_rows = {}
+        self.dashboard_generation = 0
+        self.dashboard_done = 0
+        self.dashboard_notices = None
+        
+        # Stage timings: start of the current search and the F12 overlay
+        self.search_started = None
+        self.metrics_overlay = None
+        self.metrics_job = None
+        
+        # Condition icons decoded once and shared by every card
+        self.icons = IconCache(self.root, self.icon_dir)
+        
+        # Configure styles
+        self.setup_styles()
+        
+        # Load the offline city index in the background for autocomplete
+        threading.Thread(target=self.client.load_cities, daemon=True).start()
+        
+        # Fetch icon images missing from the disk cache; emoji stand in until then
+        threading.Thread(target=self.download_icons, daemon=True).start()
+        
+        # Create GUI
+        self.create_widgets()
+        
+        # Errors and hints appear here instead of in modal message boxes
+        self.notices = NoticeArea(self.root)
+        
+        # Start applying worker results
+        self.update_job = self.root.after(UI_TICK_MS, self.apply_updates)
+        self.root.bind('<F12>', self.toggle_metrics_overlay)
+        
+        # Center window
+        self.center_window()
+    
+    def setup_styles(self):
+        """Configure custom styles for ttk widgets"""
+        style = ttk.Style()
+        style.theme_use('clam')
+        
+        # Configure custom styles
+        style.configure('Title.TLabel', 
+                       font=('Segoe UI', 24, 'bold'),
+                       background='#74b9ff',
+                       foreground='white')
+        
+        style.configure('Subtitle.TLabel',
+                       font=('Segoe UI', 12),
+                       background='#74b9ff',
+                       foreground='white')
+        
+        style.configure('Custom.TFrame',
+                       background='white',
+                       relief='flat',
+                       borderwidth=0)
+        
+        style.configure('Weather.TLabel',
+                       font=('Segoe UI', 14),
+                       background='white',
+                       foreground='#2d3436')
+        
+        style.configure('Temp.TLabel',
+                       font=('Segoe UI', 32, 'bold'),
+                       background='white',
+                       foreground='#74b9ff')
+        
+        style.configure('Forecast.TLabel',
+                       font=('Segoe UI', 10),
+                       background='#f8f9fa',
+                       foreground='#2d3436')
+    
+    def create_widgets(self):
+        """Create and arrange all GUI widgets"""
+        # Main container
+        main_frame = tk.Frame(self.root, bg='#74b9ff', padx=20, pady=20)
+        main_frame.pack(fill='both', expand=True)
+        
+        # Header
+        header_frame = tk.Frame(main_frame, bg='#74b9ff')
+        header_frame.pack(fill='x', pady=(0, 20))
+        
+        title_label = ttk.Label(header_frame, text="🌤️ Weather Forecast", style='Title.TLabel')
+        title_label.pack()
+        
+        subtitle_label = ttk.Label(header_frame, text="Get current weather and 5-day forecast", style='Subtitle.TLabel')
+        subtitle_label.pack(pady=(5, 0))
+        
+        # Input section
+        input_frame = ttk.Frame(main_frame, style='Custom.TFrame', padding=20)
+        input_frame.pack(fill='x', pady=(0, 20))
+        
+        # City input
+        tk.Label(input_frame, text="City Name:", font=('Segoe UI', 11), bg='white').grid(row=0, column=0, sticky='w', padx=(0, 10))
+        self.city_entry = tk.Entry(input_frame, font=('Segoe UI', 11), width=25, relief='flat', bd=5)
+        self.city_entry.grid(row=0, column=1, padx=(0, 10), sticky='ew')
+        
+        # API Key input
+        tk.Label(input_frame, text="API Key:", font=('Segoe UI', 11), bg='white').grid(row=1, column=0, sticky='w', padx=(0, 10), pady=(10, 0))
+        self.api_entry = tk.Entry(input_frame, font=('Segoe UI', 11), width=25, show='*', relief='flat', bd=5)
+        self.api_entry.grid(row=1, column=1, padx=(0, 10), pady=(10, 0), sticky='ew')
+        
+        # Search button
+        self.search_btn = tk.Button(input_frame, text="🔍 Get Weather", 
+                                   font=('Segoe UI', 11, 'bold'),
+                                   bg='#00b894', fg='white',
+                                   relief='flat', padx=20, pady=10,
+                                   cursor='hand2',
+                                   command=self.get_weather_threaded)
+        self.search_btn.grid(row=0, column=2, rowspan=2, padx=(10, 0), sticky='ns')
+        
+        # Configure grid weights
+        input_frame.columnconfigure(1, weight=1)
+        
+        # API help
+        help_label = tk.Label(input_frame, text="💡 Get free API key at openweathermap.org/api", 
+                             font=('Segoe UI', 9), bg='white', fg='#636e72')
+        help_label.grid(row=2, column=0, columnspan=3, pady=(10, 0))
+        
+        # Current weather section
+        self.current_frame = ttk.Frame(main_frame, style='Custom.TFrame', padding=20)
+        self.current_frame.pack(fill='x', pady=(0, 20))
+        self.current_frame.pack_forget()  # Hide initially
+        
+        # Forecast section
+        self.forecast_frame = ttk.Frame(main_frame, style='Custom.TFrame', padding=20)
+        self.forecast_frame.pack(fill='both', expand=True)
+        self.forecast_frame.pack_forget()  # Hide initially
+        
+        # Bind Enter key
+        self.city_entry.bind('<Return>', lambda e: self.get_weather_threaded())
+        self.api_entry.bind('<Return>', lambda e: self.get_weather_threaded())
+        
+        # Focus on city entry
+        self.city_entry.focus()
+    
+    def center_window(self):
+        """Center the window on screen"""
+        self.root.update_idletasks()
+        x = (self.root.winfo_screenwidth() // 2) - (self.root.winfo_width() // 2)
+        y = (self.root.winfo_screenheight() // 2) - (self.root.winfo_height() // 2)
+        self.root.geometry(f"+{x}+{y}")
+    
+    def get_weather_threaded(self):
+        """Run weather fetch in separate thread to prevent GUI freezing"""
+        city = self.city_entry.get().strip()
+        api_key = self.api_entry.get().strip()
+        
+        if not city:
+            messagebox.showerror("Error", "Please enter a city name")
+            return
+        
+        if not api_key:
+            messagebox.showerror("Error", "Please enter your API key")
+            return
+        
+        # Disable button and show loading
+        self.search_btn.config(state='disabled', text='⏳ Loading...')
+        
+        # Run in thread
+        thread = threading.Thread(target=self.get_weather, args=(city, api_key))
+        thread.daemon = True
+        thread.start()
+    
+    def get_weather(self, city, api_key):
+        """Fetch weather data from API"""
+        try:
+            # Get current weather
+            current_data = self.client.provider.fetch_endpoint('weather', city, api_key)
+            
+            # Get 5-day forecast
+            forecast_data = self.client.provider.fetch_endpoint('forecast', city, api_key)
+            
+            # Update GUI in main thread
+            self.root.after(0, self.display_weather_data, current_data, forecast_data)
+            
+        except requests.exceptions.Timeout:
+            self.root.after(0, self.show_error, "Request timed out. Please try again.")
+        except requests.exceptions.ConnectionError:
+            self.root.after(0, self.show_error, "No internet connection. Please check your network.")
+        except Exception as e:
+            self.root.after(0, self.show_error, str(e))
+        finally:
+            # Re-enable button
+            self.root.after(0, lambda: self.search_btn.config(state='normal', text='🔍 Get Weather'))
+    
+    def show_error(self, message):
+        """Show error message"""
+        messagebox.showerror("Error", message)
+    
+    def display_weather_data(self, current_data, forecast_data):
+        """Display weather data in GUI"""
+        self.display_current_weather(current_data)
+        self.display_forecast(forecast_data)
+    
+    def display_current_weather(self, data):
+        """Display current weather information"""
+        # Clear existing widgets
+        for widget in self.current_frame.winfo_children():
+            widget.destroy()
+        
+        # City name and country
+        city_label = ttk.Label(self.current_frame, 
+                              text=f"{data['name']}, {data['sys']['country']}", 
+                              font=('Segoe UI', 18, 'bold'),
+                              background='white')
+        city_label.pack(pady=(0, 10))
+        
+        # Current temperature
+        temp_label = ttk.Label(self.current_frame, 
+                              text=f"{round(data['main']['temp'])}°C",
+                              style='Temp.TLabel')
+        temp_label.pack(pady=(0, 5))
+        
+        # Weather description
+        desc_label = ttk.Label(self.current_frame,
+                              text=data['weather'][0]['description'].title(),
+                              font=('Segoe UI', 14),
+                              background='white')
+        desc_label.pack(pady=(0, 20))
+        
+        # Details grid
+        details_frame = tk.Frame(self.current_frame, bg='white')
+        details_frame.pack(fill='x')
+        
+        details = [
+            ("Feels Like", f"{round(data['main']['feels_like'])}°C"),
+            ("Humidity", f"{data['main']['humidity']}%"),
+            ("Wind Speed", f"{data['wind']['speed']} m/s"),
+            ("Pressure", f"{data['main']['pressure']} hPa")
+        ]
+        
+        for i, (label, value) in enumerate(details):
+            row = i // 2
+            col = i % 2
+            
+            detail_frame = tk.Frame(details_frame, bg='#f8f9fa', relief='flat', bd=1)
+            detail_frame.grid(row=row, column=col, padx=5, pady=5, sticky='ew')
+            
+            tk.Label(detail_frame, text=label, font=('Segoe UI', 10), 
+                    bg='#f8f9fa', fg='#636e72').pack(pady=(5, 0))
+            tk.Label(detail_frame, text=value, font=('Segoe UI', 12, 'bold'), 
+                    bg='#f8f9fa', fg='#2d3436').pack(pady=(0, 5))
+        
+        # Configure grid weights
+        details_frame.columnconfigure(0, weight=1)
+        details_frame.columnconfigure(1, weight=1)
+        
+        self.current_frame.pack(fill='x', pady=(0, 20))
+    
+    def display_forecast(self, data):
+        """Display 5-day forecast"""
+        # Clear existing widgets
+        for widget in self.forecast_frame.winfo_children():
+            widget.destroy()
+        
+        # Title
+        forecast_title = ttk.Label(self.forecast_frame,
+                                  text="5-Day Forecast",
+                                  font=('Segoe UI', 16, 'bold'),
+                                  background='white')
+        forecast_title.pack(pady=(0, 20))
+        
+        # Group the 3-hourly slots into the first 5 days
+        forecast_days = daily_forecast(data, days=5)
+        
+        # Create forecast grid
+        forecast_grid = tk.Frame(self.forecast_frame, bg='white')
+        forecast_grid.pack(fill='both', expand=True)
+        
+        for i, day_data in enumerate(forecast_days):
+            # Calculate temperatures
+            date = day_data['date']
+            max_temp = round(day_data['max_temp'])
+            min_temp = round(day_data['min_temp'])
+            
+            # Determine day name
+            today = location_today(forecast_utc_offset(data))
+            if date == today:
+                day_name = "Today"
+            elif date == today + timedelta(days=1):
+                day_name = "Tomorrow"
+            else:
+                day_name = date.strftime("%A")
+            
+            # Create forecast card
+            card_frame = tk.Frame(forecast_grid, bg='#f8f9fa', relief='solid', bd=1)
+            card_frame.grid(row=i//3, column=i%3, padx=10, pady=10, sticky='ew')
+            
+            # Day name
+            day_label = tk.Label(card_frame, text=day_name,
+                               font=('Segoe UI', 12, 'bold'),
+                               bg='#f8f9fa', fg='#2d3436')
+            day_label.pack(pady=(10, 5))
+            
+            # Weather icon (emoji)
+            icon = self.get_weather_emoji(day_data['weather']['icon'])
+            icon_label = tk.Label(card_frame, text=icon, font=('Segoe UI', 24),
+                                bg='#f8f9fa')
+            icon_label.pack(pady=5)
+            
+            # Temperature
+            temp_label = tk.Label(card_frame, text=f"{max_temp}° / {min_temp}°",
+                                font=('Segoe UI', 12, 'bold'),
+                                bg='#f8f9fa', fg='#74b9ff')
+            temp_label.pack(pady=5)
+            
+            # Description
+            desc_label = tk.Label(card_frame, text=day_data['weather']['description'].title(),
+                                font=('Segoe UI', 9),
+                                bg='#f8f9fa', fg='#636e72',
+                                wraplength=120)
+            desc_label.pack(pady=(0, 10))
+        
+        # Configure grid weights
+        for i in range(3):
+            forecast_grid.columnconfigure(i, weight=1)
+        
+        self.forecast_frame.pack(fill='both', expand=True)
+    
+    def get_weather_emoji(self, icon_code):
+        """Convert weather icon code to emoji"""
+        return WEATHER_EMOJI.get(icon_code, DEFAULT_EMOJI)
+    
+    def set_icon(self, label, icon_code, size):
+        """Show a condition icon on a label, or its emoji when the image is not available"""
+        label.icon_code = icon_code
+        label.icon_size = size
+        image = self.icons.get(icon_code, size)
+        if image is None:
+            label.config(image='', text=self.get_weather_emoji(icon_code))
+        else:
+            label.config(image=image, text='')
+        
+        # The label must hold a reference or Tk blanks the image once the cache drops it
+        label.image = image
+    
+    def download_icons(self):
+        """Download missing icon images in the background and show them once they arrive"""
+        if self.client.download_icons(self.icon_dir):
+            self.updates.post('icons', self.refresh_icons)
+    
+    def refresh_icons(self):
+        """Replace emoji on the displayed cards with the newly downloaded images"""
+        if self.closed:
+            return
+        self.icons.reload()
+        
+        labels = [card['icon'] for card in self.forecast_cards]
+        if self.current_widgets is not None:
+            labels.append(self.current_widgets['icon'])
+        for label in labels:
+            if getattr(label, 'icon_code', None):
+                self.set_icon(label, label.icon_code, label.icon_size)
+        
+        if self.hourly_list is not None:
+            self.hourly_list.refresh()
+    
+    def create_widgets(self):
+        """Create and arrange all GUI widgets"""
+        # Main container with padding
+        main_frame = tk.Frame(self.root, bg='#74b9ff', padx=30, pady=30)
+        main_frame.pack(fill='both', expand=True)
+        
+        # Header section
+        header_frame = tk.Frame(main_frame, bg='#74b9ff')
+        header_frame.pack(fill='x', pady=(0, 30))
+        
+        title_label = ttk.Label(header_frame, text="🌤️ Weather Forecast", style='Title.TLabel')
+        title_label.pack()
+        
+        subtitle_label = ttk.Label(header_frame, text="Get current weather and 5-day forecast for any city", style='Subtitle.TLabel')
+        subtitle_label.pack(pady=(8, 0))
+        
+        # Input section with rounded appearance
+        input_container = tk.Frame(main_frame, bg='white', relief='flat', bd=0)
+        input_container.pack(fill='x', pady=(0, 25))
+        
+        input_frame = tk.Frame(input_container, bg='white', padx=25, pady=25)
+        input_frame.pack(fill='x')
+        
+        # City input row
+        city_row = tk.Frame(input_frame, bg='white')
+        city_row.pack(fill='x', pady=(0, 15))
+        
+        tk.Label(city_row, text="🏙️ City:", font=('Segoe UI', 11, 'bold'), bg='white', fg='#2d3436').pack(side='left')
+        self.city_entry = tk.Entry(city_row, font=('Segoe UI', 11), width=30, relief='solid', bd=1)
+        self.city_entry.pack(side='left', padx=(10, 0), fill='x', expand=True)
+        
+        # API key input row
+        api_row = tk.Frame(input_frame, bg='white')
+        api_row.pack(fill='x', pady=(0, 20))
+        
+        tk.Label(api_row, text="🔑 API Key:", font=('Segoe UI', 11, 'bold'), bg='white', fg='#2d3436').pack(side='left')
+        self.api_entry = tk.Entry(api_row, font=('Segoe UI', 11), width=30, show='*', relief='solid', bd=1)
+        self.api_entry.pack(side='left', padx=(10, 0), fill='x', expand=True)
+        
+        # Pre-fill the API key from the environment so saved data can refresh on its own
+        env_api_key = os.environ.get('OPENWEATHER_API_KEY', '')
+        if env_api_key:
+            self.api_entry.insert(0, env_api_key)
+        
+        # Button row
+        button_row = tk.Frame(input_frame, bg='white')
+        button_row.pack(fill='x')
+        
+        self.search_btn = tk.Button(button_row, text="🔍 Get Weather Forecast", 
+                                   font=('Segoe UI', 12, 'bold'),
+                                   bg='#00b894', fg='white',
+                                   relief='flat', padx=30, pady=12,
+                                   cursor='hand2',
+                                   command=self.get_weather_threaded)
+        self.search_btn.pack(side='left')
+        
+        self.dashboard_btn = tk.Button(button_row, text="📊 Dashboard",
+                                      font=('Segoe UI', 12, 'bold'),
+                                      bg='#0984e3', fg='white',
+                                      relief='flat', padx=20, pady=12,
+                                      cursor='hand2',
+                                      command=self.open_dashboard)
+        self.dashboard_btn.pack(side='left', padx=(10, 0))
+        
+        # Help text
+        help_label = tk.Label(input_frame, text="💡 Get your free API key at openweathermap.org/api", 
+                             font=('Segoe UI', 9), bg='white', fg='#74b9ff')
+        help_label.pack(pady=(15, 0))
+        
+        # Status line for saved or offline data (initially hidden)
+        self.status_label = tk.Label(input_frame, text="", font=('Segoe UI', 9, 'italic'),
+                                     bg='white', fg='#e17055')
+        
+        # Current weather section (initially hidden)
+        self.current_frame = tk.Frame(main_frame, bg='white', relief='flat', bd=0)
+        
+        # Forecast section (initially hidden)
+        self.forecast_frame = tk.Frame(main_frame, bg='white', relief='flat', bd=0)
+        
+        # Bind Enter key to both inputs
+        self.city_entry.bind('<Return>', lambda e: self.get_weather_threaded())
+        self.api_entry.bind('<Return>', lambda e: self.get_weather_threaded())
+        
+        # Set placeholder text
+        self.city_entry.insert(0, "e.g., London, New York, Tokyo")
+        self.city_entry.bind('<FocusIn>', self.clear_placeholder)
+        
+        # City name suggestions from the offline index, shown below the entry
+        self.suggestions = tk.Listbox(main_frame, font=('Segoe UI', 10), height=6,
+                                      relief='solid', bd=1, activestyle='none')
+        self.city_entry.bind('<KeyRelease>', self.update_suggestions)
+        self.city_entry.bind('<Down>', self.focus_suggestions)
+        self.city_entry.bind('<Escape>', lambda e: self.hide_suggestions())
+        self.suggestions.bind('<Return>', self.pick_suggestion)
+        self.suggestions.bind('<ButtonRelease-1>', self.pick_suggestion)
+        self.suggestions.bind('<Escape>', lambda e: (self.hide_suggestions(), self.city_entry.focus()))
+        
+        # Focus on city entry
+        self.city_entry.focus()
+    
+    def clear_placeholder(self, event):
+        """Clear placeholder text when focused"""
+        if self.city_entry.get() == "e.g., London, New York, Tokyo":
+            self.city_entry.delete(0, tk.END)
+    
+    def update_suggestions(self, event):
+        """Show matching city names while the user types"""
+        if event.keysym in ('Return', 'KP_Enter', 'Down', 'Up', 'Escape', 'Tab'):
+            return
+        
+        labels = self.client.cities.complete(self.city_entry.get(), limit=6)
+        if not labels:
+            self.hide_suggestions()
+            return
+        
+        self.suggestions.delete(0, tk.END)
+        for label in labels:
+            self.suggestions.insert(tk.END, label)
+        self.suggestions.config(height=len(labels))
+        self.suggestions.place(in_=self.city_entry, relx=0, rely=1, relwidth=1)
+        self.suggestions.lift()
+    
+    def focus_suggestions(self, event):
+        """Move keyboard focus into the suggestion list"""
+        if self.suggestions.winfo_ismapped():
+            self.suggestions.focus()
+            self.suggestions.selection_set(0)
+            self.suggestions.activate(0)
+    
+    def pick_suggestion(self, event):
+        """Put the chosen suggestion in the city entry"""
+        selection = self.suggestions.curselection()
+        if selection:
+            self.city_entry.delete(0, tk.END)
+            self.city_entry.insert(0, self.suggestions.get(selection[0]))
+        self.hide_suggestions()
+        self.city_entry.focus()
+        self.city_entry.icursor(tk.END)
+    
+    def hide_suggestions(self):
+        """Hide the suggestion list"""
+        self.suggestions.place_forget()
+    
+    def get_weather_threaded(self):
+        """Run weather fetch in separate thread"""
+        city = self.city_entry.get().strip()
+        api_key = self.api_entry.get().strip()
+        
+        # Clear placeholder if still there
+        if city == "e.g., London, New York, Tokyo":
+            city = ""
+        
+        if not city:
+            self.notices.show(('input', None), "Please enter a city name", 'warning')
+            self.city_entry.focus()
+            return
+        
+        if not api_key:
+            self.notices.show(('input', None), "Please enter your OpenWeatherMap API key", 'warning')
+            self.api_entry.focus()
+            return
+        
+        self.notices.dismiss(('input', None))
+        
+        self.hide_suggestions()
+        self.search_started = time.perf_counter()
+        
+        # Cached data for both parts renders right away without a network thread
+        cached = self.client.lookup_cache(city)
+        if 'weather' in cached and 'forecast' in cached:
+            # Any search still loading is now out of date
+            self.fetcher.supersede()
+            self.reset_search_button()
+            self.update_weather_display(cached['weather'], cached['forecast'])
+            self.watch_city(city, api_key, cached['weather'], cached['forecast'])
+            metrics.record('search', time.perf_counter() - self.search_started)
+            return
+        
+        self.start_fetch(city, api_key, cached)
+    
+    def start_fetch(self, city, api_key, cached=None):
+        """Fetch a city in the background, replacing any search still loading"""
+        # Update button state
+        self.search_btn.config(state='disabled', text='⏳ Fetching Weather...', bg='#b2bec3')
+        
+        # Identical searches in flight are joined, older different ones are dropped
+        key = (normalize_city(city), api_key)
+        ticket, future = self.fetcher.submit(key, self.fetch_weather_data, city, api_key, cached)
+        future.add_done_callback(lambda f: self.on_fetch_done(ticket, city, api_key, f))
+    
+    def on_fetch_done(self, ticket, city, api_key, future):
+        """Hand a finished fetch over to the main thread (runs on a worker thread)"""
+        # Keyed by ticket: the same city searched with another key is a different result
+        self.updates.post(('search', ticket), self.show_fetch_result,
+                          ticket, city, api_key, future, time.perf_counter())
+    
+    def fetch_weather_data(self, city, api_key, cached=None):
+        """Fetch weather data from OpenWeatherMap API
+        
+        Runs on a worker thread and returns (current_data, forecast_data, error, saved_at).
+        """
+        with metrics.span('fetch'):
+            current_data, forecast_data, error = self.client.fetch_weather(city, api_key, cached)
+        saved_at = None
+        
+        # Nothing arrived: fall back to the saved copy for this city if there is
+        # one, still reporting why
+        if current_data is None and forecast_data is None:
+            saved = self.client.load_saved(city)
+            if saved is not None:
+                _, saved_at, current_data, forecast_data = saved
+        
+        return current_data, forecast_data, error, saved_at
+    
+    def show_fetch_result(self, ticket, city, api_key, future, finished_at=None):
+        """Show a finished fetch on the main thread unless a newer search replaced it
+        
+        finished_at is when the worker handed the result over, to time the wait
+        for the event loop.
+        """
+        if finished_at is not None:
+            metrics.record('dispatch', time.perf_counter() - finished_at)
+        
+        if not self.fetcher.is_current(ticket):
+            return
+        
+        # Reset button
+        self.reset_search_button()
+        
+        result, error = self.client.wait_for_result(future, city)
+        if error:
+            self.report_city_error(city, error)
+            return
+        current_data, forecast_data, error, saved_at = result
+        
+        # Show whatever part arrived and keep it up to date from now on
+        if current_data is not None or forecast_data is not None:
+            self.update_weather_display(current_data, forecast_data, saved_at)
+            self.watch_city(city, api_key, current_data, forecast_data)
+            if self.search_started is not None:
+                metrics.record('search', time.perf_counter() - self.search_started)
+        
+        if error:
+            self.report_city_error(city, error)
+        else:
+            self.clear_city_error(city)
+    
+    def restore_saved_weather(self):
+        """Show the last viewed city from disk, then refresh it in the background"""
+        saved = self.client.load_saved()
+        if saved is None:
+            return
+        
+        city, saved_at, current_data, forecast_data = saved
+        self.update_weather_display(current_data, forecast_data, saved_at)
+        
+        # Put the saved city in the search box in place of the placeholder
+        self.city_entry.delete(0, tk.END)
+        self.city_entry.insert(0, current_data.get('name', city))
+        
+        api_key = self.api_entry.get().strip()
+        if api_key:
+            self.start_fetch(city, api_key, {})
+    
+    def watch_city(self, city, api_key, current_data, forecast_data):
+        """Start auto-refreshing the displayed city, replacing any earlier one
+        
+        Every endpoint gets its own timer: the current weather and the forecast
+        separately, or a single One Call timer that refreshes both.
+        """
+        for job in self.refresh_jobs.values():
+            self.root.after_cancel(job)
+        self.refresh_jobs = {}
+        
+        self.watched = (normalize_city(city), city, api_key)
+        models = {'weather': current_data, 'forecast': forecast_data}
+        for endpoint in self.client.provider.endpoints(list(models)):
+            self.schedule_refresh(endpoint, models.get(endpoint))
+    
+    def schedule_refresh(self, endpoint, data):
+        """Arm the timer for the next refresh of one endpoint"""
+        delay = refresh_delay(endpoint, data)
+        self.refresh_jobs[endpoint] = self.root.after(int(delay * 1000), self.auto_refresh, endpoint)
+    
+    def auto_refresh(self, endpoint):
+        """Timer callback: fetch one endpoint of the watched city in the background"""
+        self.refresh_jobs.pop(endpoint, None)
+        watched = self.watched
+        _, city, api_key = watched
+        
+        try:
+            future = self.workers.submit(self.refresh_endpoint, endpoint, city, api_key)
+        except WorkerPoolFull:
+            # Busy with searches; try again at the next interval
+            self.schedule_refresh(endpoint, None)
+            return
+        
+        future.add_done_callback(lambda f: self.on_refresh_done(endpoint, watched, f))
+    
+    def on_refresh_done(self, endpoint, watched, future):
+        """Hand a finished refresh over to the main thread (runs on a worker thread)"""
+        self.updates.post(('refresh', endpoint, watched[0]), self.apply_refresh, endpoint, watched, future)
+    
+    def refresh_endpoint(self, endpoint, city, api_key):
+        """Fetch fresh models of an endpoint and their digests, keyed by part (runs on a worker thread)"""
+        models = self.client.fetch_models(endpoint, city, api_key)
+        return models, {part: payload_digest(model) for part, model in models.items()}
+    
+    def apply_refresh(self, endpoint, watched, future):
+        """Show a refreshed payload if it changed, then schedule the next refresh"""
+        # The user has moved on to another city since this refresh started
+        if watched != self.watched or endpoint in self.refresh_jobs:
+            return
+        
+        # Dropped from the queue to make room for searches: nothing failed, try again later
+        if future.cancelled():
+            self.schedule_refresh(endpoint, None)
+            return
+        
+        result, error = self.client.wait_for_result(future, watched[1])
+        if error:
+            # Keep showing what we have and retry at the normal interval
+            self.report_city_error(watched[1], error, refresh=True)
+            self.schedule_refresh(endpoint, None)
+            return
+        models, digests = result
+        self.clear_city_error(watched[1])
+        
+        # Unchanged data costs no re-render
+        for part, data in models.items():
+            if digests[part] == self.display_digests.get(part):
+                continue
+            self.display_digests[part] = digests[part]
+            self.status_label.pack_forget()
+            if part == 'weather':
+                with metrics.span('render_current'):
+                    self.show_current_weather(data)
+            else:
+                with metrics.span('render_forecast'):
+                    self.show_forecast(data)
+        
+        self.schedule_refresh(endpoint, models.get(endpoint))
+    
+    def open_dashboard(self):
+        """Open the multi-city dashboard window"""
+        if self.dashboard is not None and self.dashboard.winfo_exists():
+            self.dashboard.lift()
+            return
+        
+        self.dashboard = tk.Toplevel(self.root)
+        self.dashboard.title("📊 Weather Dashboard")
+        self.dashboard.geometry("720x640")
+        self.dashboard.configure(bg='#74b9ff')
+        self.dashboard.protocol("WM_DELETE_WINDOW", self.close_dashboard)
+        
+        main_frame = tk.Frame(self.dashboard, bg='#74b9ff', padx=20, pady=20)
+        main_frame.pack(fill='both', expand=True)
+        
+        # City list input
+        input_frame = tk.Frame(main_frame, bg='white', padx=15, pady=15)
+        input_frame.pack(fill='x', pady=(0, 15))
+        
+        tk.Label(input_frame, text="🏙️ Cities (comma or one per line, names or city IDs):",
+                font=('Segoe UI', 10, 'bold'), bg='white', fg='#2d3436').pack(anchor='w')
+        self.dashboard_input = tk.Text(input_frame, font=('Segoe UI', 10), height=4, relief='solid', bd=1)
+        self.dashboard_input.pack(fill='x', pady=(5, 10))
+        
+        self.dashboard_load_btn = tk.Button(input_frame, text="🔄 Load Dashboard",
+                                           font=('Segoe UI', 11, 'bold'),
+                                           bg='#00b894', fg='white',
+                                           relief='flat', padx=20, pady=8,
+                                           cursor='hand2',
+                                           command=self.load_dashboard)
+        self.dashboard_load_btn.pack(side='left')
+        
+        self.dashboard_progress = tk.Label(input_frame, text="", font=('Segoe UI', 9),
+                                           bg='white', fg='#636e72')
+        self.dashboard_progress.pack(side='left', padx=(15, 0))
+        
+        # Scrollable list of compact city rows
+        list_frame = tk.Frame(main_frame, bg='white')
+        list_frame.pack(fill='both', expand=True)
+        
+        canvas = tk.Canvas(list_frame, bg='white', highlightthickness=0)
+        scrollbar = tk.Scrollbar(list_frame, orient='vertical', command=canvas.yview)
+        self.dashboard_list = tk.Frame(canvas, bg='white')
+        self.dashboard_list.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
+        canvas.create_window((0, 0), window=self.dashboard_list, anchor='nw')
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        
+        self.dashboard_rows = {}
+        self.dashboard_notices = NoticeArea(self.dashboard)
+    
+    def close_dashboard(self):
+        """Close the dashboard and drop any results still on the way"""
+        self.dashboard_generation += 1
+        self.dashboard.destroy()
+        self.dashboard = None
+        self.dashboard_rows = {}
+    
+    def load_dashboard(self):
+        """Start fetching current conditions for every city in the dashboard list"""
+        text = self.dashboard_input.get('1.0', tk.END).replace('\n', ',')
+        cities = []
+        seen = set()
+        for city in text.split(','):
+            city = city.strip()
+            if city and normalize_city(city) not in seen:
+                seen.add(normalize_city(city))
+                cities.append(city)
+        
+        api_key = self.api_entry.get().strip()
+        
+        if not cities:
+            self.dashboard_notices.show(('input', None), "Please enter at least one city", 'warning')
+            return
+        
+        if not api_key:
+            self.dashboard_notices.show(('input', None), "Please enter your OpenWeatherMap API key", 'warning')
+            return
+        
+        self.dashboard_notices.dismiss(('input', None))
+        
+        # Drop rows for cities no longer in the list, keep the others for in-place updates
+        for city in list(self.dashboard_rows):
+            if city not in seen:
+                self.dashboard_rows.pop(city)['row'].destroy()
+        
+        # Results from an earlier load are ignored once a new one starts
+        self.dashboard_generation += 1
+        self.dashboard_done = 0
+        self.dashboard_progress.config(text=f"0 / {len(cities)} cities")
+        
+        thread = threading.Thread(target=self.fetch_dashboard,
+                                  args=(cities, api_key, self.dashboard_generation))
+        thread.daemon = True
+        thread.start()
+    
+    def fetch_dashboard(self, cities, api_key, generation):
+        """Fetch current conditions for many cities on the dashboard worker pool"""
+        # Cached cities render right away, the rest are fetched
+        cached = []
+        by_id = {}
+        by_name = []
+        for city in cities:
+            data = self.client.cache.get('weather', city, UNITS)
+            if data is not None:
+                cached.append((city, data, None))
+            # Cities with a known ID go through the group endpoint in batches
+            elif self.client.city_id(city) is not None:
+                by_id.setdefault(self.client.city_id(city), []).append(city)
+            else:
+                by_name.append(city)
+        
+        if cached:
+            self.post_dashboard_rows(generation, len(cities), cached)
+        
+        ids = list(by_id)
+        futures = {}
+        for start in range(0, len(ids), GROUP_BATCH_SIZE):
+            batch = ids[start:start + GROUP_BATCH_SIZE]
+            future = self.dashboard_pool.submit(self.client.fetch_group, batch, api_key)
+            futures[future] = [(city, city_id) for city_id in batch for city in by_id[city_id]]
+        
+        for city in by_name:
+            future = self.dashboard_pool.submit(self.client.fetch_models, 'weather', city, api_key)
+            futures[future] = [(city, None)]
+        
+        # Render each batch as soon as it arrives
+        for future in as_completed(futures):
+            if generation != self.dashboard_generation:
+                for pending in futures:
+                    pending.cancel()
+                return
+            
+            batch_cities = futures[future]
+            data, error = self.client.wait_for_result(future)
+            
+            results = []
+            if error:
+                results = [(city, None, error) for city, _ in batch_cities]
+            else:
+                for city, city_id in batch_cities:
+                    if city_id is None:
+                        results.append((city, data['weather'], None))
+                        continue
+                    model = data.get(city_id)
+                    if model:
+                        self.client.cache.put('weather', city, UNITS, model)
+                    results.append((city, model, None if model else WeatherError("No data returned", city)))
+            
+            self.post_dashboard_rows(generation, len(cities), results)
+    
+    def post_dashboard_rows(self, generation, total, results):
+        """Queue dashboard results for the main thread, one update per city (runs on a worker thread)"""
+        # Keyed by generation too, so an older load never replaces a newer one's row
+        for result in results:
+            self.updates.post(('dashboard', generation, normalize_city(result[0])), self.show_dashboard_rows,
+                              generation, total, [result])
+    
+    def show_dashboard_rows(self, generation, total, results):
+        """Add or update dashboard rows for a batch of results"""
+        if generation != self.dashboard_generation or self.dashboard is None:
+            return
+        
+        for city, data, error in results:
+            key = normalize_city(city)
+            row = self.dashboard_rows.get(key)
+            if row is None:
+                row = self.create_dashboard_row()
+                self.dashboard_rows[key] = row
+            
+            if error:
+                row['city'].config(text=city)
+                row['temp'].config(text="⚠️")
+                row['description'].config(text=str(error))
+                row['details'].config(text="")
+                
+                # A bad key or lost connection fails every row; say so once
+                if error.shared:
+                    self.dashboard_notices.show((error.kind, None), str(error))
+            else:
+                row['city'].config(text=f"{data['name']}, {data['country']}")
+                icon = self.get_weather_emoji(data['icon'])
+                row['temp'].config(text=f"{icon} {round(data['temp'])}°C")
+                row['description'].config(text=data['description'].title())
+                row['details'].config(text=f"💧 {data['humidity']}%  💨 {data['wind_speed']} m/s")
+        
+        self.dashboard_done += len(results)
+        self.dashboard_progress.config(text=f"{self.dashboard_done} / {total} cities")
+    
+    def create_dashboard_row(self):
+        """Build one compact dashboard row and return its labels"""
+        row = tk.Frame(self.dashboard_list, bg='#f8f9fa', padx=10, pady=6)
+        row.pack(fill='x', pady=2)
+        
+        city_label = tk.Label(row, font=('Segoe UI', 10, 'bold'), bg='#f8f9fa', fg='#2d3436',
+                              width=22, anchor='w')
+        city_label.pack(side='left')
+        
+        temp_label = tk.Label(row, font=('Segoe UI', 11, 'bold'), bg='#f8f9fa', fg='#74b9ff',
+                              width=9, anchor='w')
+        temp_label.pack(side='left')
+        
+        desc_label = tk.Label(row, font=('Segoe UI', 9), bg='#f8f9fa', fg='#636e72',
+                              width=22, anchor='w')
+        desc_label.pack(side='left')
+        
+        details_label = tk.Label(row, font=('Segoe UI', 9), bg='#f8f9fa', fg='#636e72', anchor='e')
+        details_label.pack(side='right')
+        
+        return {
+            'row': row,
+            'city': city_label,
+            'temp': temp_label,
+            'description': desc_label,
+            'details': details_label
+        }
+    
+    def apply_updates(self):
+        """Apply the worker results that arrived since the last tick, then lay out once"""
+        batch = self.updates.drain()
+        if batch:
+            with metrics.span('ui_batch'):
+                for function, args in batch:
+                    try:
+                        function(*args)
+                    except Exception:
+                        self.root.report_callback_exception(*sys.exc_info())
+                    if self.closed:
+                        return
+                self.root.update_idletasks()
+        
+        self.update_job = self.root.after(UI_TICK_MS, self.apply_updates)
+    
+    def close(self):
+        """Stop background work and close the window"""
+        self.closed = True
+        self.root.after_cancel(self.update_job)
+        self.dashboard_generation += 1
+        self.workers.shutdown()
+        self.dashboard_pool.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+        self.root.destroy()
+    
+    def toggle_metrics_overlay(self, event=None):
+        """Show or hide the p50/p95 stage timings in the corner of the window"""
+        if self.metrics_overlay is not None:
+            self.root.after_cancel(self.metrics_job)
+            self.metrics_overlay.destroy()
+            self.metrics_overlay = None
+            return
+        
+        self.metrics_overlay = tk.Label(self.root, font=('Consolas', 9), justify='left',
+                                        bg='#2d3436', fg='#dfe6e9', padx=10, pady=8, cursor='hand2')
+        self.metrics_overlay.place(relx=1.0, x=-10, y=10, anchor='ne')
+        self.metrics_overlay.bind('<Button-1>', self.copy_metrics)
+        self.update_metrics_overlay()
+    
+    def update_metrics_overlay(self):
+        """Refresh the timing overlay every second while it is shown"""
+        self.metrics_overlay.config(text=metrics.table() + "\n\nClick to copy as Prometheus text")
+        self.metrics_overlay.lift()
+        self.metrics_job = self.root.after(1000, self.update_metrics_overlay)
+    
+    def copy_metrics(self, event=None):
+        """Copy the stage timings to the clipboard in the Prometheus text format"""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(metrics.prometheus())
+    
+    def reset_search_button(self):
+        """Reset search button to original state"""
+        self.search_btn.config(state='normal', text='🔍 Get Weather Forecast', bg='#00b894')
+    
+    def update_weather_display(self, current_data, forecast_data, saved_at=None):
+        """Update the weather display with fetched data
+        
+        saved_at is set when the data comes from the on-disk store and may be stale.
+        """
+        if saved_at is not None:
+            saved_time = datetime.fromtimestamp(saved_at).strftime("%b %d %H:%M")
+            self.status_label.config(text=f"🕒 Showing saved data from {saved_time}")
+            self.status_label.pack(pady=(8, 0))
+        else:
+            self.status_label.pack_forget()
+        
+        self.display_digests = {
+            'weather': payload_digest(current_data) if current_data is not None else None,
+            'forecast': payload_digest(forecast_data) if forecast_data is not None else None
+        }
+        
+        # Either part may be missing if only one of the two requests succeeded
+        if current_data is not None:
+            with metrics.span('render_current'):
+                self.show_current_weather(current_data)
+        else:
+            self.current_frame.pack_forget()
+        
+        if forecast_data is not None:
+            with metrics.span('render_forecast'):
+                self.show_forecast(forecast_data)
+        else:
+            self.forecast_frame.pack_forget()
+    
+    def show_current_weather(self, data):
+        """Display current weather in a beautiful card"""
+        # Build the card once, later refreshes only change label text
+        if self.current_widgets is None:
+            self.current_widgets = self.create_current_card()
+        widgets = self.current_widgets
+        
+        widgets['location'].config(text=f"📍 {data['name']}, {data['country']}")
+        self.set_icon(widgets['icon'], data['icon'], CURRENT_ICON_SIZE)
+        widgets['temp'].config(text=f"{round(data['temp'])}°C")
+        widgets['description'].config(text=data['description'].title())
+        
+        details = [
+            f"{round(data['feels_like'])}°C",
+            f"{data['humidity']}%",
+            f"{data['wind_speed']} m/s",
+            f"{data['pressure']} hPa"
+        ]
+        
+        for value_label, value in zip(widgets['details'], details):
+            value_label.config(text=value)
+        
+        # Keep the current weather above the forecast if that is already shown
+        if self.forecast_frame.winfo_manager():
+            self.current_frame.pack(fill='x', pady=(0, 25), before=self.forecast_frame)
+        else:
+            self.current_frame.pack(fill='x', pady=(0, 25))
+    
+    def create_current_card(self):
+        """Build the current weather card and return its updatable labels"""
+        # Current weather card
+        current_card = tk.Frame(self.current_frame, bg='white', padx=30, pady=25)
+        current_card.pack(fill='x')
+        
+        # Location
+        location_label = tk.Label(current_card, 
+                                 font=('Segoe UI', 16, 'bold'),
+                                 bg='white', fg='#2d3436')
+        location_label.pack(pady=(0, 15))
+        
+        # Main temperature display
+        temp_frame = tk.Frame(current_card, bg='white')
+        temp_frame.pack(pady=(0, 20))
+        
+        # Weather icon
+        icon_label = tk.Label(temp_frame, font=('Segoe UI', 48), bg='white')
+        icon_label.pack(side='left', padx=(0, 20))
+        
+        # Temperature and description
+        temp_info = tk.Frame(temp_frame, bg='white')
+        temp_info.pack(side='left')
+        
+        temp_label = tk.Label(temp_info,
+                             font=('Segoe UI', 36, 'bold'),
+                             bg='white', fg='#74b9ff')
+        temp_label.pack(anchor='w')
+        
+        desc_label = tk.Label(temp_info,
+                             font=('Segoe UI', 14),
+                             bg='white', fg='#636e72')
+        desc_label.pack(anchor='w')
+        
+        # Weather details
+        details_container = tk.Frame(current_card, bg='white')
+        details_container.pack(fill='x', pady=(20, 0))
+        
+        detail_names = ["🌡️ Feels Like", "💧 Humidity", "💨 Wind Speed", "📊 Pressure"]
+        detail_values = []
+        
+        for i, label in enumerate(detail_names):
+            row = i // 2
+            col = i % 2
+            
+            detail_card = tk.Frame(details_container, bg='#f1f3f4', relief='flat', bd=0)
+            detail_card.grid(row=row, column=col, padx=8, pady=8, sticky='ew')
+            
+            tk.Label(detail_card, text=label, font=('Segoe UI', 10), 
+                    bg='#f1f3f4', fg='#636e72').pack(pady=(8, 2))
+            value_label = tk.Label(detail_card, font=('Segoe UI', 12, 'bold'), 
+                                  bg='#f1f3f4', fg='#2d3436')
+            value_label.pack(pady=(0, 8))
+            detail_values.append(value_label)
+        
+        # Configure grid
+        details_container.columnconfigure(0, weight=1)
+        details_container.columnconfigure(1, weight=1)
+        
+        return {
+            'location': location_label,
+            'icon': icon_label,
+            'temp': temp_label,
+            'description': desc_label,
+            'details': detail_values
+        }
+    
+    def show_forecast(self, data):
+        """Display 5-day forecast in cards"""
+        # Build the title and card container once
+        if self.forecast_container is None:
+            self.create_forecast_section()
+        
+        # The model holds up to 8 days, the cards show the next 5
+        forecast_days = data['daily'][:5]
+        
+        # "Today" and "Tomorrow" refer to the forecast location, not this machine
+        today = location_today(data['utc_offset'])
+        
+        # Only add or remove cards when the number of days changes
+        while len(self.forecast_cards) < len(forecast_days):
+            self.forecast_cards.append(self.create_forecast_card())
+        while len(self.forecast_cards) > len(forecast_days):
+            self.forecast_cards.pop()['card'].destroy()
+        
+        # Fill in the forecast cards
+        for card, day_data in zip(self.forecast_cards, forecast_days):
+            date = local_date(day_data['dt'], data['utc_offset'])
+            max_temp = round(day_data['max_temp'])
+            min_temp = round(day_data['min_temp'])
+            
+            # Determine day name
+            if date == today:
+                day_name = "Today"
+            elif date == today + timedelta(days=1):
+                day_name = "Tomorrow"
+            else:
+                day_name = date.strftime("%A")
+            
+            date_str = date.strftime("%b %d")
+            
+            card['day'].config(text=f"{day_name} • {date_str}")
+            card['description'].config(text=day_data['description'].title())
+            self.set_icon(card['icon'], day_data['icon'], FORECAST_ICON_SIZE)
+            card['max_temp'].config(text=f"{max_temp}°")
+            card['min_temp'].config(text=f"{min_temp}°")
+        
+        # The chart moves its existing items, the hourly list only re-renders the rows in view
+        self.forecast_chart.set_data(data['hourly'], data['utc_offset'])
+        self.hourly_data = data
+        self.hourly_list.set_count(len(data['hourly']['dt']))
+        
+        self.forecast_frame.pack(fill='both', expand=True)
+    
+    def create_forecast_section(self):
+        """Build the forecast title and the container that holds the cards"""
+        # Forecast title
+        title_frame = tk.Frame(self.forecast_frame, bg='white', pady=15)
+        title_frame.pack(fill='x')
+        
+        self.forecast_title = tk.Label(title_frame, text="📅 5-Day Forecast",
+                                      font=('Segoe UI', 18, 'bold'),
+                                      bg='white', fg='#2d3436')
+        self.forecast_title.pack()
+        
+        self.forecast_view_btn = tk.Button(title_frame, text="🕒 Hourly",
+                                           font=('Segoe UI', 9, 'bold'),
+                                           bg='#0984e3', fg='white',
+                                           relief='flat', padx=10, pady=4,
+                                           cursor='hand2',
+                                           command=self.toggle_forecast_view)
+        self.forecast_view_btn.place(relx=1.0, x=-20, rely=0.5, anchor='e')
+        
+        # Temperature, chance of rain and wind of every slot, with hover details
+        self.forecast_chart = ForecastChart(self.forecast_frame, height=150)
+        self.forecast_chart.pack(fill='x', padx=20, pady=(0, 10))
+        
+        # Create scrollable forecast container
+        self.forecast_container = tk.Frame(self.forecast_frame, bg='white')
+        self.forecast_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        
+        # Hourly rows drawn on a canvas: time, icon, temperature, condition, rain, wind
+        columns = [
+            (12, 'w', ('Segoe UI', 10, 'bold'), '#2d3436'),
+            (120, 'center', ('Segoe UI', 14), '#2d3436'),
+            (150, 'w', ('Segoe UI', 11, 'bold'), '#0984e3'),
+            (200, 'w', ('Segoe UI', 10), '#636e72'),
+            (-110, 'e', ('Segoe UI', 9), '#636e72'),
+            (-12, 'e', ('Segoe UI', 9), '#636e72')
+        ]
+        self.hourly_list = VirtualList(self.forecast_frame, columns, self.render_hourly_row,
+                                       row_height=34, height=380)
+    
+    def toggle_forecast_view(self):
+        """Switch the forecast between the daily cards and the hourly list"""
+        if self.forecast_view == 'daily':
+            self.forecast_view = 'hourly'
+            self.forecast_container.pack_forget()
+            self.hourly_list.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+            self.forecast_title.config(text="🕒 Hourly Forecast")
+            self.forecast_view_btn.config(text="📅 Daily")
+        else:
+            self.forecast_view = 'daily'
+            self.hourly_list.pack_forget()
+            self.forecast_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+            self.forecast_title.config(text="📅 5-Day Forecast")
+            self.forecast_view_btn.config(text="🕒 Hourly")
+    
+    def render_hourly_row(self, index):
+        """Return the cell values of one hourly row from the forecast columns"""
+        hourly = self.hourly_data['hourly']
+        local_time = datetime.fromtimestamp(hourly['dt'][index] + self.hourly_data['utc_offset'], timezone.utc)
+        icon_code = hourly['icon'][index]
+        
+        rain = f"💧 {round(hourly['pop'][index] * 100)}%"
+        if hourly['precipitation'][index]:
+            rain += f"  {hourly['precipitation'][index]:.1f} mm"
+        
+        return (
+            local_time.strftime("%a %H:%M"),
+            self.icons.get(icon_code, HOURLY_ICON_SIZE) or self.get_weather_emoji(icon_code),
+            f"{round(hourly['temp'][index])}°",
+            hourly['description'][index].title(),
+            rain,
+            f"💨 {hourly['wind_speed'][index]:.1f} m/s"
+        )
+    
+    def create_forecast_card(self):
+        """Build one empty forecast card and return its updatable labels"""
+        # Forecast card
+        card = tk.Frame(self.forecast_container, bg='#f8f9fa', relief='solid', bd=1, padx=15, pady=15)
+        card.pack(fill='x', pady=5)
+        
+        # Card content
+        card_content = tk.Frame(card, bg='#f8f9fa')
+        card_content.pack(fill='x')
+        
+        # Left side - Day info
+        left_info = tk.Frame(card_content, bg='#f8f9fa')
+        left_info.pack(side='left', fill='x', expand=True)
+        
+        # Day name and date
+        day_label = tk.Label(left_info,
+                           font=('Segoe UI', 12, 'bold'),
+                           bg='#f8f9fa', fg='#2d3436')
+        day_label.pack(anchor='w')
+        
+        # Weather description
+        desc_label = tk.Label(left_info,
+                            font=('Segoe UI', 10),
+                            bg='#f8f9fa', fg='#636e72')
+        desc_label.pack(anchor='w', pady=(2, 0))
+        
+        # Center - Weather icon
+        icon_frame = tk.Frame(card_content, bg='#f8f9fa')
+        icon_frame.pack(side='left', padx=20)
+        
+        icon_label = tk.Label(icon_frame, font=('Segoe UI', 32), bg='#f8f9fa')
+        icon_label.pack()
+        
+        # Right side - Temperature
+        temp_frame = tk.Frame(card_content, bg='#f8f9fa')
+        temp_frame.pack(side='right')
+        
+        temp_label = tk.Label(temp_frame,
+                            font=('Segoe UI', 20, 'bold'),
+                            bg='#f8f9fa', fg='#74b9ff')
+        temp_label.pack(anchor='e')
+        
+        min_temp_label = tk.Label(temp_frame,
+                                font=('Segoe UI', 14),
+                                bg='#f8f9fa', fg='#636e72')
+        min_temp_label.pack(anchor='e')
+        
+        return {
+            'card': card,
+            'day': day_label,
+            'description': desc_label,
+            'icon': icon_label,
+            'max_temp': temp_label,
+            'min_temp': min_temp_label
+        }
+    
+    def show_error(self, error):
+        """Report an error or message in the notice area without blocking the window"""
+        if not isinstance(error, WeatherError):
+            error = WeatherError(str(error))
+        self.notices.show(self.notice_key(error), str(error))
+    
+    def notice_key(self, error):
+        """Key notices by city, except for failures that affect every city"""
+        if error.city is None or error.shared:
+            return (error.kind, None)
+        return (error.kind, normalize_city(error.city))
+    
+    def report_city_error(self, city, error, refresh=False):
+        """Remember a city's failure and report it; failed refreshes are only a warning"""
+        self.city_errors[normalize_city(city)] = error
+        if refresh:
+            self.notices.show(self.notice_key(error), f"Couldn't refresh {city}: {error}", 'warning')
+        else:
+            self.show_error(error)
+    
+    def clear_city_error(self, city):
+        """Forget a city's failure and close its notices once it loads again"""
+        if self.city_errors.pop(normalize_city(city), None) is None:
+            return
+        key = normalize_city(city)
+        for notice_key in list(self.notices.notices):
+            if notice_key[1] == key or notice_key[0] in ('network', 'rate_limit', 'busy'):
+                self.notices.dismiss(notice_key)
+    
+    def center_window(self):
+        """Center the application window on screen"""
+        self.root.update_idletasks()
+        width = self.root.winfo_width()
+        height = self.root.winfo_height()
+        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        self.root.geometry(f'{width}x{height}+{x}+{y}')
+
+
+def main():
+    """Create and run the weather application"""
+    root = tk.Tk()
+    app = WeatherApp(root)
+    
+    # Set minimum window size
+    root.minsize(600, 500)
+    
+    # Shut down background workers when the window is closed
+    root.protocol("WM_DELETE_WINDOW", app.close)
+    
+    # Show the last viewed city as soon as the event loop is running
+    root.after_idle(app.restore_saved_weather)
+    
+    # Configure window icon (if you have one)
+    try:
+        # You can add an .ico file here if you have one
+        # root.iconbitmap('weather_icon.ico')
+        pass
+    except:
+        pass
+    
+    # Start the application
+    root.mainloop()
+
@@ -0,0 +1,324 @@
+"""Append-only weather history per city, with hourly and daily rollups for trend views"""
+import sqlite3
+import threading
+import time
+
+from weather_cities import city_key
+
+# Measured fields kept for every sample
+HISTORY_FIELDS = ('temp', 'humidity', 'pressure', 'wind_speed')
+
+# Rollup bucket widths in seconds; buckets start at the location's local
+# midnight or full hour and are stored as their UTC timestamp
+RESOLUTIONS = {'hour': 3600, 'day': 86400}
+
+# Pending samples are written in one transaction once this many are queued
+# or this many seconds passed since the last write
+FLUSH_ROWS = 200
+FLUSH_INTERVAL = 5
+
+# Raw samples and hourly rollups are pruned after these many days; daily rollups are kept
+RAW_RETENTION_DAYS = 35
+HOURLY_RETENTION_DAYS = 180
+PRUNE_INTERVAL = 60 * 60
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+def history_key(model):
+    """Return the key a weather model's city is stored under: its ID, or its name and country"""
+    if model.get('id'):
+        return str(model['id'])
+    return city_key(f"{model['name']}, {model['country']}")
+
+
+class HistoryStore:
+    """SQLite time series of observed and forecast weather per city
+    
+    Samples are appended in batches to a table clustered by (city, source, dt),
+    so range scans read adjacent pages. Every batch also recomputes the hourly
+    and daily rollups of the buckets it touched, which keeps a 30-day query at
+    30 rows however many samples arrived. Observations keep the first sample for
+    a timestamp; forecasts keep the latest prediction for it.
+    
+    Cities are stored under history_key() of the models, whatever the user
+    typed, with their name, country and UTC offset in a places table. Queries
+    take an ID, a name or "name, country".
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.ready = False
+        self.pending = []
+        self.pending_places = {}
+        self.flushed_at = time.monotonic()
+        self.pruned_at = 0.0
+    
+    def connect(self):
+        """Open a connection, creating the tables on first use"""
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self.ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                "city TEXT NOT NULL, source TEXT NOT NULL, dt INTEGER NOT NULL, "
+                "temp REAL, humidity REAL, pressure REAL, wind_speed REAL, "
+                "PRIMARY KEY (city, source, dt)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rollups ("
+                "city TEXT NOT NULL, source TEXT NOT NULL, resolution TEXT NOT NULL, bucket INTEGER NOT NULL, "
+                "samples INTEGER NOT NULL, temp REAL, temp_min REAL, temp_max REAL, "
+                "humidity REAL, pressure REAL, wind_speed REAL, "
+                "PRIMARY KEY (city, source, resolution, bucket)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS places ("
+                "city TEXT PRIMARY KEY, name TEXT NOT NULL, country TEXT NOT NULL, "
+                "name_key TEXT NOT NULL, utc_offset INTEGER) WITHOUT ROWID"
+            )
+            self.ready = True
+        return conn
+    
+    def add_current(self, data):
+        """Queue the observation in a current weather model"""
+        self.add(data, 'observed', [
+            (data['dt'], data['temp'], data['humidity'], data['pressure'], data['wind_speed'])
+        ])
+    
+    def add_forecast(self, data):
+        """Queue the predicted values of every slot in a forecast model"""
+        hourly = data['hourly']
+        self.add(data, 'forecast', zip(hourly['dt'], hourly['temp'], hourly['humidity'],
+                                       [None] * len(hourly['dt']), hourly['wind_speed']))
+    
+    def add(self, model, source, rows):
+        """Queue (dt, temp, humidity, pressure, wind_speed) rows of a model's city,
+        writing them once enough are waiting"""
+        key = history_key(model)
+        utc_offset = model.get('utc_offset')
+        with self.lock:
+            if utc_offset is None and key in self.pending_places:
+                utc_offset = self.pending_places[key][4]
+            self.pending_places[key] = (key, model['name'], model['country'], city_key(model['name']), utc_offset)
+            self.pending.extend((key, source) + tuple(row) for row in rows)
+            due = (len(self.pending) >= FLUSH_ROWS
+                   or time.monotonic() - self.flushed_at >= FLUSH_INTERVAL)
+        if due:
+            self.flush()
+    
+    def flush(self):
+        """Write the queued samples and refresh the rollups they fall into"""
+        with self.lock:
+            rows, self.pending = self.pending, []
+            places, self.pending_places = self.pending_places, {}
+            self.flushed_at = time.monotonic()
+            if not rows:
+                return
+            
+            conn = self.connect()
+            try:
+                with conn:
+                    rows, moved = self.merge_places(conn, places, rows)
+                    # Payloads without a timezone keep the offset already known
+                    conn.executemany(
+                        "INSERT INTO places VALUES (?, ?, ?, ?, ?) ON CONFLICT (city) DO UPDATE SET "
+                        "name = excluded.name, country = excluded.country, name_key = excluded.name_key, "
+                        "utc_offset = COALESCE(excluded.utc_offset, places.utc_offset)",
+                        places.values()
+                    )
+                    observed = [row for row in rows if row[1] == 'observed']
+                    forecast = [row for row in rows if row[1] == 'forecast']
+                    conn.executemany("INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?)", observed)
+                    conn.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?)", forecast)
+                    
+                    spans = {}
+                    for city, source, dt, *_ in rows:
+                        low, high = spans.get((city, source), (dt, dt))
+                        spans[city, source] = (min(low, dt), max(high, dt))
+                    for city, source, first, last in moved:
+                        low, high = spans.get((city, source), (first, last))
+                        spans[city, source] = (min(low, first), max(high, last))
+                    for (city, source), (low, high) in spans.items():
+                        self.roll_up(conn, city, source, low, high, self.utc_offset(conn, city))
+                    
+                    if time.time() - self.pruned_at >= PRUNE_INTERVAL:
+                        self.prune(conn)
+            finally:
+                conn.close()
+    
+    def merge_places(self, conn, places, rows):
+        """Keep a city under one key whether or not its payloads carried an ID
+        
+        Samples stored under a name and country move to the city's ID once a
+        payload with the ID arrives, and payloads without an ID join the one
+        place of that name and country that has an ID. places is updated in
+        place; returns the rows under their final keys and the (city, source,
+        low, high) spans of the moved samples, whose rollups need rebuilding.
+        """
+        with_ids = [place for place in places.values() if place[0].isdigit()]
+        moved = []
+        for key, name, country, name_key, utc_offset in with_ids:
+            named = city_key(f"{name}, {country}")
+            if conn.execute("SELECT 1 FROM places WHERE city = ?", (named,)).fetchone() is None:
+                continue
+            moved += conn.execute(
+                "SELECT ?, source, MIN(dt), MAX(dt) FROM samples WHERE city = ? GROUP BY source", (key, named)
+            ).fetchall()
+            conn.execute(
+                "INSERT OR IGNORE INTO samples SELECT ?, source, dt, temp, humidity, pressure, wind_speed "
+                "FROM samples WHERE city = ?", (key, named)
+            )
+            # Daily rollups outlive their samples, so they move as they are
+            conn.execute(
+                "INSERT OR IGNORE INTO rollups SELECT ?, source, resolution, bucket, samples, temp, temp_min, "
+                "temp_max, humidity, pressure, wind_speed FROM rollups WHERE city = ?", (key, named)
+            )
+            conn.execute("UPDATE places SET city = ? WHERE city = ? AND NOT EXISTS "
+                         "(SELECT 1 FROM places WHERE city = ?)", (key, named, key))
+            for table in ('samples', 'rollups', 'places'):
+                conn.execute(f"DELETE FROM {table} WHERE city = ?", (named,))
+        
+        renames = {}
+        for key, name, country, name_key, utc_offset in list(places.values()):
+            if key.isdigit():
+                continue
+            ids = {row[0] for row in conn.execute(
+                "SELECT city FROM places WHERE name_key = ? AND country = ? AND city != ?", (name_key, country, key)
+            )}
+            ids.update(place[0] for place in with_ids if place[2:4] == (country, name_key))
+            if len(ids) == 1:
+                target = renames[key] = ids.pop()
+                del places[key]
+                known = places.get(target, (target, name, country, name_key, None))
+                places[target] = known[:4] + (utc_offset if known[4] is None else known[4],)
+        
+        if renames:
+            rows = [(renames.get(row[0], row[0]),) + row[1:] for row in rows]
+        return rows, moved
+    
+    def utc_offset(self, conn, city):
+        """Return the UTC offset in seconds stored for a city key, 0 if unknown"""
+        row = conn.execute("SELECT utc_offset FROM places WHERE city = ?", (city,)).fetchone()
+        return row[0] if row and row[0] is not None else 0
+    
+    def roll_up(self, conn, city, source, low, high, utc_offset):
+        """Recompute the hourly and daily rollups covering timestamps low to high
+        
+        Buckets start at the city's local midnight or full hour, as one shift
+        by its UTC offset: dt - (dt + utc_offset) % width.
+        """
+        for resolution, width in RESOLUTIONS.items():
+            first = low - (low + utc_offset) % width
+            last = high - (high + utc_offset) % width + width - 1
+            conn.execute(
+                "DELETE FROM rollups WHERE city = ? AND source = ? AND resolution = ? AND bucket BETWEEN ? AND ?",
+                (city, source, resolution, first, last)
+            )
+            conn.execute(
+                "INSERT INTO rollups SELECT city, source, ?, dt - (dt + ?) % ?, COUNT(*), AVG(temp), MIN(temp), "
+                "MAX(temp), AVG(humidity), AVG(pressure), AVG(wind_speed) FROM samples "
+                "WHERE city = ? AND source = ? AND dt BETWEEN ? AND ? GROUP BY dt - (dt + ?) % ?",
+                (resolution, utc_offset, width, city, source, first, last, utc_offset, width)
+            )
+    
+    def prune(self, conn):
+        """Drop raw samples and hourly rollups past their retention"""
+        now = time.time()
+        conn.execute("DELETE FROM samples WHERE dt < ?", (now - RAW_RETENTION_DAYS * 86400,))
+        conn.execute("DELETE FROM rollups WHERE resolution = 'hour' AND bucket < ?",
+                     (now - HOURLY_RETENTION_DAYS * 86400,))
+        self.pruned_at = now
+    
+    def find(self, conn, city):
+        """Return the stored place of a city ID, name or "name, country", or None"""
+        text = city.strip()
+        if text.isdigit():
+            row = conn.execute(
+                "SELECT city, name, country, utc_offset FROM places WHERE city = ?", (text,)
+            ).fetchone()
+        else:
+            name, _, country = text.partition(',')
+            country = country.strip()
+            row = conn.execute(
+                "SELECT city, name, country, utc_offset FROM places WHERE name_key = ? "
+                "AND (? = '' OR country = ? COLLATE NOCASE) ORDER BY city LIMIT 1",
+                (city_key(name), country, country)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        return {'city': row[0], 'name': row[1], 'country': row[2], 'utc_offset': row[3] or 0}
+    
+    def place(self, city):
+        """Return the key, name, country and UTC offset stored for a city, or None"""
+        self.flush()
+        with self.lock:
+            conn = self.connect()
+            try:
+                return self.find(conn, city)
+            finally:
+                conn.close()
+    
+    def series(self, city, start, end, resolution='day', source='observed'):
+        """Return the history of a city between two timestamps as parallel columns
+        
+        resolution is 'hour' or 'day' for rollups, with 'temp' as the mean and
+        'temp_min', 'temp_max' and 'samples' per bucket, or 'raw' for the samples
+        themselves. source is 'observed' or 'forecast'. Rollup 'dt' values are
+        the UTC timestamps of the local start of each bucket.
+        """
+        self.flush()
+        with self.lock:
+            conn = self.connect()
+            try:
+                place = self.find(conn, city)
+                if resolution == 'raw':
+                    names = ('dt',) + HISTORY_FIELDS
+                    query = (
+                        "SELECT dt, temp, humidity, pressure, wind_speed FROM samples "
+                        "WHERE city = ? AND source = ? AND dt BETWEEN ? AND ? ORDER BY dt"
+                    )
+                    params = (source, start, end)
+                else:
+                    names = ('dt', 'samples', 'temp', 'temp_min', 'temp_max', 'humidity', 'pressure', 'wind_speed')
+                    query = (
+                        "SELECT bucket, samples, temp, temp_min, temp_max, humidity, pressure, wind_speed "
+                        "FROM rollups WHERE city = ? AND source = ? AND resolution = ? "
+                        "AND bucket BETWEEN ? AND ? ORDER BY bucket"
+                    )
+                    width = RESOLUTIONS[resolution]
+                    first = start - (start + place['utc_offset']) % width if place else start
+                    params = (source, resolution, first, end)
+                rows = conn.execute(query, (place['city'],) + params).fetchall() if place else []
+            finally:
+                conn.close()
+        
+        columns = list(zip(*rows)) or [()] * len(names)
+        return {name: list(column) for name, column in zip(names, columns)}
+    
+    def cities(self):
+        """Return the stored places with any daily history, sorted by name"""
+        self.flush()
+        with self.lock:
+            conn = self.connect()
+            try:
+                rows = conn.execute(
+                    "SELECT city, name, country, utc_offset FROM places WHERE city IN "
+                    "(SELECT DISTINCT city FROM rollups WHERE resolution = 'day') ORDER BY name, country"
+                ).fetchall()
+            finally:
+                conn.close()
+        return [{'city': row[0], 'name': row[1], 'country': row[2], 'utc_offset': row[3] or 0} for row in rows]
+
+
+def sparkline(values):
+    """Return a one-line bar chart of numbers, with a space for missing ones"""
+    present = [value for value in values if value is not None]
+    if not present:
+        return ''
+    
+    low, high = min(present), max(present)
+    scale = (len(SPARK_CHARS) - 1) / (high - low) if high > low else 0
+    return ''.join(' ' if value is None else SPARK_CHARS[round((value - low) * scale)] for value in values)
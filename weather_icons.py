@@ -0,0 +1,119 @@
+"""Condition icons for the weather app, decoded once and shared by every card"""
+from collections import OrderedDict
+import os
+import tkinter as tk
+
+# Emoji shown for condition codes without an icon image, e.g. before the first download
+WEATHER_EMOJI = {
+    '01d': '☀️', '01n': '🌙',  # clear sky
+    '02d': '⛅', '02n': '☁️',  # few clouds
+    '03d': '☁️', '03n': '☁️',  # scattered clouds
+    '04d': '☁️', '04n': '☁️',  # broken clouds
+    '09d': '🌧️', '09n': '🌧️',  # shower rain
+    '10d': '🌦️', '10n': '🌧️',  # rain
+    '11d': '⛈️', '11n': '⛈️',  # thunderstorm
+    '13d': '❄️', '13n': '❄️',  # snow
+    '50d': '🌫️', '50n': '🌫️'   # mist
+}
+DEFAULT_EMOJI = '🌤️'
+
+# Icon sizes in pixels on the current weather and forecast cards and the hourly list
+CURRENT_ICON_SIZE = 100
+FORECAST_ICON_SIZE = 50
+HOURLY_ICON_SIZE = 25
+
+# Memory budget for decoded images, counted as width * height * 4 bytes
+ICON_CACHE_BYTES = 4 * 1024 * 1024
+
+
+class IconCache:
+    """PhotoImages of condition icons keyed by icon code and pixel size
+    
+    Each icon file is decoded once; other sizes are scaled from the decoded
+    image in memory (by integer subsampling, or with PIL, imported on first
+    need, for other ratios). Every label showing an icon shares the same image.
+    The least recently used images are dropped past max_bytes; labels keep
+    their own reference, so that never blanks a card.
+    """
+    
+    def __init__(self, master, directory, max_bytes=ICON_CACHE_BYTES):
+        self.master = master
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.images = OrderedDict()
+        self.size = 0
+        
+        # Icon codes without a usable file, skipped until reload()
+        self.missing = set()
+    
+    def get(self, icon_code, size):
+        """Return the PhotoImage for an icon at size x size pixels, or None"""
+        key = (icon_code, size)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            return image
+        
+        if icon_code in self.missing:
+            return None
+        
+        source = self.source(icon_code)
+        if source is None:
+            return None
+        
+        # source() caches the icon at its file's own size
+        if source.width() == size:
+            return source
+        
+        image = self.scale(icon_code, source, size)
+        self.add(key, image)
+        return image
+    
+    def source(self, icon_code):
+        """Return the icon decoded at its file's own size, decoding it on first use"""
+        for (code, size), image in self.images.items():
+            if code == icon_code and image.width() == size:
+                return image
+        
+        path = os.path.join(self.directory, f"{icon_code}.png")
+        try:
+            image = tk.PhotoImage(master=self.master, file=path)
+        except (tk.TclError, OSError):
+            self.missing.add(icon_code)
+            return None
+        
+        self.add((icon_code, image.width()), image)
+        return image
+    
+    def scale(self, icon_code, source, size):
+        """Scale a decoded icon to size x size pixels"""
+        if source.width() % size == 0:
+            return source.subsample(source.width() // size)
+        
+        try:
+            from PIL import Image, ImageTk
+        except ImportError:
+            # Closest integer factor without PIL
+            factor = max(1, round(source.width() / size))
+            return source.subsample(factor)
+        
+        path = os.path.join(self.directory, f"{icon_code}.png")
+        with Image.open(path) as picture:
+            resized = picture.convert('RGBA').resize((size, size), Image.LANCZOS)
+        return ImageTk.PhotoImage(resized, master=self.master)
+    
+    def add(self, key, image):
+        """Cache an image and drop the least recently used ones over the budget"""
+        self.images[key] = image
+        self.size += image.width() * image.height() * 4
+        while self.size > self.max_bytes and len(self.images) > 1:
+            _, dropped = self.images.popitem(last=False)
+            self.size -= dropped.width() * dropped.height() * 4
+    
+    def reload(self):
+        """Try icons that were missing again, e.g. after a download"""
+        self.missing.clear()
+    
+    def stats(self):
+        """Return the number of cached images and their size in bytes"""
+        return {'images': len(self.images), 'bytes': self.size, 'max_bytes': self.max_bytes}
@@ -0,0 +1,143 @@
+"""Span timing of the search pipeline and component counters, with percentiles and a Prometheus-style dump"""
+from collections import deque
+from contextlib import contextmanager
+import json
+import logging
+import math
+import threading
+import time
+
+# Samples kept per stage for the percentiles
+MAX_SAMPLES = 1000
+
+# Stages in pipeline order, for the overlay and the dump
+STAGES = (
+    'search', 'queue', 'fetch', 'rate_limit', 'http', 'download', 'decode', 'normalize',
+    'dispatch', 'ui_batch', 'render_current', 'render_forecast'
+)
+
+# One JSON line per span at DEBUG level, e.g. logging.getLogger('weather.timing').setLevel(logging.DEBUG)
+logger = logging.getLogger('weather.timing')
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Metrics:
+    """Thread-safe durations per pipeline stage
+    
+    Keeps the last `max_samples` durations of every stage for percentiles,
+    plus a running count and sum like a Prometheus summary. Components such
+    as worker pools and caches register a stats() function, which is read
+    whenever the metrics are shown.
+    """
+    
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.samples = {}
+        self.counts = {}
+        self.sums = {}
+        self.components = {}
+        self.lock = threading.Lock()
+    
+    def record(self, stage, seconds):
+        """Record one duration for a stage"""
+        with self.lock:
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=self.max_samples)
+                self.counts[stage] = 0
+                self.sums[stage] = 0.0
+            samples.append(seconds)
+            self.counts[stage] += 1
+            self.sums[stage] += seconds
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({'stage': stage, 'seconds': round(seconds, 6),
+                                     'thread': threading.current_thread().name}))
+    
+    def register(self, name, stats):
+        """Report stats(), a function returning {field: number}, under a component name
+        
+        A later registration under the same name replaces the earlier one.
+        """
+        with self.lock:
+            self.components[name] = stats
+    
+    def component_stats(self):
+        """Return {component: {field: number}} of every registered component, sorted by name"""
+        with self.lock:
+            components = sorted(self.components.items())
+        return {name: stats() for name, stats in components}
+    
+    @contextmanager
+    def span(self, stage):
+        """Time the body of a with block as one sample of a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+    
+    def summary(self):
+        """Return {stage: {'count', 'sum', 'p50', 'p95'}} in seconds, in pipeline order"""
+        with self.lock:
+            snapshot = {stage: (list(samples), self.counts[stage], self.sums[stage])
+                        for stage, samples in self.samples.items()}
+        
+        order = [stage for stage in STAGES if stage in snapshot]
+        order += sorted(stage for stage in snapshot if stage not in STAGES)
+        return {
+            stage: {
+                'count': snapshot[stage][1],
+                'sum': snapshot[stage][2],
+                'p50': percentile(snapshot[stage][0], 0.5),
+                'p95': percentile(snapshot[stage][0], 0.95)
+            }
+            for stage in order
+        }
+    
+    def table(self):
+        """Return the summary as fixed-width text with milliseconds"""
+        lines = [f"{'stage':<16}{'count':>6}{'p50 ms':>9}{'p95 ms':>9}"]
+        for stage, stats in self.summary().items():
+            lines.append(f"{stage:<16}{stats['count']:>6}{stats['p50'] * 1000:>9.1f}{stats['p95'] * 1000:>9.1f}")
+        
+        for name, stats in self.component_stats().items():
+            values = ', '.join(f"{field} {value:.2f}" if isinstance(value, float) else f"{field} {value}"
+                               for field, value in stats.items())
+            lines.append(f"{name}: {values}")
+        return '\n'.join(lines)
+    
+    def prometheus(self):
+        """Return the summary in the Prometheus text exposition format"""
+        lines = [
+            "# HELP weather_stage_seconds Time spent in each stage of fetching and showing the weather",
+            "# TYPE weather_stage_seconds summary"
+        ]
+        for stage, stats in self.summary().items():
+            lines.append(f'weather_stage_seconds{{stage="{stage}",quantile="0.5"}} {stats["p50"]:.6f}')
+            lines.append(f'weather_stage_seconds{{stage="{stage}",quantile="0.95"}} {stats["p95"]:.6f}')
+            lines.append(f'weather_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'weather_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        
+        for name, stats in self.component_stats().items():
+            for field, value in stats.items():
+                lines.append(f"# TYPE weather_{name}_{field} gauge")
+                lines.append(f"weather_{name}_{field} {value}")
+        return '\n'.join(lines) + '\n'
+    
+    def reset(self):
+        """Forget every recorded duration; registered components stay"""
+        with self.lock:
+            self.samples.clear()
+            self.counts.clear()
+            self.sums.clear()
+
+
+# Shared by the client, the worker pools and the GUI
+metrics = Metrics()
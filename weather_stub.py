@@ -0,0 +1,441 @@
+"""Local stand-in for the OpenWeatherMap API, for load tests and benchmarks
+
+Serves generated payloads shaped like the real current weather, 5-day/3-hour
+forecast, group, One Call and geocoding responses and placeholder condition
+icons, with configurable latency, error rate and payload size, or scripted
+429/5xx sequences with Retry-After per path. Point the app at it with
+OPENWEATHER_HOST:
+
+    python weather_stub.py --port 8089 --latency 0.2 --error-rate 0.05
+    OPENWEATHER_HOST=http://127.0.0.1:8089 python weather.py --city London --api-key test
+"""
+import argparse
+import json
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# (id, main, description, day icon) of the conditions the stub picks from
+CONDITIONS = [
+    (800, 'Clear', 'clear sky', '01d'),
+    (801, 'Clouds', 'few clouds', '02d'),
+    (802, 'Clouds', 'scattered clouds', '03d'),
+    (804, 'Clouds', 'overcast clouds', '04d'),
+    (500, 'Rain', 'light rain', '10d'),
+    (501, 'Rain', 'moderate rain', '10d'),
+    (211, 'Thunderstorm', 'thunderstorm', '11d'),
+    (600, 'Snow', 'light snow', '13d'),
+    (741, 'Fog', 'fog', '50d')
+]
+
+COUNTRIES = ['GB', 'US', 'FR', 'DE', 'JP', 'AU', 'BR', 'IN', 'ZA', 'CA']
+
+# RGB colour of the disc drawn for each icon family
+ICON_COLOURS = {
+    '01': (255, 196, 0), '02': (250, 220, 120), '03': (190, 190, 200), '04': (140, 140, 155),
+    '09': (70, 120, 220), '10': (90, 150, 230), '11': (120, 70, 170), '13': (220, 235, 250),
+    '50': (170, 180, 170)
+}
+
+
+class StubWeather:
+    """Generates deterministic weather for any city name, ID or coordinate
+    
+    The same city gets the same weather within an hour, so repeated requests
+    behave like the real API between its updates.
+    """
+    
+    def __init__(self, slots=40, hours=48, days=8):
+        self.slots = slots
+        self.hours = hours
+        self.days = days
+    
+    def city(self, query):
+        """Return (id, name, country, lat, lon, utc_offset) for a city name or ID"""
+        if query.isdigit():
+            city_id = int(query)
+            name = f"City {city_id}"
+        else:
+            name = query.split(',')[0].strip().title()
+            city_id = zlib.crc32(name.lower().encode('utf-8')) % 9000000 + 1000000
+        
+        rng = random.Random(city_id)
+        lat = round(rng.uniform(-60, 70), 4)
+        lon = round(rng.uniform(-180, 180), 4)
+        utc_offset = round(lon / 15) * 3600
+        return city_id, name, rng.choice(COUNTRIES), lat, lon, utc_offset
+    
+    def condition(self, rng, dt, utc_offset):
+        """Return a weather condition list with a day or night icon"""
+        condition_id, main, description, icon = rng.choice(CONDITIONS)
+        if not slot_is_day(dt, utc_offset):
+            icon = icon[:2] + 'n'
+        return [{'id': condition_id, 'main': main, 'description': description, 'icon': icon}]
+    
+    def current(self, query, now):
+        """Return a current weather payload"""
+        city_id, name, country, lat, lon, utc_offset = self.city(query)
+        rng = random.Random(city_id * 31 + int(now) // 3600)
+        temp = round(rng.uniform(-5, 30), 2)
+        
+        return {
+            'coord': {'lon': lon, 'lat': lat},
+            'weather': self.condition(rng, now, utc_offset),
+            'base': 'stations',
+            'main': {
+                'temp': temp,
+                'feels_like': round(temp - rng.uniform(0, 3), 2),
+                'temp_min': round(temp - 2, 2),
+                'temp_max': round(temp + 2, 2),
+                'pressure': rng.randint(990, 1030),
+                'humidity': rng.randint(30, 100),
+                'sea_level': rng.randint(990, 1030),
+                'grnd_level': rng.randint(980, 1020)
+            },
+            'visibility': 10000,
+            'wind': {'speed': round(rng.uniform(0, 12), 2), 'deg': rng.randint(0, 359), 'gust': round(rng.uniform(0, 18), 2)},
+            'clouds': {'all': rng.randint(0, 100)},
+            'dt': int(now),
+            'sys': {'country': country, 'sunrise': int(now) - 20000, 'sunset': int(now) + 20000},
+            'timezone': utc_offset,
+            'id': city_id,
+            'name': name,
+            'cod': 200
+        }
+    
+    def forecast(self, query, now):
+        """Return a 5-day/3-hour forecast payload with `slots` entries"""
+        city_id, name, country, lat, lon, utc_offset = self.city(query)
+        rng = random.Random(city_id * 37 + int(now) // 3600)
+        start = int(now) // 10800 * 10800 + 10800
+        base = rng.uniform(-5, 25)
+        
+        slots = []
+        for i in range(self.slots):
+            dt = start + i * 10800
+            temp = round(base + 6 * rng.random() + (4 if slot_is_day(dt, utc_offset) else 0), 2)
+            slot = {
+                'dt': dt,
+                'main': {
+                    'temp': temp,
+                    'feels_like': round(temp - 1.5, 2),
+                    'temp_min': round(temp - 1, 2),
+                    'temp_max': round(temp + 1, 2),
+                    'pressure': rng.randint(990, 1030),
+                    'sea_level': rng.randint(990, 1030),
+                    'grnd_level': rng.randint(980, 1020),
+                    'humidity': rng.randint(30, 100),
+                    'temp_kf': 0
+                },
+                'weather': self.condition(rng, dt, utc_offset),
+                'clouds': {'all': rng.randint(0, 100)},
+                'wind': {'speed': round(rng.uniform(0, 12), 2), 'deg': rng.randint(0, 359), 'gust': round(rng.uniform(0, 18), 2)},
+                'visibility': 10000,
+                'pop': round(rng.random(), 2),
+                'sys': {'pod': 'd' if slot_is_day(dt, utc_offset) else 'n'},
+                'dt_txt': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(dt))
+            }
+            if slot['weather'][0]['main'] == 'Rain':
+                slot['rain'] = {'3h': round(rng.uniform(0.1, 5), 2)}
+            elif slot['weather'][0]['main'] == 'Snow':
+                slot['snow'] = {'3h': round(rng.uniform(0.1, 3), 2)}
+            slots.append(slot)
+        
+        return {
+            'cod': '200',
+            'message': 0,
+            'cnt': len(slots),
+            'list': slots,
+            'city': {
+                'id': city_id,
+                'name': name,
+                'coord': {'lat': lat, 'lon': lon},
+                'country': country,
+                'population': 100000,
+                'timezone': utc_offset,
+                'sunrise': int(now) - 20000,
+                'sunset': int(now) + 20000
+            }
+        }
+    
+    def onecall(self, lat, lon, now):
+        """Return a One Call payload with `hours` hourly and `days` daily entries"""
+        rng = random.Random(int(lat * 1000) * 7919 + int(lon * 1000) + int(now) // 3600)
+        utc_offset = round(lon / 15) * 3600
+        hour = int(now) // 3600 * 3600
+        base = rng.uniform(-5, 25)
+        
+        def values(dt):
+            return {
+                'dt': dt,
+                'temp': round(base + 8 * rng.random(), 2),
+                'feels_like': round(base + 6 * rng.random(), 2),
+                'pressure': rng.randint(990, 1030),
+                'humidity': rng.randint(30, 100),
+                'dew_point': round(base - 4, 2),
+                'uvi': round(rng.uniform(0, 8), 2),
+                'clouds': rng.randint(0, 100),
+                'visibility': 10000,
+                'wind_speed': round(rng.uniform(0, 12), 2),
+                'wind_deg': rng.randint(0, 359),
+                'wind_gust': round(rng.uniform(0, 18), 2),
+                'weather': self.condition(rng, dt, utc_offset)
+            }
+        
+        hourly = []
+        for i in range(self.hours):
+            entry = values(hour + i * 3600)
+            entry['pop'] = round(rng.random(), 2)
+            if entry['weather'][0]['main'] == 'Rain':
+                entry['rain'] = {'1h': round(rng.uniform(0.1, 2), 2)}
+            hourly.append(entry)
+        
+        # Daily entries are stamped at local noon, like the real API
+        local_midnight = (int(now) + utc_offset) // 86400 * 86400 - utc_offset
+        daily = []
+        for i in range(self.days):
+            low = round(base + rng.uniform(-3, 2), 2)
+            high = round(low + rng.uniform(3, 10), 2)
+            daily.append({
+                'dt': local_midnight + i * 86400 + 43200,
+                'sunrise': local_midnight + i * 86400 + 21600,
+                'sunset': local_midnight + i * 86400 + 64800,
+                'summary': 'Generated by the local stub',
+                'temp': {'day': high - 1, 'min': low, 'max': high, 'night': low + 1, 'eve': high - 2, 'morn': low + 2},
+                'feels_like': {'day': high - 2, 'night': low, 'eve': high - 3, 'morn': low + 1},
+                'pressure': rng.randint(990, 1030),
+                'humidity': rng.randint(30, 100),
+                'wind_speed': round(rng.uniform(0, 12), 2),
+                'wind_deg': rng.randint(0, 359),
+                'weather': self.condition(rng, local_midnight + i * 86400 + 43200, utc_offset),
+                'clouds': rng.randint(0, 100),
+                'pop': round(rng.random(), 2),
+                'rain': round(rng.uniform(0, 5), 2),
+                'uvi': round(rng.uniform(0, 8), 2)
+            })
+        
+        return {
+            'lat': lat,
+            'lon': lon,
+            'timezone': 'Etc/Stub',
+            'timezone_offset': utc_offset,
+            'current': values(int(now)),
+            'hourly': hourly,
+            'daily': daily
+        }
+    
+    def geocode(self, query):
+        """Return a geocoding result list for a city name"""
+        city_id, name, country, lat, lon, _ = self.city(query)
+        return [{'name': name, 'lat': lat, 'lon': lon, 'country': country}]
+
+
+def icon_png(icon_code, size=100):
+    """Return a size x size RGBA PNG of a coloured disc standing in for a condition icon"""
+    red, green, blue = ICON_COLOURS.get(icon_code[:2], (200, 200, 200))
+    if icon_code.endswith('n'):
+        red, green, blue = red // 2, green // 2, blue // 2
+    
+    centre = (size - 1) / 2
+    radius = size * 0.4
+    rows = bytearray()
+    for y in range(size):
+        rows.append(0)
+        for x in range(size):
+            inside = (x - centre) ** 2 + (y - centre) ** 2 <= radius ** 2
+            rows += bytes((red, green, blue, 255 if inside else 0))
+    
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    
+    header = struct.pack('>IIBBBBB', size, size, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(bytes(rows)))
+            + chunk(b'IEND', b''))
+
+
+def slot_is_day(dt, utc_offset):
+    """Return whether a timestamp falls in daytime (06:00-18:00) at a UTC offset"""
+    return 6 <= (dt + utc_offset) // 3600 % 24 < 18
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the stub endpoints with the latency and errors configured on the server"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # waits for the client's delayed ACK, adding ~40 ms to every response
+    disable_nagle_algorithm = True
+    
+    def setup(self):
+        super().setup()
+        self.server.stub.connected()
+    
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        
+        delay = stub.latency + random.uniform(0, stub.jitter)
+        if delay:
+            time.sleep(delay)
+        
+        scripted = stub.next_response(url.path)
+        if scripted is not None and scripted[0] != 200:
+            status, retry_after = scripted
+            stub.count('errors')
+            headers = {} if retry_after is None else {'Retry-After': str(retry_after)}
+            self.send_json(status, {'cod': status, 'message': f"{HTTPStatus(status).phrase} (stub)"}, headers)
+            return
+        
+        if scripted is None and random.random() < stub.error_rate:
+            stub.count('errors')
+            self.send_json(503, {'cod': 503, 'message': 'Service temporarily unavailable (stub)'})
+            return
+        
+        now = time.time()
+        weather = stub.weather
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+        stub.count('icon' if url.path.startswith('/img/wn/') else endpoint)
+        
+        if url.path.startswith('/img/wn/') and endpoint.endswith('@2x.png'):
+            self.send_bytes(200, 'image/png', icon_png(endpoint[:-len('@2x.png')]))
+        elif 'appid' not in query:
+            self.send_json(401, {'cod': 401, 'message': 'Invalid API key (stub)'})
+        elif endpoint == 'weather':
+            self.send_json(200, weather.current(query.get('id') or query.get('q', ''), now))
+        elif endpoint == 'forecast':
+            self.send_json(200, weather.forecast(query.get('id') or query.get('q', ''), now))
+        elif endpoint == 'group':
+            cities = [weather.current(city_id, now) for city_id in query.get('id', '').split(',') if city_id]
+            self.send_json(200, {'cnt': len(cities), 'list': cities})
+        elif endpoint == 'onecall':
+            self.send_json(200, weather.onecall(float(query['lat']), float(query['lon']), now))
+        elif endpoint == 'direct':
+            self.send_json(200, weather.geocode(query.get('q', '')))
+        else:
+            self.send_json(404, {'cod': '404', 'message': 'Unknown endpoint (stub)'})
+    
+    def send_json(self, status, data, headers=None):
+        """Send a JSON response"""
+        body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        self.send_bytes(status, 'application/json; charset=utf-8', body, headers)
+    
+    def send_bytes(self, status, content_type, body, headers=None):
+        """Send a response with a body of the given type and any extra headers"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        if self.server.stub.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer:
+    """Threaded local server for the stub API
+    
+    latency and jitter are in seconds per request, error_rate is the share of
+    requests answered with 503, and slots, hours and days set the length of the
+    forecast, One Call hourly and One Call daily lists.
+    
+    scripts maps URL paths such as '/data/2.5/weather' to lists of (status,
+    retry_after) pairs. Requests to a scripted path get the next pair's status,
+    with a Retry-After header unless retry_after is None, instead of random
+    errors; a status of 200 serves the normal response. Once a path's script
+    runs out its requests are served normally again.
+    """
+    
+    def __init__(self, port=0, latency=0.0, jitter=0.0, error_rate=0.0, slots=40, hours=48, days=8,
+                 verbose=False, scripts=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.weather = StubWeather(slots, hours, days)
+        self.scripts = {path: list(responses) for path, responses in (scripts or {}).items()}
+        
+        # Requests served per endpoint, and TCP connections accepted
+        self.counts = {}
+        self.connections = 0
+        self.lock = threading.Lock()
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.thread = None
+    
+    @property
+    def url(self):
+        """Base URL to use as OPENWEATHER_HOST"""
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+    
+    def count(self, name):
+        """Count a served request"""
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+    
+    def connected(self):
+        """Count an accepted connection"""
+        with self.lock:
+            self.connections += 1
+    
+    def script(self, path, responses):
+        """Queue (status, retry_after) pairs for the next requests to a URL path"""
+        with self.lock:
+            self.scripts.setdefault(path, []).extend(responses)
+    
+    def next_response(self, path):
+        """Take the next scripted (status, retry_after) pair for a path, or None"""
+        with self.lock:
+            responses = self.scripts.get(path)
+            return responses.pop(0) if responses else None
+    
+    def start(self):
+        """Serve on a background thread and return self"""
+        self.thread = threading.Thread(target=self.server.serve_forever, name='weather-stub', daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv=None):
+    """Run the stub server in the foreground"""
+    parser = argparse.ArgumentParser(description="Local OpenWeatherMap stub for load tests and benchmarks")
+    parser.add_argument('--port', type=int, default=8089, help="port to listen on (default: 8089)")
+    parser.add_argument('--latency', type=float, default=0.1, help="seconds added to every response (default: 0.1)")
+    parser.add_argument('--jitter', type=float, default=0.05, help="random extra latency in seconds (default: 0.05)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with 503 (default: 0)")
+    parser.add_argument('--slots', type=int, default=40, help="3-hour forecast slots per response (default: 40)")
+    parser.add_argument('--hours', type=int, default=48, help="One Call hourly entries (default: 48)")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+    
+    stub = StubServer(args.port, args.latency, args.jitter, args.error_rate, args.slots, args.hours,
+                      verbose=args.verbose)
+    print(f"Serving the weather stub on {stub.url} (OPENWEATHER_HOST={stub.url})")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+"""Canvas-drawn lists and charts and the notice area of the weather app"""
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timezone
+import tkinter as tk
+
+# Rows scrolled per mouse wheel notch
+WHEEL_ROWS = 3
+
+# Chart margins in pixels: temperature axis, wind axis, top, day labels
+CHART_MARGINS = (40, 44, 14, 22)
+
+# Chart colours
+TEMP_COLOUR = '#e17055'
+RAIN_COLOUR = '#a4cdf5'
+WIND_COLOUR = '#636e72'
+GRID_COLOUR = '#dfe6e9'
+
+# Notice colours (background, text) and how long each level stays up, in seconds
+NOTICE_STYLES = {
+    'error': ('#d63031', 'white'),
+    'warning': ('#fdcb6e', '#2d3436'),
+    'info': ('#00b894', 'white')
+}
+NOTICE_TIMEOUTS = {'error': 10, 'warning': 8, 'info': 4}
+NOTICE_LIMIT = 3
+
+
+class VirtualList(tk.Frame):
+    """Scrollable list of fixed-height rows drawn on a Canvas
+    
+    Only the rows in view have canvas items. Scrolling moves those items and
+    re-binds them to other rows through `render`, so the item count stays the
+    same for a list of 40 rows or 40,000.
+    
+    columns holds (x, anchor, font, fill) for the cells of a row, with x measured
+    from the right edge when negative. render(index) returns the cell values of
+    a row: strings are drawn as text, images (tk or PIL PhotoImages) as images.
+    """
+    
+    def __init__(self, master, columns, render, row_height=28, stripe='#f8f9fa', bg='white', **kwargs):
+        super().__init__(master, bg=bg)
+        self.columns = columns
+        self.render = render
+        self.row_height = row_height
+        self.stripe = stripe
+        self.bg = bg
+        self.count = 0
+        self.top = 0
+        
+        # Canvas items of the rows in view, reused as the list scrolls
+        self.slots = []
+        
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, **kwargs)
+        self.scrollbar = tk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+        
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        
+        # The wheel goes to the focused widget on some platforms, so listen
+        # application-wide while the pointer is over the list
+        self.canvas.bind('<Enter>', self.bind_wheel)
+        self.canvas.bind('<Leave>', self.unbind_wheel)
+    
+    def set_count(self, count):
+        """Show `count` rows, re-rendering the ones in view"""
+        self.count = count
+        self.refresh()
+    
+    def refresh(self):
+        """Re-render the rows in view, e.g. after their data changed"""
+        for slot in self.slots:
+            slot['index'] = None
+        self.redraw()
+    
+    def scroll_to(self, index):
+        """Scroll so that a row is at the top"""
+        self.top = index * self.row_height
+        self.redraw()
+    
+    def create_slot(self):
+        """Create the canvas items of one row"""
+        canvas = self.canvas
+        cells = []
+        for x, anchor, font, fill in self.columns:
+            text = canvas.create_text(0, 0, anchor=anchor, font=font, fill=fill, state='hidden')
+            image = canvas.create_image(0, 0, anchor=anchor, state='hidden')
+            cells.append((text, image))
+        return {
+            'index': None,
+            'visible': False,
+            'background': canvas.create_rectangle(0, 0, 0, 0, width=0, state='hidden'),
+            'cells': cells,
+            'images': []
+        }
+    
+    def bind_slot(self, slot, index):
+        """Fill a slot's items with the values of a row"""
+        canvas = self.canvas
+        slot['index'] = index
+        slot['images'] = []
+        canvas.itemconfigure(slot['background'], fill=self.stripe if index % 2 else self.bg)
+        for (text, image), value in zip(slot['cells'], self.render(index)):
+            if value is None or isinstance(value, str):
+                canvas.itemconfigure(text, text=value or '')
+                canvas.itemconfigure(image, image='')
+            else:
+                canvas.itemconfigure(text, text='')
+                canvas.itemconfigure(image, image=value)
+                
+                # Tk blanks an image whose last Python reference is gone
+                slot['images'].append(value)
+    
+    def redraw(self):
+        """Position the row items for the current scroll offset"""
+        canvas = self.canvas
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if height <= 1:
+            # Not laid out yet; <Configure> redraws once it is
+            return
+        
+        total = self.count * self.row_height
+        self.top = max(0, min(self.top, total - height))
+        first = self.top // self.row_height
+        shift = self.top % self.row_height
+        visible = min(height // self.row_height + 2, self.count - first)
+        
+        while len(self.slots) < visible:
+            self.slots.append(self.create_slot())
+        
+        # Row i always uses slot i % len(slots), so scrolling by a row re-binds
+        # only the slot of the row coming into view
+        shown = {index % len(self.slots): index for index in range(first, first + visible)} if visible else {}
+        for number, slot in enumerate(self.slots):
+            items = [slot['background']] + [item for cell in slot['cells'] for item in cell]
+            index = shown.get(number)
+            if index is None:
+                if slot['visible']:
+                    for item in items:
+                        canvas.itemconfigure(item, state='hidden')
+                    slot['visible'] = False
+                slot['index'] = None
+                continue
+            
+            if slot['index'] != index:
+                self.bind_slot(slot, index)
+            if not slot['visible']:
+                for item in items:
+                    canvas.itemconfigure(item, state='normal')
+                slot['visible'] = True
+            
+            y = (index - first) * self.row_height - shift
+            canvas.coords(slot['background'], 0, y, width, y + self.row_height)
+            middle = y + self.row_height // 2
+            for (x, anchor, font, fill), (text, image) in zip(self.columns, slot['cells']):
+                left = x if x >= 0 else width + x
+                canvas.coords(text, left, middle)
+                canvas.coords(image, left, middle)
+        
+        if total <= height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + height) / total)
+    
+    def yview(self, *args):
+        """Scroll as the scrollbar asks: ('moveto', fraction) or ('scroll', amount, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * self.count * self.row_height)
+        elif args[0] == 'scroll':
+            if args[2] == 'pages':
+                step = max(self.row_height, self.canvas.winfo_height() - self.row_height)
+            else:
+                step = self.row_height
+            self.top += int(args[1]) * step
+        self.redraw()
+    
+    def bind_wheel(self, event=None):
+        """Route mouse wheel events to this list"""
+        self.canvas.bind_all('<MouseWheel>', self.on_wheel)
+        self.canvas.bind_all('<Button-4>', self.on_wheel)
+        self.canvas.bind_all('<Button-5>', self.on_wheel)
+    
+    def unbind_wheel(self, event=None):
+        """Stop routing mouse wheel events to this list"""
+        self.canvas.unbind_all('<MouseWheel>')
+        self.canvas.unbind_all('<Button-4>')
+        self.canvas.unbind_all('<Button-5>')
+    
+    def on_wheel(self, event):
+        """Scroll a few rows per wheel notch"""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.yview('scroll', -WHEEL_ROWS, 'units')
+        else:
+            self.yview('scroll', WHEEL_ROWS, 'units')
+
+
+class ForecastChart(tk.Canvas):
+    """Temperature, chance of rain and wind of the forecast slots on one Canvas
+    
+    Every item is created once and reused: new data or a resize only moves
+    items with coords(). The x positions of all slots are computed in one pass
+    per layout, and hovering finds the nearest slot by bisecting the slot
+    timestamps.
+    """
+    
+    def __init__(self, master, height=150, bg='white', **kwargs):
+        super().__init__(master, height=height, bg=bg, highlightthickness=0, **kwargs)
+        self.hourly = None
+        self.utc_offset = 0
+        self.xs = []
+        self.scale_x = 1.0
+        
+        # Rain bars go first so the lines are drawn over them
+        self.bars = []
+        self.separators = []
+        self.day_labels = []
+        self.temp_line = self.create_line(0, 0, 0, 0, fill=TEMP_COLOUR, width=2, smooth=True, state='hidden')
+        self.wind_line = self.create_line(0, 0, 0, 0, fill=WIND_COLOUR, width=1, dash=(4, 3), state='hidden')
+        self.axis_labels = [
+            self.create_text(0, 0, anchor=anchor, font=('Segoe UI', 8), fill=colour, state='hidden')
+            for anchor, colour in (('e', TEMP_COLOUR), ('e', TEMP_COLOUR), ('w', WIND_COLOUR))
+        ]
+        
+        # Hover cursor and tooltip
+        self.cursor = self.create_line(0, 0, 0, 0, fill=WIND_COLOUR, state='hidden')
+        self.tip_box = self.create_rectangle(0, 0, 0, 0, fill='#2d3436', width=0, state='hidden')
+        self.tip_text = self.create_text(0, 0, anchor='nw', font=('Segoe UI', 9), fill='white', state='hidden')
+        
+        self.bind('<Configure>', lambda e: self.layout())
+        self.bind('<Motion>', self.on_motion)
+        self.bind('<Leave>', lambda e: self.hide_tooltip())
+    
+    def set_data(self, hourly, utc_offset):
+        """Show the 'hourly' columns of a forecast model"""
+        self.hourly = hourly
+        self.utc_offset = utc_offset
+        self.hide_tooltip()
+        self.layout()
+    
+    def pool(self, items, count, create):
+        """Grow a list of items to at least count, hide the ones past it and return it"""
+        while len(items) < count:
+            items.append(create())
+            self.tag_lower(items[-1])
+        for item in items[count:]:
+            self.itemconfigure(item, state='hidden')
+        return items[:count]
+    
+    def layout(self):
+        """Move every item to fit the current data and size"""
+        width, height = self.winfo_width(), self.winfo_height()
+        hourly = self.hourly
+        if hourly is None or len(hourly['dt']) < 2 or width <= 1:
+            return
+        
+        left, right, top, bottom = CHART_MARGINS
+        plot_width = width - left - right
+        base = height - bottom
+        plot_height = base - top
+        
+        dts = hourly['dt']
+        start = dts[0]
+        self.scale_x = plot_width / (dts[-1] - start)
+        self.xs = xs = [left + (dt - start) * self.scale_x for dt in dts]
+        
+        # Temperature over the full height, wind from zero, rain chance in the lower half
+        temps = hourly['temp']
+        low, high = min(temps), max(temps)
+        if high - low < 1:
+            low, high = low - 0.5, high + 0.5
+        temp_scale = plot_height / (high - low)
+        wind_high = max(max(hourly['wind_speed']), 1)
+        wind_scale = plot_height / wind_high
+        
+        self.coords(self.temp_line, [v for x, t in zip(xs, temps) for v in (x, top + (high - t) * temp_scale)])
+        self.coords(self.wind_line, [v for x, w in zip(xs, hourly['wind_speed']) for v in (x, base - w * wind_scale)])
+        self.itemconfigure(self.temp_line, state='normal')
+        self.itemconfigure(self.wind_line, state='normal')
+        
+        half_bar = (xs[1] - xs[0]) * 0.3
+        bars = self.pool(self.bars, len(xs),
+                         lambda: self.create_rectangle(0, 0, 0, 0, fill=RAIN_COLOUR, width=0))
+        for bar, x, pop in zip(bars, xs, hourly['pop']):
+            self.coords(bar, x - half_bar, base - pop * plot_height / 2, x + half_bar, base)
+            self.itemconfigure(bar, state='normal')
+        
+        # A separator at each local midnight and the weekday after it
+        midnights = []
+        midnight = (start + self.utc_offset) // 86400 * 86400 - self.utc_offset + 86400
+        while midnight < dts[-1]:
+            midnights.append(midnight)
+            midnight += 86400
+        separators = self.pool(self.separators, len(midnights),
+                               lambda: self.create_line(0, 0, 0, 0, fill=GRID_COLOUR))
+        labels = self.pool(self.day_labels, len(midnights) + 1,
+                           lambda: self.create_text(0, 0, anchor='n', font=('Segoe UI', 8), fill=WIND_COLOUR))
+        edges = [start] + midnights + [dts[-1]]
+        for separator, midnight in zip(separators, midnights):
+            x = left + (midnight - start) * self.scale_x
+            self.coords(separator, x, top, x, base)
+            self.itemconfigure(separator, state='normal')
+        for label, day_start, day_end in zip(labels, edges, edges[1:]):
+            x = left + ((day_start + day_end) / 2 - start) * self.scale_x
+            day = datetime.fromtimestamp(day_start + self.utc_offset, timezone.utc)
+            self.coords(label, x, base + 4)
+            self.itemconfigure(label, text=day.strftime('%a') if day_end - day_start >= 6 * 3600 else '',
+                               state='normal')
+        
+        high_label, low_label, wind_label = self.axis_labels
+        self.coords(high_label, left - 6, top)
+        self.coords(low_label, left - 6, base)
+        self.coords(wind_label, width - right + 6, top)
+        self.itemconfigure(high_label, text=f"{round(high)}°", state='normal')
+        self.itemconfigure(low_label, text=f"{round(low)}°", state='normal')
+        self.itemconfigure(wind_label, text=f"{wind_high:.0f} m/s", state='normal')
+    
+    def nearest_slot(self, x):
+        """Return the index of the slot closest to an x position"""
+        dts = self.hourly['dt']
+        dt = dts[0] + (x - CHART_MARGINS[0]) / self.scale_x
+        i = bisect_left(dts, dt)
+        if i == 0:
+            return 0
+        if i == len(dts):
+            return i - 1
+        return i if dts[i] - dt < dt - dts[i - 1] else i - 1
+    
+    def on_motion(self, event):
+        """Show the values of the slot under the pointer"""
+        if self.hourly is None or len(self.xs) < 2:
+            return
+        
+        hourly = self.hourly
+        i = self.nearest_slot(event.x)
+        x = self.xs[i]
+        local_time = datetime.fromtimestamp(hourly['dt'][i] + self.utc_offset, timezone.utc)
+        self.itemconfigure(self.tip_text, text=(
+            f"{local_time.strftime('%a %H:%M')}  {round(hourly['temp'][i])}°\n"
+            f"💧 {round(hourly['pop'][i] * 100)}%  💨 {hourly['wind_speed'][i]:.1f} m/s"
+        ))
+        for item in (self.cursor, self.tip_box, self.tip_text):
+            self.itemconfigure(item, state='normal')
+            self.tag_raise(item)
+        
+        # Keep the tooltip inside the chart, on whichever side of the cursor has room
+        x1, y1, x2, y2 = self.bbox(self.tip_text)
+        tip_width, tip_height = x2 - x1 + 12, y2 - y1 + 8
+        tip_x = x + 10 if x + 10 + tip_width <= self.winfo_width() else x - 10 - tip_width
+        self.coords(self.tip_box, tip_x, 4, tip_x + tip_width, 4 + tip_height)
+        self.coords(self.tip_text, tip_x + 6, 8)
+        self.coords(self.cursor, x, CHART_MARGINS[2], x, self.winfo_height() - CHART_MARGINS[3])
+    
+    def hide_tooltip(self):
+        """Hide the hover cursor and tooltip"""
+        for item in (self.cursor, self.tip_box, self.tip_text):
+            self.itemconfigure(item, state='hidden')
+
+
+class NoticeArea(tk.Frame):
+    """Non-modal notices stacked at the bottom of a window
+    
+    Each notice has a key. Showing a notice whose key is already up updates it
+    in place and counts the repeat, so a burst of the same failure stays one
+    line. At most `limit` notices are shown, dropping the oldest; each closes on
+    a click or after its level's timeout.
+    """
+    
+    def __init__(self, master, limit=NOTICE_LIMIT):
+        super().__init__(master, bg=master['bg'])
+        self.limit = limit
+        self.notices = OrderedDict()
+    
+    def show(self, key, message, level='error'):
+        """Show or update the notice for a key"""
+        background, foreground = NOTICE_STYLES[level]
+        notice = self.notices.get(key)
+        if notice is None:
+            label = tk.Label(self, font=('Segoe UI', 9), anchor='w', justify='left', wraplength=560,
+                             padx=12, pady=6, cursor='hand2')
+            label.pack(fill='x', pady=(4, 0))
+            label.bind('<Button-1>', lambda e: self.dismiss(key))
+            notice = self.notices[key] = {'label': label, 'count': 0, 'job': None}
+        else:
+            self.notices.move_to_end(key)
+            self.after_cancel(notice['job'])
+        
+        notice['count'] += 1
+        repeats = f"  (×{notice['count']})" if notice['count'] > 1 else ''
+        notice['label'].config(text=f"{message}{repeats}", bg=background, fg=foreground)
+        notice['job'] = self.after(NOTICE_TIMEOUTS[level] * 1000, self.dismiss, key)
+        
+        while len(self.notices) > self.limit:
+            self.dismiss(next(iter(self.notices)))
+        
+        self.place(relx=0.5, rely=1.0, y=-10, anchor='s', relwidth=0.9)
+        self.lift()
+    
+    def dismiss(self, key):
+        """Close the notice for a key if it is shown"""
+        notice = self.notices.pop(key, None)
+        if notice is None:
+            return
+        self.after_cancel(notice['job'])
+        notice['label'].destroy()
+        if not self.notices:
+            self.place_forget()